@@ -1,32 +1,338 @@
+import contextvars
+import hmac
+import html
+import json
 import logging
+import os
+import queue
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import closing
 
 import requests
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify
 from flask_cors import CORS
 import weaviate
-from typing import List, Dict
+from typing import Iterator, List, Dict, Optional, Tuple
+
+from collection_pointer import CollectionResolver
+from context_expansion import expand_to_parents
+from embedding_cache import EmbeddingCache
+from embeddings import EMBED_DIMENSIONS, OllamaEmbedder
+from generation_profiles import GENERATION_PROFILES, build_generate_payload
+from profiler import ProfilerBusy, SamplingProfiler, format_collapsed, peak_memory_bytes
+from scrape.chunker import count_tokens
+from session_store import SessionStore, create_session_store
+from structured_logging import request_id_var, setup_logging
 
 # Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 CORS(app)
 
+WEAVIATE_URL = os.environ.get("WEAVIATE_URL", "http://localhost:8080")
+OLLAMA_BASE_URL = os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434")
+
 # Initialize Weaviate client
 client = weaviate.Client(
-    url="http://localhost:8080"
+    url=WEAVIATE_URL
 )
 
+# Retrieval tuning, see benchmarks/bench_retrieval.py before changing these
+HYBRID_ALPHA = float(os.environ.get("HYBRID_ALPHA", "0.75"))
+RETRIEVAL_LIMIT = int(os.environ.get("RETRIEVAL_LIMIT", "8"))
+CONTEXT_SCORE_CUTOFF = float(os.environ.get("CONTEXT_SCORE_CUTOFF", "0.7"))
+
+# Search the small chunks, then hand the model the sections around the hits,
+# up to this many tokens of context in total (see context_expansion.py)
+PARENT_EXPANSION = os.environ.get("PARENT_EXPANSION", "1") == "1"
+CONTEXT_TOKEN_BUDGET = int(os.environ.get("CONTEXT_TOKEN_BUDGET", "3000"))
+SIBLING_FETCH_LIMIT = int(os.environ.get("SIBLING_FETCH_LIMIT", "200"))
+CHILD_PROPERTIES = ["parent_id", "chapter_id", "chunk_index", "overlap_chars"]
+
+# Model routing: simple lookups go to a small model, everything else to the full one
+FAST_MODEL = os.environ.get("OLLAMA_FAST_MODEL", "llama3.2:1b")
+FULL_MODEL = os.environ.get("OLLAMA_FULL_MODEL", "llama3.2")
+FAST_NUM_PREDICT = int(os.environ.get("OLLAMA_FAST_NUM_PREDICT", "256"))
+
+# How often /api/chat/ask writes to the client while generating, to notice disconnects
+HEARTBEAT_INTERVAL = float(os.environ.get("HEARTBEAT_INTERVAL", "1.0"))
+
+# Hard limits on the Ollama call. The read timeout bounds the wait for each streamed
+# token (including the first one while queued), the total timeout bounds the whole answer.
+OLLAMA_CONNECT_TIMEOUT = float(os.environ.get("OLLAMA_CONNECT_TIMEOUT", "3"))
+OLLAMA_READ_TIMEOUT = float(os.environ.get("OLLAMA_READ_TIMEOUT", "30"))
+OLLAMA_TOTAL_TIMEOUT = float(os.environ.get("OLLAMA_TOTAL_TIMEOUT", "120"))
+BREAKER_FAILURE_THRESHOLD = int(os.environ.get("OLLAMA_BREAKER_FAILURES", "5"))
+BREAKER_RESET_TIMEOUT = float(os.environ.get("OLLAMA_BREAKER_RESET", "30"))
+FALLBACK_SECTIONS = int(os.environ.get("FALLBACK_SECTIONS", "3"))
+
+# Chat sessions; requests without a session id share the default one
+DEFAULT_SESSION_ID = 'default'
+SESSION_HISTORY_LIMIT = int(os.environ.get("SESSION_HISTORY_LIMIT", "50"))
+
+# Query embeddings are computed here through the shared embedding cache so repeated
+# questions skip Ollama; Weaviate embeds the query itself if this is off or fails
+QUERY_EMBED_CACHE = os.environ.get("QUERY_EMBED_CACHE", "1") == "1"
+QUERY_EMBED_TIMEOUT = float(os.environ.get("QUERY_EMBED_TIMEOUT", "5"))
+
+# Admin endpoints are disabled unless a token is configured
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+
+class OllamaUnavailable(Exception):
+    """Raised when Ollama fails, times out or is short-circuited by the breaker"""
+
+class OllamaRequestError(Exception):
+    """Raised when Ollama rejects a request (4xx), e.g. for a model that isn't pulled
+
+    A configuration error rather than an outage, so it doesn't trip the breaker.
+    """
+
+class CircuitBreaker:
+    """Stop calling a failing dependency for a while after repeated failures
+
+    After failure_threshold consecutive failures the breaker opens and rejects
+    calls for reset_timeout seconds, then lets a single trial call through.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return 'closed'
+        if time.time() - self._opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def allow(self) -> bool:
+        """Return True if a call may be attempted now"""
+        with self._lock:
+            state = self._state()
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logger.warning(f"Opening circuit breaker after {self._failures} failures")
+                self._opened_at = time.time()
+            self._trial_in_flight = False
+
+    def release(self):
+        """Give up a trial call without a verdict, e.g. when the client went away"""
+        with self._lock:
+            self._trial_in_flight = False
+
+def iter_with_heartbeats(events: Iterator, interval: float) -> Iterator:
+    """Run a generator on a worker thread and yield its items, or None after `interval` seconds without one
+
+    Closing this generator makes the worker close the events generator as
+    soon as its current step returns, e.g. the next token from Ollama.
+    """
+    items = queue.Queue()
+    cancelled = threading.Event()
+    done = object()
+
+    def work():
+        try:
+            with closing(events):
+                for item in events:
+                    if cancelled.is_set():
+                        break
+                    items.put(item)
+        except Exception as e:
+            items.put(e)
+        finally:
+            items.put(done)
+
+    # Carry the request id over to the worker's log lines
+    threading.Thread(target=contextvars.copy_context().run, args=(work,), daemon=True).start()
+    try:
+        while True:
+            try:
+                item = items.get(timeout=interval)
+            except queue.Empty:
+                yield None
+                continue
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        cancelled.set()
+
+def build_extractive_answer(chunks: List[Dict], limit: int = 3, max_chars: int = 700) -> str:
+    """Build an HTML answer from the top retrieved sections, for when generation is unavailable"""
+    parts = [
+        "<h2>Relevant Policy Manual Sections</h2>",
+        "<p>The assistant is busy right now, so here are the sections of the USCIS Policy Manual "
+        "that best match your question.</p>"
+    ]
+    for chunk in sorted(chunks, key=lambda x: float(x.get('score') or 0), reverse=True)[:limit]:
+        content = chunk.get('content') or ''
+        if len(content) > max_chars:
+            # Cut at the last sentence end inside the limit
+            cut = content.rfind('. ', 0, max_chars)
+            content = content[:cut + 1] if cut > 0 else content[:max_chars] + '...'
+
+        citation = f"Volume {chunk.get('volume_number')}, Part {chunk.get('part_letter')}, Chapter {chunk.get('chapter_number')}"
+        heading = html.escape(citation)
+        if chunk.get('url'):
+            heading = f'<a href="{html.escape(chunk["url"])}" target="_blank">{heading}</a>'
+        section = html.escape(chunk.get('section_header') or chunk.get('title') or '')
+
+        parts.append(
+            f"<div><h3>{heading}: {section}</h3>"
+            f"<p>{html.escape(content)}</p></div>"
+        )
+    return "\n".join(parts)
+
+class QueryRouter:
+    """Classify questions as 'fast' or 'full' using cheap heuristics and retrieval scores"""
+
+    COMPLEX_PATTERN = re.compile(
+        r'\b(eligib\w*|compare|comparison|difference|differ|versus|vs\.?|'
+        r'exception\w*|waiver\w*|if|whether|unless|while|both|either|'
+        r'steps|process|requirements?|qualify|explain|why|how)\b',
+        re.IGNORECASE
+    )
+    # Answers from the fast model that look like these get re-run on the full model
+    ESCALATION_PATTERN = re.compile(
+        r"(i don't know|i do not know|i (?:cannot|can't) answer|unable to (?:answer|determine))",
+        re.IGNORECASE
+    )
+
+    def __init__(self, max_simple_words: int = 12, min_score_gap: float = 0.15,
+                 max_simple_chapters: int = 2, min_answer_chars: int = 80,
+                 latency_window: int = 500):
+        self.max_simple_words = max_simple_words
+        self.min_score_gap = min_score_gap
+        self.max_simple_chapters = max_simple_chapters
+        self.min_answer_chars = min_answer_chars
+        self._lock = threading.Lock()
+        self._stats = {
+            route: {
+                'count': 0,
+                'escalations': 0,
+                'total_latency': 0.0,
+                'latencies': deque(maxlen=latency_window)
+            }
+            for route in ('fast', 'full')
+        }
+
+    def classify(self, question: str, chunks: List[Dict]) -> str:
+        """Return 'fast' for short definitional lookups, 'full' for anything else"""
+        words = question.split()
+        if len(words) > self.max_simple_words:
+            return 'full'
+        if question.count('?') > 1 or self.COMPLEX_PATTERN.search(question):
+            return 'full'
+
+        scores = sorted((float(c.get('score') or 0) for c in chunks), reverse=True)
+        if len(scores) > 1 and scores[0] - scores[1] < self.min_score_gap:
+            # Relevance is spread over several sections, the answer needs synthesis
+            return 'full'
+
+        chapters = {
+            (c.get('volume_number'), c.get('part_letter'), c.get('chapter_number'))
+            for c in chunks[:4]
+        }
+        if len(chapters) > self.max_simple_chapters:
+            return 'full'
+
+        return 'fast'
+
+    def should_escalate(self, answer: Optional[str]) -> bool:
+        """Decide whether a fast-model answer is too weak to return"""
+        if not answer or len(answer.strip()) < self.min_answer_chars:
+            return True
+        return bool(self.ESCALATION_PATTERN.search(answer))
+
+    def record(self, route: str, latency: float, escalated: bool = False):
+        """Record the latency of one generation on the given route"""
+        with self._lock:
+            stats = self._stats[route]
+            stats['count'] += 1
+            stats['total_latency'] += latency
+            stats['latencies'].append(latency)
+            if escalated:
+                stats['escalations'] += 1
+
+    def get_stats(self) -> Dict:
+        """Per-route counts, latency percentiles and estimated time saved"""
+        with self._lock:
+            routes = {}
+            for route, stats in self._stats.items():
+                latencies = sorted(stats['latencies'])
+                count = stats['count']
+                routes[route] = {
+                    'model': FAST_MODEL if route == 'fast' else FULL_MODEL,
+                    'count': count,
+                    'escalations': stats['escalations'],
+                    'avg_latency': stats['total_latency'] / count if count else 0.0,
+                    'p50_latency': latencies[len(latencies) // 2] if latencies else 0.0,
+                    'p95_latency': latencies[int(len(latencies) * 0.95)] if latencies else 0.0,
+                }
+
+        fast, full = routes['fast'], routes['full']
+        # Fast answers that were kept would otherwise have cost a full generation each, and
+        # every fast attempt, including the ones escalated anyway, took time of its own
+        kept_fast = fast['count'] - fast['escalations']
+        saved = 0.0
+        if full['count'] and fast['count']:
+            saved = kept_fast * full['avg_latency'] - fast['avg_latency'] * fast['count']
+
+        total = fast['count'] + full['count']
+        return {
+            'routes': routes,
+            'fast_ratio': fast['count'] / total if total else 0.0,
+            'escalation_rate': fast['escalations'] / fast['count'] if fast['count'] else 0.0,
+            'estimated_seconds_saved': saved
+        }
+
 class USCISPolicyQuerier:
-    def __init__(self, client):
+    def __init__(self, client, sessions: SessionStore, embedder: Optional[OllamaEmbedder] = None):
         self.client = client
-        self.ollama_base_url = "http://localhost:11434"
-        self.collection_name = "USCIS_Policy_Manual"
-        self.chat_history = []
+        self.embedder = embedder
+        self.ollama_base_url = OLLAMA_BASE_URL
+        # Follows the blue/green pointer written by weaviate/4_reindex.py
+        self.collections = CollectionResolver(client, "USCIS_Policy_Manual")
+        self.sessions = sessions
+        self.router = QueryRouter()
+        self._generation_lock = threading.Lock()
+        self._generation_stats = {'active': 0, 'completed': 0, 'cancelled': 0, 'fallbacks': 0}
+        self.breaker = CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT)
+        # collection -> (checked at, has parent ids), re-checked as often as the pointer
+        self._parent_ids: Dict[str, Tuple[float, bool]] = {}
         
         # Verify collection exists
         try:
@@ -37,15 +343,78 @@ class USCISPolicyQuerier:
         except Exception as e:
             logger.error(f"Error checking schema: {e}")
 
+    @property
+    def collection_name(self) -> str:
+        return self.collections.current()
+
+    def embed_query(self, question: str) -> Optional[List[float]]:
+        """Query vector from the embedding cache or Ollama, None to let Weaviate embed it"""
+        if self.embedder is None:
+            return None
+        try:
+            return self.embedder.embed_one(question)
+        except Exception as e:
+            if self.embedder.dimensions:
+                logger.warning(f"Query embedding failed, falling back to keyword search: {e}")
+            else:
+                logger.warning(f"Query embedding failed, falling back to Weaviate's vectorizer: {e}")
+            return None
+
+    def has_parent_ids(self, collection_name: str) -> bool:
+        """Whether the collection was imported with parent ids, re-checked every pointer refresh"""
+        cached = self._parent_ids.get(collection_name)
+        if cached and time.monotonic() - cached[0] < self.collections.refresh_seconds:
+            return cached[1]
+        try:
+            schema = self.client.schema.get(collection_name)
+        except Exception as e:
+            logger.warning(f"Could not check {collection_name} for parent ids: {e}")
+            if not cached:
+                return False
+            # Like the pointer, keep the last known answer until the next refresh
+            self._parent_ids[collection_name] = (time.monotonic(), cached[1])
+            return cached[1]
+        has_parents = any(prop['name'] == 'parent_id' for prop in schema.get('properties', []))
+        self._parent_ids[collection_name] = (time.monotonic(), has_parents)
+        return has_parents
+
+    def expand_to_parents(self, collection_name: str, chunks: List[Dict]) -> List[Dict]:
+        """Swap child hits for their parent sections, keeping the hits if the siblings can't be fetched"""
+        parent_ids = list(dict.fromkeys(chunk['parent_id'] for chunk in chunks if chunk.get('parent_id')))
+        if not parent_ids:
+            return chunks
+        try:
+            # A plain filter, no vector search
+            response = (
+                self.client.query
+                .get(collection_name, ["content", "parent_id", "chunk_index", "overlap_chars"])
+                .with_where({'path': ['parent_id'], 'operator': 'ContainsAny', 'valueTextArray': parent_ids})
+                .with_limit(SIBLING_FETCH_LIMIT)
+                .do()
+            )
+            siblings = {}
+            for obj in response['data']['Get'][collection_name]:
+                siblings.setdefault(obj['parent_id'], []).append(obj)
+        except Exception as e:
+            logger.warning(f"Fetching sibling chunks failed, using the hits as they are: {e}")
+            return chunks
+        return expand_to_parents(chunks, siblings, CONTEXT_TOKEN_BUDGET, count_tokens)
+
     # Copy the get_relevant_context method from the original file
     # Lines 29-80 from the original file
     def get_relevant_context(self, question: str) -> List[Dict]:
         """Get relevant context using hybrid search (BM25 + semantic search)"""
         try:
-            logger.info("Performing hybrid search...")
+            logger.info("Performing hybrid search...", extra={'sample': True})
+            start = time.time()
+            collection_name = self.collection_name
+            vector = self.embed_query(question)
+            # Weaviate's vectorizer makes full-size vectors, which can't search a truncated index
+            alpha = 0.0 if vector is None and self.embedder and self.embedder.dimensions else HYBRID_ALPHA
+            expand = PARENT_EXPANSION and self.has_parent_ids(collection_name)
             response = (
                 self.client.query
-                .get(self.collection_name, [
+                .get(collection_name, [
                     "content",
                     "title",
                     "url",
@@ -54,22 +423,23 @@ class USCISPolicyQuerier:
                     "volume_number",
                     "part_letter",
                     "chapter_number"
-                ])
+                ] + (CHILD_PROPERTIES if expand else []))
                 .with_hybrid(
                     query=question,
+                    vector=vector,
                     properties=["content", "title", "section_header", "subsection_header"],
-                    alpha=0.75,
+                    alpha=alpha,
                 )
-                .with_limit(8)
+                .with_limit(RETRIEVAL_LIMIT)
                 .with_additional(["distance", "score", "certainty"])
                 .do()
             )
             
             chunks = []
             if (response and 'data' in response and 'Get' in response['data'] 
-                and self.collection_name in response['data']['Get']):
+                and collection_name in response['data']['Get']):
                 
-                for obj in response['data']['Get'][self.collection_name]:
+                for obj in response['data']['Get'][collection_name]:
                     chunk = {
                         'content': obj['content'],
                         'title': obj['title'],
@@ -79,12 +449,25 @@ class USCISPolicyQuerier:
                         'volume_number': obj.get('volume_number'),
                         'part_letter': obj.get('part_letter'),
                         'chapter_number': obj.get('chapter_number'),
+                        'parent_id': obj.get('parent_id'),
+                        'chapter_id': obj.get('chapter_id'),
+                        'chunk_index': obj.get('chunk_index'),
+                        'overlap_chars': obj.get('overlap_chars'),
                         'score': obj.get('_additional', {}).get('score', 0),
                         'certainty': obj.get('_additional', {}).get('certainty', 0)
                     }
                     chunks.append(chunk)
             
-            logger.info(f"Found {len(chunks)} chunks from hybrid search")
+            logger.info(f"Found {len(chunks)} chunks from hybrid search", extra={
+                'sample': True,
+                'duration_ms': round((time.time() - start) * 1000, 1)
+            })
+            if expand and chunks:
+                chunks = self.expand_to_parents(collection_name, chunks)
+                logger.info(f"Expanded to {len(chunks)} sections", extra={
+                    'sample': True,
+                    'duration_ms': round((time.time() - start) * 1000, 1)
+                })
             return chunks
             
         except Exception as e:
@@ -92,25 +475,45 @@ class USCISPolicyQuerier:
             logger.error("Full error:", exc_info=True)
             return []
 
+    def build_context(self, chunks: List[Dict]) -> str:
+        """Format the chunks that pass the score cutoff as prompt context, best first"""
+        return "\n\n".join([
+            f"[Vol {chunk['volume_number']}.{chunk['part_letter']}.{chunk['chapter_number']}] {chunk['title']}\n"
+            f"{chunk.get('section_header', '')}: {chunk['content']}"
+            for chunk in sorted(chunks, key=lambda x: float(x.get('score', 0)), reverse=True)
+            if float(chunk.get('score', 0)) > CONTEXT_SCORE_CUTOFF
+        ])
+
     # Copy the ask method from the original file
     # Lines 82-140 from the original file
-    def ask(self, question: str) -> str:
+    def ask(self, question: str, profile: Optional[str] = None,
+            session_id: str = DEFAULT_SESSION_ID) -> str:
         """Main method to get answer for a question"""
+        answer = None
+        for event, value in self.ask_stream(question, profile=profile, session_id=session_id):
+            if event in ('answer', 'fallback'):
+                answer = value
+        return answer
+
+    def ask_stream(self, question: str, profile: Optional[str] = None,
+                   session_id: str = DEFAULT_SESSION_ID) -> Iterator[Tuple[str, str]]:
+        """Yield ('token', text) events while generating, then a final ('answer', html) event
+
+        When Ollama is failing, overloaded or short-circuited the final event is
+        ('fallback', html) with the top retrieved sections instead of a generated answer.
+        Closing the generator closes the Ollama connection, which stops the generation.
+        """
         chunks = self.get_relevant_context(question)
         
         if not chunks:
-            return "<h2>No Information Found</h2><p>I couldn't find relevant information to answer your question.</p>"
+            yield 'answer', "<h2>No Information Found</h2><p>I couldn't find relevant information to answer your question.</p>"
+            return
         
-        context = "\n\n".join([
-            f"[Vol {chunk['volume_number']}.{chunk['part_letter']}.{chunk['chapter_number']}] {chunk['title']}\n"
-            f"{chunk.get('section_header', '')}: {chunk['content']}"
-            for chunk in sorted(chunks, key=lambda x: float(x.get('score', 0)), reverse=True)
-            if float(chunk.get('score', 0)) > 0.7
-        ])
+        context = self.build_context(chunks)
         
         chat_context = "\n\n".join([
             f"Human: {q}\nAssistant: {a}" 
-            for q, a in self.chat_history[-3:]
+            for q, a in self.sessions.tail(session_id, 3)
         ])
         
         prompt = f"""<s>[INST] You are an immigration expert specializing in USCIS policies and procedures. 
@@ -141,54 +544,241 @@ Current context from USCIS Policy Manual:
 
 Question: {question} [/INST]</s>"""
         
+        route = self.router.classify(question, chunks)
+        logger.info(f"Routing question to '{route}' model", extra={'sample': True, 'route': route})
+
+        if not self.breaker.allow():
+            logger.warning("Circuit breaker open, answering from retrieved sections")
+            self._update_generation_stats(fallbacks=1)
+            yield 'fallback', build_extractive_answer(chunks, FALLBACK_SECTIONS)
+            return
+
+        self._update_generation_stats(active=1)
+        try:
+            if route == 'fast':
+                start = time.time()
+                try:
+                    answer = yield from self._generate(prompt, FAST_MODEL, profile, FAST_NUM_PREDICT)
+                    escalated = self.router.should_escalate(answer)
+                    if escalated:
+                        logger.info("Fast model answer was insufficient, escalating to full model")
+                except (OllamaUnavailable, OllamaRequestError) as e:
+                    # E.g. the fast model isn't pulled; the full model decides whether Ollama is down
+                    logger.warning(f"Fast model failed, escalating to full model: {e}")
+                    escalated = True
+                self.router.record('fast', time.time() - start, escalated=escalated)
+                if escalated:
+                    route = 'full'
+
+            if route == 'full':
+                start = time.time()
+                answer = yield from self._generate(prompt, FULL_MODEL, profile)
+                self.router.record('full', time.time() - start)
+
+            logger.info("Generation finished", extra={
+                'route': route,
+                'duration_ms': round((time.time() - start) * 1000, 1),
+                'answer_chars': len(answer)
+            })
+
+            self.breaker.record_success()
+            self._update_generation_stats(completed=1)
+            self.sessions.append(session_id, question, answer)
+            yield 'answer', answer
+        except GeneratorExit:
+            logger.info("Client went away, cancelled generation")
+            self.breaker.release()
+            self._update_generation_stats(cancelled=1)
+            raise
+        except OllamaUnavailable as e:
+            logger.error(f"Generation unavailable, answering from retrieved sections: {e}")
+            self.breaker.record_failure()
+            self._update_generation_stats(fallbacks=1)
+            yield 'fallback', build_extractive_answer(chunks, FALLBACK_SECTIONS)
+        except Exception as e:
+            logger.error(f"Error generating response: {e}")
+            # Not an outage (e.g. OllamaRequestError), but a half-open trial must not stay in flight forever
+            self.breaker.release()
+            yield 'answer', f"<h2>Error</h2><p>{str(e)}</p>"
+        finally:
+            self._update_generation_stats(active=-1)
+
+    def _generate(self, prompt: str, model: str, profile: Optional[str] = None,
+                  num_predict: Optional[int] = None):
+        """Stream a generation from Ollama, yielding tokens and returning the full text
+
+        Raises OllamaUnavailable on connection errors, timeouts and server errors,
+        and OllamaRequestError when Ollama rejects the request.
+        """
+        deadline = time.time() + OLLAMA_TOTAL_TIMEOUT
         try:
             response = requests.post(
                 f"{self.ollama_base_url}/api/generate",
-                json={
-                    "model": "llama3.2",
-                    "prompt": prompt,
-                    "stream": False,
-                    "temperature": 0.7,
-                    "top_p": 0.9
-                }
+                json=build_generate_payload(model, prompt, profile, num_predict, stream=True),
+                stream=True,
+                timeout=(OLLAMA_CONNECT_TIMEOUT, OLLAMA_READ_TIMEOUT)
             )
-            
-            if response.status_code == 200:
-                answer = response.json()['response']
-                self.chat_history.append((question, answer))
-                return answer
-            else:
-                return "<h2>Error</h2><p>Unable to generate response due to server error.</p>"
-        except Exception as e:
-            logger.error(f"Error generating response: {e}")
-            return f"<h2>Error</h2><p>{str(e)}</p>"
+        except requests.RequestException as e:
+            raise OllamaUnavailable(f"request to {model} failed: {e}") from e
+
+        try:
+            if 400 <= response.status_code < 500:
+                raise OllamaRequestError(f"Ollama rejected the request for model {model} "
+                                         f"({response.status_code}): {response.text[:200]}")
+            if response.status_code != 200:
+                raise OllamaUnavailable(f"Ollama returned {response.status_code} for model {model}")
 
-    def clear_history(self):
+            parts = []
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                try:
+                    data = json.loads(line)
+                except ValueError as e:
+                    raise OllamaUnavailable(f"malformed stream from {model}: {e}") from e
+                if 'error' in data:
+                    raise OllamaUnavailable(f"Ollama error for model {model}: {data['error']}")
+                token = data.get('response', '')
+                if token:
+                    parts.append(token)
+                    yield 'token', token
+                if data.get('done'):
+                    break
+                if time.time() > deadline:
+                    raise OllamaUnavailable(f"generation exceeded {OLLAMA_TOTAL_TIMEOUT}s")
+            return ''.join(parts)
+        except requests.RequestException as e:
+            raise OllamaUnavailable(f"stream from {model} failed: {e}") from e
+        finally:
+            # Ollama aborts the generation once the connection is gone
+            response.close()
+
+    def _update_generation_stats(self, **deltas):
+        with self._generation_lock:
+            for key, delta in deltas.items():
+                self._generation_stats[key] += delta
+
+    def get_generation_stats(self) -> Dict:
+        """Get generation counts and the circuit breaker state"""
+        with self._generation_lock:
+            stats = dict(self._generation_stats)
+        stats['breaker_state'] = self.breaker.state
+        return stats
+
+    def clear_history(self, session_id: str = DEFAULT_SESSION_ID):
         """Clear the chat history"""
-        self.chat_history = []
+        self.sessions.clear(session_id)
 
-    def get_chat_history(self):
-        """Get the current chat history"""
-        return self.chat_history
+    def get_chat_history(self, session_id: str = DEFAULT_SESSION_ID):
+        """Get the most recent chat history"""
+        return self.sessions.tail(session_id, SESSION_HISTORY_LIMIT)
 
 # Initialize the querier
-querier = USCISPolicyQuerier(client)
+query_embedder = None
+# A truncated index (EMBED_DIMENSIONS) can only be searched with vectors truncated the same way
+if QUERY_EMBED_CACHE or EMBED_DIMENSIONS:
+    query_embedder = OllamaEmbedder(base_url=OLLAMA_BASE_URL, timeout=QUERY_EMBED_TIMEOUT,
+                                    cache=EmbeddingCache() if QUERY_EMBED_CACHE else None)
+querier = USCISPolicyQuerier(client, create_session_store(), query_embedder)
+profiler = SamplingProfiler(max_seconds=60)
+
+@app.before_request
+def start_request():
+    """Tag everything logged for this request with a request id"""
+    g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex[:16]
+    g.request_start = time.time()
+    request_id_var.set(g.request_id)
+
+@app.after_request
+def log_request(response):
+    """Log one access line per request; for streamed answers the duration is time to first byte"""
+    response.headers['X-Request-ID'] = g.request_id
+    logger.info(f"{request.method} {request.path} {response.status_code}", extra={
+        'sample': True,
+        'method': request.method,
+        'path': request.path,
+        'status': response.status_code,
+        'duration_ms': round((time.time() - g.request_start) * 1000, 1)
+    })
+    return response
+
+def get_session_id(data: Optional[Dict] = None) -> str:
+    """Session id from the JSON body, the X-Session-ID header or the session_id query arg"""
+    if data and data.get('session_id'):
+        return str(data['session_id'])
+    return (request.headers.get('X-Session-ID')
+            or request.args.get('session_id')
+            or DEFAULT_SESSION_ID)
 
 @app.route('/api/chat/history', methods=['GET'])
 def get_chat_history():
     """Get the current chat history"""
     return jsonify({
-        'history': querier.get_chat_history()
+        'history': querier.get_chat_history(get_session_id())
     })
 
 @app.route('/api/chat/clear', methods=['POST'])
 def clear_chat_history():
     """Clear the chat history"""
-    querier.clear_history()
+    querier.clear_history(get_session_id(request.get_json(silent=True)))
     return jsonify({
         'message': 'Chat history cleared successfully'
     })
 
+@app.route('/api/stats/routing', methods=['GET'])
+def get_routing_stats():
+    """Get per-route latency and escalation stats"""
+    return jsonify(querier.router.get_stats())
+
+@app.route('/api/stats/generation', methods=['GET'])
+def get_generation_stats():
+    """Get generation counts and the circuit breaker state"""
+    return jsonify(querier.get_generation_stats())
+
+@app.route('/api/stats/embeddings', methods=['GET'])
+def get_embedding_stats():
+    """Get the query embedding cache hit rate and the time it saved"""
+    return jsonify(query_embedder.cache_report() if query_embedder else {'enabled': False})
+
+@app.route('/api/stats/memory', methods=['GET'])
+def get_memory_stats():
+    """Get the peak resident memory of the API process"""
+    return jsonify({
+        'peak_memory_bytes': peak_memory_bytes()
+    })
+
+@app.route('/api/admin/profile', methods=['POST'])
+def profile_process():
+    """Sample all request threads for N seconds and return collapsed stacks"""
+    token = request.headers.get('X-Admin-Token', '')
+    if not ADMIN_TOKEN or not hmac.compare_digest(token, ADMIN_TOKEN):
+        return jsonify({
+            'error': 'Forbidden'
+        }), 403
+
+    try:
+        seconds = float(request.args.get('seconds', 10))
+        interval = float(request.args.get('interval_ms', 5)) / 1000
+    except ValueError:
+        return jsonify({
+            'error': 'seconds and interval_ms must be numbers'
+        }), 400
+
+    logger.info(f"Profiling for {seconds}s at {interval * 1000:.0f}ms intervals")
+    try:
+        stacks = profiler.profile(
+            seconds,
+            interval=interval,
+            include_idle=request.args.get('idle') == '1',
+            with_lines=request.args.get('lines') == '1'
+        )
+    except ProfilerBusy as e:
+        return jsonify({
+            'error': str(e)
+        }), 409
+
+    return Response(format_collapsed(stacks), mimetype='text/plain')
+
 @app.route('/api/chat/ask', methods=['POST'])
 def ask_question():
     """Ask a question and get a response"""
@@ -199,14 +789,36 @@ def ask_question():
             'error': 'Question is required'
         }), 400
     
-    question = data['question']
-    answer = querier.ask(question)
+    profile = data.get('profile')
+    if profile is not None and profile not in GENERATION_PROFILES:
+        return jsonify({
+            'error': f"Unknown profile '{profile}', expected one of {sorted(GENERATION_PROFILES)}"
+        }), 400
     
-    return jsonify({
-        'question': question,
-        'answer': answer,
-        'history': querier.get_chat_history()
-    })
+    question = data['question']
+    session_id = get_session_id(data)
+
+    def generate():
+        # Leading whitespace is valid JSON, so heartbeats can be written while the
+        # request waits for and runs the model. A write to a closed connection makes
+        # the server close this generator, which in turn cancels the Ollama generation.
+        last_write = time.time()
+        events = querier.ask_stream(question, profile=profile, session_id=session_id)
+        with closing(iter_with_heartbeats(events, HEARTBEAT_INTERVAL)) as items:
+            for item in items:
+                if item is not None and item[0] in ('answer', 'fallback'):
+                    event, value = item
+                    yield json.dumps({
+                        'question': question,
+                        'answer': value,
+                        'degraded': event == 'fallback',
+                        'history': querier.get_chat_history(session_id)
+                    })
+                elif item is None or time.time() - last_write >= HEARTBEAT_INTERVAL:
+                    last_write = time.time()
+                    yield ' '
+
+    return Response(generate(), mimetype='application/json')
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5555, debug=True)
@@ -0,0 +1,140 @@
+"""Compare the token chunker with the deprecated character chunker on the cached corpus.
+
+Every cached chapter page in scrape/raw_data/html is parsed once into its
+sections (parsing isn't timed). Each chunker then splits every section:
+
+  sections    one chunk per section, what the scraper used to write
+  deprecated  scrape/deprecated/chunking.py's ContentChunker (characters)
+  token       scrape/chunker.py's TokenChunker (tokens, sentence boundaries)
+
+Reports chunking time, chunk counts, the token size distribution and how many
+chunks exceed --context-tokens. The long-section runs chunk one synthetic
+section of growing size, built from corpus text, to show how each chunker
+scales with section length.
+
+    python benchmarks/bench_chunking.py --max-tokens 300 --overlap 50
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(BACKEND_DIR / 'scrape'))
+
+from bs4 import BeautifulSoup
+
+from chunker import CHUNK_MAX_TOKENS, CHUNK_OVERLAP_TOKENS, TokenChunker, count_tokens
+from common import percentile, print_table, write_results
+from content_processor import ContentProcessor
+from deprecated.chunking import ContentChunker
+
+
+def load_sections(html_dir: Path, limit=None):
+    """(reserved header tokens, paragraphs) of every section of the cached pages"""
+    processor = ContentProcessor()
+    sections = []
+    for path in sorted(html_dir.glob('*.html'))[:limit]:
+        soup = BeautifulSoup(path.read_text(encoding='utf-8'), 'html.parser')
+        title = processor.extract_metadata(soup, '')['title']
+        for section_header, subsection_header, paragraphs in processor.extract_sections(soup):
+            reserved = count_tokens('\n'.join(filter(None, (title, section_header, subsection_header))))
+            sections.append((reserved, paragraphs))
+    return sections
+
+
+def chunkers(args):
+    token = TokenChunker(args.max_tokens, args.overlap)
+    deprecated = ContentChunker(max_length=args.max_chars, overlap=args.overlap_chars)
+    return {
+        'sections': lambda reserved, paragraphs: ['\n\n'.join(paragraphs)],
+        'deprecated': lambda reserved, paragraphs: deprecated.chunk_text('\n\n'.join(paragraphs)),
+        'token': lambda reserved, paragraphs: token.split(paragraphs, reserved),
+    }
+
+
+def run(chunk, sections, repeat):
+    """(best seconds, chunks of the last pass)"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        chunks = [text for reserved, paragraphs in sections for text in chunk(reserved, paragraphs)]
+        durations.append(time.perf_counter() - start)
+    return min(durations), chunks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--html-dir', type=Path, default=BACKEND_DIR / 'scrape' / 'raw_data' / 'html')
+    parser.add_argument('--limit', type=int, help='Use only the first N cached pages')
+    parser.add_argument('--max-tokens', type=int, default=CHUNK_MAX_TOKENS)
+    parser.add_argument('--overlap', type=int, default=CHUNK_OVERLAP_TOKENS)
+    parser.add_argument('--max-chars', type=int, default=1500, help='Chunk size of the deprecated chunker')
+    parser.add_argument('--overlap-chars', type=int, default=200, help='Overlap of the deprecated chunker')
+    parser.add_argument('--context-tokens', type=int, default=2048,
+                        help="Embedding context; longer chunks are truncated by the model")
+    parser.add_argument('--long-section-kb', type=int, nargs='+', default=[16, 64, 256])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', type=Path, help='Result file (default: benchmarks/results/)')
+    args = parser.parse_args()
+
+    sections = load_sections(args.html_dir, args.limit)
+    if not sections:
+        sys.exit(f"No cached pages in {args.html_dir}, run the scraper first")
+    corpus_kb = sum(len(p.encode('utf-8')) for _, paragraphs in sections for p in paragraphs) / 1024
+
+    metrics, samples, rows = {}, {}, []
+    for name, chunk in chunkers(args).items():
+        seconds, chunks = run(chunk, sections, args.repeat)
+        tokens = [count_tokens(text) for text in chunks]
+        over = sum(1 for count in tokens if count > args.context_tokens)
+        rows.append({'chunker': name, 'seconds': seconds, 'chunks': len(chunks),
+                     'tokens_p50': percentile(tokens, 50), 'tokens_p95': percentile(tokens, 95),
+                     'tokens_max': max(tokens), 'over_context': over})
+        samples[f'{name}_chunk_tokens'] = tokens
+        metrics.update({
+            f'{name}_seconds': seconds,
+            f'{name}_chunks': len(chunks),
+            f'{name}_chunk_tokens_p95': percentile(tokens, 95),
+            f'{name}_chunk_tokens_max': max(tokens),
+            f'{name}_over_context': over
+        })
+
+    # One long section of corpus text per size, to see how time grows with length
+    text = '\n\n'.join(p for _, paragraphs in sections for p in paragraphs)
+    scaling = []
+    for kb in args.long_section_kb:
+        size = kb * 1024
+        long_text = (text * (size // max(1, len(text)) + 1))[:size]
+        paragraphs = long_text.split('\n\n')
+        row = {'section_kb': kb}
+        for name, chunk in chunkers(args).items():
+            if name == 'sections':
+                continue
+            seconds, _ = run(chunk, [(0, paragraphs)], 1)
+            row[f'{name}_s'] = seconds
+            metrics[f'long_{kb}kb_{name}_seconds'] = seconds
+        scaling.append(row)
+
+    print(f"{len(sections)} sections, {corpus_kb:.0f} KB of text\n")
+    print_table(rows, ['chunker', 'seconds', 'chunks', 'tokens_p50', 'tokens_p95', 'tokens_max', 'over_context'])
+    print("\nOne long section:\n")
+    print_table(scaling, ['section_kb', 'deprecated_s', 'token_s'])
+
+    path = write_results('chunking', metrics, samples, config={
+        'html_dir': str(args.html_dir),
+        'pages': len(list(args.html_dir.glob('*.html'))[:args.limit]),
+        'sections': len(sections),
+        'max_tokens': args.max_tokens,
+        'overlap': args.overlap,
+        'max_chars': args.max_chars,
+        'overlap_chars': args.overlap_chars,
+        'context_tokens': args.context_tokens,
+        'repeat': args.repeat
+    }, output=args.output)
+    print(f"\nResults written to {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""Measure what vector compression (PQ, BQ, SQ) costs in recall and saves in memory.
+
+Builds one HNSW collection per compression setting from the same corpus
+vectors, then runs the golden questions against each. recall@k is measured
+against exact nearest neighbours (a flat index), so the uncompressed 'none'
+row shows how much recall HNSW itself loses and the others how much more
+compression loses on top.
+
+Memory is reported two ways: an estimate of the vector index (compressed
+vectors + PQ codebook + graph links) and, when Weaviate's Prometheus endpoint
+is up, the change in its Go heap while the collection was built. PQ and SQ
+only compress after --training-limit objects, which is capped at the corpus
+size so they always train here. Runs against a local Weaviate and Ollama;
+vectors come from the embedding cache after the first run.
+
+    python benchmarks/bench_compression.py --k 5 10 --repeat 3
+    python benchmarks/bench_compression.py --compressions none pq --pq-segments 96 192
+"""
+import argparse
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+import weaviate
+
+from common import print_table, summarize, write_results
+from embedding_cache import EMBED_CACHE_PATH, EmbeddingCache
+from embeddings import OllamaEmbedder
+from vector_bench import (BENCH_PREFIX, DEFAULT_GOLDEN, DEFAULT_METRICS_URL, build_collection, exact_neighbours,
+                          heap_bytes, latest_chunks_file, load_corpus_vectors, load_questions, recall_at_k,
+                          run_queries)
+from vector_index import COMPRESSION_TRAINING_LIMIT, COMPRESSIONS, estimate_index_bytes, vector_index_config
+
+
+def settings(args):
+    """(label, compression, pq segments) for every run"""
+    runs = []
+    for compression in args.compressions:
+        if compression == 'pq':
+            runs.extend((f'pq{segments}' if segments else 'pq', 'pq', segments) for segments in args.pq_segments)
+        else:
+            runs.append((compression, compression, 0))
+    return runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--file', type=Path, help='Chunks file or dataset (default: the newest chunks file)')
+    parser.add_argument('--limit', type=int, help='Use only the first N chunks')
+    parser.add_argument('--golden', type=Path, default=DEFAULT_GOLDEN)
+    parser.add_argument('--compressions', nargs='+', choices=COMPRESSIONS, default=list(COMPRESSIONS))
+    parser.add_argument('--pq-segments', type=int, nargs='+', default=[0],
+                        help="PQ segment counts to try (0 lets Weaviate choose)")
+    parser.add_argument('--training-limit', type=int, default=COMPRESSION_TRAINING_LIMIT)
+    parser.add_argument('--k', type=int, nargs='+', default=[5, 10])
+    parser.add_argument('--repeat', type=int, default=3, help='Passes over the questions, for stabler latency')
+    parser.add_argument('--embed-cache', default=EMBED_CACHE_PATH)
+    parser.add_argument('--metrics-url', default=DEFAULT_METRICS_URL, help="Weaviate's Prometheus metrics ('' to skip)")
+    parser.add_argument('--keep', action='store_true', help='Keep the Bench_* collections for inspection')
+    parser.add_argument('--label', default='', help='Free-form label stored with the results')
+    parser.add_argument('--output', type=Path, help='Result file (default: benchmarks/results/)')
+    args = parser.parse_args()
+
+    chunks_file = args.file or latest_chunks_file()
+    embedder = OllamaEmbedder(cache=EmbeddingCache(args.embed_cache))
+    print(f"Loading vectors for {chunks_file}...", file=sys.stderr)
+    vectors = load_corpus_vectors(chunks_file, embedder, args.limit)
+    query_vectors = embedder.embed(load_questions(args.golden))
+    dim, k_max = len(vectors[0]), max(args.k)
+    training_limit = min(args.training_limit, len(vectors))
+
+    client = weaviate.connect_to_local()
+    try:
+        truth = exact_neighbours(client, vectors, query_vectors, k_max)
+
+        metrics, samples, rows = {}, {}, []
+        for label, compression, segments in settings(args):
+            print(f"Building {label} index over {len(vectors)} vectors...", file=sys.stderr)
+            name = f"{BENCH_PREFIX}{label.capitalize()}"
+            heap_before = heap_bytes(args.metrics_url)
+            build_seconds, compressed = build_collection(
+                client, name, vectors, vector_index_config(compression, training_limit, segments),
+                compressed=compression != 'none'
+            )
+            heap_after = heap_bytes(args.metrics_url)
+            if compression != 'none' and not compressed:
+                print(f"  {label}: index was not compressed, it is measured as uncompressed", file=sys.stderr)
+
+            collection = client.collections.get(name)
+            if compression == 'pq' and not segments:
+                # Report the segment count Weaviate picked
+                segments = getattr(collection.config.get().vector_index_config.quantizer, 'segments', 0)
+            results, latencies = run_queries(collection, query_vectors, k_max, args.repeat)
+            if not args.keep:
+                client.collections.delete(name)
+
+            estimate = estimate_index_bytes(len(vectors), dim, compression if compressed else 'none', segments)
+            row = {'index': label, 'compressed': compressed, 'build_s': build_seconds,
+                   'vector_mb': estimate['vector_bytes'] / 1e6, 'index_mb': estimate['total_bytes'] / 1e6}
+            metrics[f'{label}_build_seconds'] = build_seconds
+            metrics[f'{label}_vector_memory_bytes'] = estimate['vector_bytes']
+            metrics[f'{label}_index_memory_bytes'] = estimate['total_bytes']
+            if heap_before is not None and heap_after is not None:
+                metrics[f'{label}_heap_delta_bytes'] = heap_after - heap_before
+                row['heap_delta_mb'] = (heap_after - heap_before) / 1e6
+            for k in args.k:
+                metrics[f'{label}_recall_at_{k}'] = row[f'recall@{k}'] = recall_at_k(results, truth, k)
+            samples[f'{label}_latency_ms'] = latencies
+            metrics.update(summarize(latencies, prefix=f'{label}_latency_ms_'))
+            row['p50_ms'], row['p95_ms'] = metrics[f'{label}_latency_ms_p50'], metrics[f'{label}_latency_ms_p95']
+            rows.append(row)
+    finally:
+        client.close()
+
+    baseline = next((row for row in rows if row['index'] == 'none'), None)
+    if baseline:
+        for row in rows:
+            row['memory_x'] = baseline['vector_mb'] / row['vector_mb']
+
+    print(f"\n{len(vectors)} vectors of {dim} dimensions, {len(query_vectors)} questions, "
+          f"recall against exact search\n")
+    columns = ['index', 'compressed', 'build_s', 'vector_mb', 'index_mb', 'memory_x', 'heap_delta_mb']
+    print_table(rows, [c for c in columns if any(c in row for row in rows)]
+                + [f'recall@{k}' for k in args.k] + ['p50_ms', 'p95_ms'])
+
+    path = write_results('compression', metrics, samples, config={
+        'file': str(chunks_file),
+        'vectors': len(vectors),
+        'dim': dim,
+        'questions': len(query_vectors),
+        'training_limit': training_limit,
+        'embed_model': embedder.model,
+        'repeat': args.repeat,
+        'label': args.label
+    }, output=args.output)
+    print(f"\nResults written to {path}")
+
+
+if __name__ == '__main__':
+    main()
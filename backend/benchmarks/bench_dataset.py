@@ -0,0 +1,84 @@
+"""Compare full-corpus scans of the JSONL chunks file and its columnar datasets.
+
+A scan loads the file and touches every chunk: total content length and the
+number of distinct chapters. The JSONL file is parsed line by line, the Arrow
+IPC file is memory-mapped and the Parquet file is decoded. Also reports the
+size of each file on disk.
+
+    python benchmarks/bench_dataset.py --repeat 20
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from chunk_dataset import build_table, read_dataset, write_dataset
+from chunk_reader import iter_chunks
+from common import print_table, summarize, write_results
+
+import pyarrow.compute as pc
+
+
+def scan_jsonl(path: Path):
+    total, chapters = 0, set()
+    for _, chunk in iter_chunks(path, workers=1):
+        total += len(chunk['content'].encode('utf-8'))
+        chapters.add(chunk['url'])
+    return total, len(chapters)
+
+
+def scan_dataset(path: Path):
+    table = read_dataset(path, columns=['content', 'url'])
+    total = pc.sum(pc.binary_length(table.column('content'))).as_py()
+    # One url per chapter page
+    chapters = len(table.column('url').unique())
+    return total, chapters
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--file', type=Path, help='JSONL chunks file (default: the newest one)')
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--output', type=Path, help='Result file (default: benchmarks/results/)')
+    args = parser.parse_args()
+
+    source = args.file or sorted(
+        (BACKEND_DIR / 'scrape' / 'raw_data' / 'chunks').glob('*.jsonl'), key=lambda p: p.stat().st_mtime
+    )[-1]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        table = build_table([properties for _, properties in iter_chunks(source)])
+        files = {
+            'jsonl': (source, scan_jsonl),
+            'arrow': (write_dataset(table, Path(tmp) / 'chunks.arrow'), scan_dataset),
+            'parquet': (write_dataset(table, Path(tmp) / 'chunks.parquet'), scan_dataset),
+        }
+
+        metrics, samples, rows = {}, {}, []
+        for name, (path, scan) in files.items():
+            durations = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                total, chapters = scan(path)
+                durations.append((time.perf_counter() - start) * 1000)
+            samples[f'{name}_scan_ms'] = durations
+            metrics.update(summarize(durations, prefix=f'{name}_scan_ms_'))
+            metrics[f'{name}_bytes'] = path.stat().st_size
+            rows.append({'format': name, 'scan_ms_p50': metrics[f'{name}_scan_ms_p50'],
+                         'size_mb': path.stat().st_size / 1e6, 'content_mb': total / 1e6, 'chapters': chapters})
+
+    print_table(rows, ['format', 'scan_ms_p50', 'size_mb', 'content_mb', 'chapters'])
+    path = write_results('dataset', metrics, samples, config={
+        'file': str(source),
+        'chunks': table.num_rows,
+        'repeat': args.repeat
+    }, output=args.output)
+    print(f"\nResults written to {path}")
+
+
+if __name__ == '__main__':
+    main()
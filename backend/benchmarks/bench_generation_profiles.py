@@ -0,0 +1,111 @@
+"""Measure latency and answer length of each Ollama generation profile.
+
+Run from the backend directory with Ollama running locally:
+
+    python benchmarks/bench_generation_profiles.py --runs 5
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common import print_table, summarize, write_results
+from generation_profiles import GENERATION_PROFILES, build_generate_payload
+
+# A fixed, realistically sized RAG prompt so only the profile varies between runs
+CONTEXT = (
+    "[Vol 7.A.1] Purpose and Background\n"
+    "Adjustment of status is the process by which an eligible applicant already in the "
+    "United States can obtain lawful permanent resident status without returning to their "
+    "home country to complete visa processing. An applicant must be inspected and admitted "
+    "or paroled, be eligible to receive an immigrant visa, and have an immigrant visa "
+    "immediately available at the time of filing and at the time of approval."
+)
+QUESTIONS = [
+    "What is adjustment of status?",
+    "Who is eligible to adjust status and what are the main requirements?",
+    "Explain the difference between adjustment of status and consular processing."
+]
+
+
+def build_prompt(question: str) -> str:
+    return (
+        "<s>[INST] You are an immigration expert specializing in USCIS policies and procedures.\n\n"
+        f"Current context from USCIS Policy Manual:\n{CONTEXT}\n\n"
+        f"Question: {question} [/INST]</s>"
+    )
+
+
+def run_profile(base_url: str, model: str, profile: str, runs: int):
+    latencies, lengths, rates, loads = [], [], [], []
+    for run in range(runs):
+        for question in QUESTIONS:
+            start = time.time()
+            response = requests.post(
+                f"{base_url}/api/generate",
+                json=build_generate_payload(model, build_prompt(question), profile)
+            )
+            response.raise_for_status()
+            elapsed = time.time() - start
+            body = response.json()
+
+            latencies.append(elapsed)
+            lengths.append(body.get('eval_count', 0))
+            loads.append(body.get('load_duration', 0) / 1e9)
+            eval_seconds = body.get('eval_duration', 0) / 1e9
+            if eval_seconds:
+                rates.append(body.get('eval_count', 0) / eval_seconds)
+    return latencies, lengths, rates, loads
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ollama-url', default='http://localhost:11434')
+    parser.add_argument('--model', default='llama3.2')
+    parser.add_argument('--profiles', nargs='+', default=list(GENERATION_PROFILES))
+    parser.add_argument('--runs', type=int, default=3, help='Passes over the question set per profile')
+    parser.add_argument('--output', type=Path, help='Result file (default: benchmarks/results/)')
+    args = parser.parse_args()
+
+    # Load the model once so the first profile doesn't pay for it
+    requests.post(f"{args.ollama_url}/api/generate",
+                  json={"model": args.model, "prompt": "", "keep_alive": "30m"}).raise_for_status()
+
+    rows, metrics, samples = [], {}, {}
+    for profile in args.profiles:
+        print(f"Running profile '{profile}'...")
+        latencies, lengths, rates, loads = run_profile(args.ollama_url, args.model, profile, args.runs)
+
+        stats = summarize(latencies, prefix='latency_')
+        row = {
+            'profile': profile,
+            'p50_s': stats['latency_p50'],
+            'p95_s': stats['latency_p95'],
+            'avg_tokens': sum(lengths) / len(lengths),
+            'tokens_per_s': sum(rates) / len(rates) if rates else 0.0,
+            'avg_load_s': sum(loads) / len(loads)
+        }
+        rows.append(row)
+
+        metrics.update({f'{profile}.{key}': value for key, value in stats.items()})
+        metrics[f'{profile}.avg_tokens'] = row['avg_tokens']
+        metrics[f'{profile}.tokens_per_s'] = row['tokens_per_s']
+        samples[f'{profile}.latency'] = latencies
+
+    print()
+    print_table(rows, ['profile', 'p50_s', 'p95_s', 'avg_tokens', 'tokens_per_s', 'avg_load_s'])
+
+    path = write_results('generation_profiles', metrics, samples, config={
+        'model': args.model,
+        'runs': args.runs,
+        'profiles': {name: GENERATION_PROFILES[name] for name in args.profiles}
+    }, output=args.output)
+    print(f"\nResults written to {path}")
+
+
+if __name__ == '__main__':
+    main()
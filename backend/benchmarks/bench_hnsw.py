@@ -0,0 +1,147 @@
+"""Sweep HNSW parameters (ef, efConstruction, maxConnections) and print the Pareto frontier.
+
+One collection is built from the corpus vectors for every efConstruction x
+maxConnections pair. ef only affects search, so it is changed on the built
+collection rather than rebuilding for it. Each setting is scored on build
+time, estimated index memory (plus Go heap growth when Weaviate's Prometheus
+endpoint is up), query latency of the golden questions, and recall@k
+against exact nearest neighbours from a flat (brute force) index.
+
+The frontier holds the settings that no other setting beats on recall,
+p95 latency and memory at once. Pick production values from it and set
+HNSW_EF, HNSW_EF_CONSTRUCTION and HNSW_MAX_CONNECTIONS for the next reindex.
+
+    python benchmarks/bench_hnsw.py
+    python benchmarks/bench_hnsw.py --ef 32 64 128 --ef-construction 64 128 --max-connections 16 32 --k 10
+"""
+import argparse
+import itertools
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+import weaviate
+
+from common import print_table, summarize, write_results
+from embedding_cache import EMBED_CACHE_PATH, EmbeddingCache
+from embeddings import OllamaEmbedder
+from vector_bench import (BENCH_PREFIX, DEFAULT_GOLDEN, DEFAULT_METRICS_URL, build_collection, exact_neighbours,
+                          heap_bytes, latest_chunks_file, load_corpus_vectors, load_questions, pareto_front,
+                          recall_at_k, run_queries)
+from vector_index import (COMPRESSION_TRAINING_LIMIT, COMPRESSIONS, VECTOR_COMPRESSION, current_compression,
+                          estimate_index_bytes, vector_index_config)
+
+COLUMNS = ['setting', 'ef', 'ef_construction', 'max_connections', 'build_s', 'index_mb', 'heap_delta_mb',
+           'recall', 'p50_ms', 'p95_ms']
+
+
+def set_ef(collection, ef: int):
+    from weaviate.classes.config import Reconfigure
+    collection.config.update(vector_index_config=Reconfigure.VectorIndex.hnsw(ef=ef))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--file', type=Path, help='Chunks file or dataset (default: the newest chunks file)')
+    parser.add_argument('--limit', type=int, help='Use only the first N chunks')
+    parser.add_argument('--golden', type=Path, default=DEFAULT_GOLDEN)
+    parser.add_argument('--ef', type=int, nargs='+', default=[16, 32, 64, 128, 256])
+    parser.add_argument('--ef-construction', type=int, nargs='+', default=[64, 128, 256])
+    parser.add_argument('--max-connections', type=int, nargs='+', default=[16, 32, 64])
+    parser.add_argument('--compression', choices=COMPRESSIONS, default=VECTOR_COMPRESSION,
+                        help='Sweep a compressed index instead')
+    parser.add_argument('--k', type=int, default=10, help='Results per query, recall is measured at k')
+    parser.add_argument('--repeat', type=int, default=3, help='Passes over the questions, for stabler latency')
+    parser.add_argument('--embed-cache', default=EMBED_CACHE_PATH)
+    parser.add_argument('--metrics-url', default=DEFAULT_METRICS_URL, help="Weaviate's Prometheus metrics ('' to skip)")
+    parser.add_argument('--label', default='', help='Free-form label stored with the results')
+    parser.add_argument('--output', type=Path, help='Result file (default: benchmarks/results/)')
+    args = parser.parse_args()
+
+    chunks_file = args.file or latest_chunks_file()
+    embedder = OllamaEmbedder(cache=EmbeddingCache(args.embed_cache))
+    print(f"Loading vectors for {chunks_file}...", file=sys.stderr)
+    vectors = load_corpus_vectors(chunks_file, embedder, args.limit)
+    query_vectors = embedder.embed(load_questions(args.golden))
+    dim = len(vectors[0])
+
+    client = weaviate.connect_to_local()
+    metrics, samples, rows = {}, {}, []
+    try:
+        truth = exact_neighbours(client, vectors, query_vectors, args.k)
+
+        for ef_construction, max_connections in itertools.product(args.ef_construction, args.max_connections):
+            name = f"{BENCH_PREFIX}Hnsw"
+            print(f"Building efConstruction={ef_construction} maxConnections={max_connections} "
+                  f"over {len(vectors)} vectors...", file=sys.stderr)
+            heap_before = heap_bytes(args.metrics_url)
+            build_seconds, compressed = build_collection(client, name, vectors, vector_index_config(
+                args.compression, training_limit=min(COMPRESSION_TRAINING_LIMIT, len(vectors)),
+                ef_construction=ef_construction, max_connections=max_connections
+            ), compressed=args.compression != 'none')
+            heap_after = heap_bytes(args.metrics_url)
+
+            collection = client.collections.get(name)
+            # Estimate what Weaviate built, which is uncompressed until training has finished
+            config = collection.config.get()
+            compression = current_compression(config) if compressed else 'none'
+            if compression != args.compression:
+                print(f"  index was built as {compression}, not {args.compression}", file=sys.stderr)
+            segments = getattr(config.vector_index_config.quantizer, 'segments', 0) if compression == 'pq' else 0
+            estimate = estimate_index_bytes(len(vectors), dim, compression, segments, max_connections=max_connections)
+            for ef in args.ef:
+                set_ef(collection, ef)
+                results, latencies = run_queries(collection, query_vectors, args.k, args.repeat)
+                setting = f"ef{ef}_efc{ef_construction}_m{max_connections}"
+                row = {
+                    'setting': setting, 'ef': ef, 'ef_construction': ef_construction,
+                    'max_connections': max_connections, 'build_s': build_seconds,
+                    'index_mb': estimate['total_bytes'] / 1e6,
+                    'recall': recall_at_k(results, truth, args.k)
+                }
+                latency = summarize(latencies, prefix='latency_ms_')
+                row['p50_ms'], row['p95_ms'] = latency['latency_ms_p50'], latency['latency_ms_p95']
+                if heap_before is not None and heap_after is not None:
+                    row['heap_delta_mb'] = (heap_after - heap_before) / 1e6
+                    metrics[f'{setting}_heap_delta_bytes'] = heap_after - heap_before
+                rows.append(row)
+
+                samples[f'{setting}_latency_ms'] = latencies
+                metrics.update({f'{setting}_{key}': value for key, value in latency.items()})
+                metrics[f'{setting}_recall_at_{args.k}'] = row['recall']
+                metrics[f'{setting}_build_seconds'] = build_seconds
+                metrics[f'{setting}_index_memory_bytes'] = estimate['total_bytes']
+            client.collections.delete(name)
+    finally:
+        client.close()
+
+    columns = [c for c in COLUMNS if any(c in row for row in rows)]
+    print(f"\n{len(vectors)} vectors of {dim} dimensions, {len(query_vectors)} questions, "
+          f"recall@{args.k} against exact search\n")
+    print_table(rows, columns)
+
+    front = sorted(pareto_front(rows, maximize=['recall'], minimize=['p95_ms', 'index_mb']),
+                   key=lambda row: (-row['recall'], row['p95_ms']))
+    print(f"\nPareto frontier (recall vs p95 latency vs memory), {len(front)} of {len(rows)} settings:\n")
+    print_table(front, columns)
+
+    path = write_results('hnsw', metrics, samples, config={
+        'file': str(chunks_file),
+        'vectors': len(vectors),
+        'dim': dim,
+        'questions': len(query_vectors),
+        'k': args.k,
+        'compression': args.compression,
+        'grid': {'ef': args.ef, 'ef_construction': args.ef_construction, 'max_connections': args.max_connections},
+        'pareto': [row['setting'] for row in front],
+        'embed_model': embedder.model,
+        'repeat': args.repeat,
+        'label': args.label
+    }, output=args.output)
+    print(f"\nResults written to {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""Measure end-to-end import time of the policy manual per embedding mode.
+
+'weaviate' leaves embedding to the text2vec-ollama module, one object per
+request; 'client' batches texts into Ollama /api/embed calls in the importer
+and supplies the vectors. Each run imports into a fresh Bench_Import collection,
+deleted afterwards; the collection the API serves isn't touched.
+
+    python benchmarks/bench_import.py --modes weaviate client --repeat 2
+    python benchmarks/bench_import.py --modes client --embed-batch-size 64 --embed-parallelism 4
+"""
+import argparse
+import importlib.util
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from common import print_table, summarize, write_results
+from embeddings import EMBED_BATCH_SIZE, EMBED_PARALLELISM, OllamaEmbedder
+from profiler import peak_memory_bytes
+from vector_bench import BENCH_PREFIX
+
+BENCH_COLLECTION = f"{BENCH_PREFIX}Import"
+
+
+def load_importer_module():
+    """Load weaviate/2_import_data.py, whose name isn't importable"""
+    spec = importlib.util.spec_from_file_location('import_data', BACKEND_DIR / 'weaviate' / '2_import_data.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_import(import_data, chunks_file: Path, mode: str, args):
+    embedder = None
+    if mode == 'client':
+        embedder = OllamaEmbedder(batch_size=args.embed_batch_size, parallelism=args.embed_parallelism)
+    # A throwaway collection, so the one the API serves (and its checkpoint) is left alone;
+    # recreated on every run since imports are otherwise incremental and would skip everything
+    importer = import_data.WeaviateImporter(
+        batch_mode=args.batch_mode,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        embedder=embedder,
+        recreate=True,
+        collection_name=BENCH_COLLECTION
+    )
+    try:
+        with tempfile.TemporaryDirectory() as checkpoint_dir:
+            return importer.import_chunks(chunks_file, checkpoint_path=Path(checkpoint_dir) / 'checkpoint.json')
+    finally:
+        importer.client.collections.delete(BENCH_COLLECTION)
+        importer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--file', type=Path, help='Chunks file (default: the newest one)')
+    parser.add_argument('--modes', nargs='+', choices=['weaviate', 'client'], default=['weaviate', 'client'])
+    parser.add_argument('--repeat', type=int, default=1, help='Imports per mode')
+    parser.add_argument('--batch-mode', choices=['dynamic', 'fixed'], default='dynamic')
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=2)
+    parser.add_argument('--embed-batch-size', type=int, default=EMBED_BATCH_SIZE)
+    parser.add_argument('--embed-parallelism', type=int, default=EMBED_PARALLELISM)
+    parser.add_argument('--label', default='', help='Free-form label stored with the results')
+    parser.add_argument('--output', type=Path, help='Result file (default: benchmarks/results/)')
+    args = parser.parse_args()
+
+    import_data = load_importer_module()
+    chunks_file = args.file or sorted(
+        (BACKEND_DIR / 'scrape' / 'raw_data' / 'chunks').glob('*.jsonl'), key=lambda p: p.stat().st_mtime
+    )[-1]
+
+    metrics, samples, rows = {}, {}, []
+    for mode in args.modes:
+        durations, embed_durations, objects, failed = [], [], 0, 0
+        for run in range(args.repeat):
+            print(f"Importing with {mode} embedding ({run + 1}/{args.repeat})...", file=sys.stderr)
+            stats = run_import(import_data, chunks_file, mode, args)
+            durations.append(stats.elapsed)
+            embed_durations.append(stats.embed_seconds)
+            objects, failed = stats.objects, failed + stats.failed
+
+        samples[f'{mode}_import_seconds'] = durations
+        metrics.update(summarize(durations, prefix=f'{mode}_import_seconds_'))
+        metrics[f'{mode}_objects_per_s'] = objects / metrics[f'{mode}_import_seconds_mean']
+        metrics[f'{mode}_failed'] = failed
+        if mode == 'client':
+            metrics['client_embed_request_seconds_mean'] = sum(embed_durations) / len(embed_durations)
+        rows.append({
+            'mode': mode,
+            'objects': objects,
+            'seconds_mean': metrics[f'{mode}_import_seconds_mean'],
+            'objects_per_s': metrics[f'{mode}_objects_per_s'],
+            'failed': failed
+        })
+
+    if 'weaviate' in args.modes and 'client' in args.modes:
+        metrics['client_speedup'] = metrics['weaviate_import_seconds_mean'] / metrics['client_import_seconds_mean']
+
+    # Peak over all modes and repeats, since they share the process
+    metrics['peak_memory_bytes'] = peak_memory_bytes()
+
+    print_table(rows, ['mode', 'objects', 'seconds_mean', 'objects_per_s', 'failed'])
+    if 'client_speedup' in metrics:
+        print(f"\nClient-side embedding speedup: {metrics['client_speedup']:.2f}x")
+
+    path = write_results('import', metrics, samples, config={
+        'file': str(chunks_file),
+        'modes': args.modes,
+        'repeat': args.repeat,
+        'batch_mode': args.batch_mode,
+        'batch_size': args.batch_size,
+        'concurrency': args.concurrency,
+        'embed_batch_size': args.embed_batch_size,
+        'embed_parallelism': args.embed_parallelism,
+        'label': args.label
+    }, output=args.output)
+    print(f"\nResults written to {path}")
+
+
+if __name__ == '__main__':
+    main()
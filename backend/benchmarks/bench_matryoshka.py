@@ -0,0 +1,119 @@
+"""Measure recall, memory and latency of Matryoshka-truncated embeddings per dimension.
+
+The corpus and golden questions are embedded once at full size (through the
+embedding cache), then truncated to each --dimensions value the way
+EMBED_DIMENSIONS does it: layer norm, keep the first N dimensions,
+renormalise. One HNSW collection is built per size. recall@k is measured
+against exact nearest neighbours of the full vectors, so it shows what
+truncation and HNSW lose together; the full-size row is the reference.
+
+    python benchmarks/bench_matryoshka.py --dimensions 768 512 256 128 --k 5 10
+"""
+import argparse
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+import weaviate
+
+from common import print_table, summarize, write_results
+from embedding_cache import EMBED_CACHE_PATH, EmbeddingCache
+from embeddings import OllamaEmbedder, truncate_embedding
+from vector_bench import (BENCH_PREFIX, DEFAULT_GOLDEN, DEFAULT_METRICS_URL, build_collection, exact_neighbours,
+                          heap_bytes, latest_chunks_file, load_corpus_vectors, load_questions, recall_at_k,
+                          run_queries)
+from vector_index import COMPRESSION_TRAINING_LIMIT, COMPRESSIONS, estimate_index_bytes, vector_index_config
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--file', type=Path, help='Chunks file or dataset (default: the newest chunks file)')
+    parser.add_argument('--limit', type=int, help='Use only the first N chunks')
+    parser.add_argument('--golden', type=Path, default=DEFAULT_GOLDEN)
+    parser.add_argument('--dimensions', type=int, nargs='+', default=[768, 512, 256, 128])
+    parser.add_argument('--compression', choices=COMPRESSIONS, default='none',
+                        help='Also compress every index, to see how the two combine')
+    parser.add_argument('--k', type=int, nargs='+', default=[5, 10])
+    parser.add_argument('--repeat', type=int, default=3, help='Passes over the questions, for stabler latency')
+    parser.add_argument('--embed-cache', default=EMBED_CACHE_PATH)
+    parser.add_argument('--metrics-url', default=DEFAULT_METRICS_URL, help="Weaviate's Prometheus metrics ('' to skip)")
+    parser.add_argument('--label', default='', help='Free-form label stored with the results')
+    parser.add_argument('--output', type=Path, help='Result file (default: benchmarks/results/)')
+    args = parser.parse_args()
+
+    chunks_file = args.file or latest_chunks_file()
+    # Full vectors, whatever EMBED_DIMENSIONS says; each size is cut from them below
+    embedder = OllamaEmbedder(cache=EmbeddingCache(args.embed_cache), dimensions=0)
+    print(f"Loading vectors for {chunks_file}...", file=sys.stderr)
+    vectors = load_corpus_vectors(chunks_file, embedder, args.limit)
+    query_vectors = embedder.embed(load_questions(args.golden))
+    full_dim, k_max = len(vectors[0]), max(args.k)
+    dimensions = sorted({min(dim, full_dim) for dim in args.dimensions}, reverse=True)
+
+    client = weaviate.connect_to_local()
+    metrics, samples, rows = {}, {}, []
+    try:
+        truth = exact_neighbours(client, vectors, query_vectors, k_max)
+
+        for dim in dimensions:
+            print(f"Building {dim}-dimension index over {len(vectors)} vectors...", file=sys.stderr)
+            truncated = [truncate_embedding(vector, dim) for vector in vectors]
+            queries = [truncate_embedding(vector, dim) for vector in query_vectors]
+
+            name = f"{BENCH_PREFIX}Dim{dim}"
+            heap_before = heap_bytes(args.metrics_url)
+            build_seconds, compressed = build_collection(
+                client, name, truncated,
+                vector_index_config(args.compression, training_limit=min(COMPRESSION_TRAINING_LIMIT, len(vectors))),
+                compressed=args.compression != 'none'
+            )
+            heap_after = heap_bytes(args.metrics_url)
+            results, latencies = run_queries(client.collections.get(name), queries, k_max, args.repeat)
+            client.collections.delete(name)
+
+            label = f'dim{dim}'
+            estimate = estimate_index_bytes(len(vectors), dim, args.compression if compressed else 'none')
+            row = {'dimensions': dim, 'build_s': build_seconds, 'vector_mb': estimate['vector_bytes'] / 1e6,
+                   'index_mb': estimate['total_bytes'] / 1e6}
+            metrics[f'{label}_build_seconds'] = build_seconds
+            metrics[f'{label}_vector_memory_bytes'] = estimate['vector_bytes']
+            metrics[f'{label}_index_memory_bytes'] = estimate['total_bytes']
+            if heap_before is not None and heap_after is not None:
+                metrics[f'{label}_heap_delta_bytes'] = heap_after - heap_before
+                row['heap_delta_mb'] = (heap_after - heap_before) / 1e6
+            for k in args.k:
+                metrics[f'{label}_recall_at_{k}'] = row[f'recall@{k}'] = recall_at_k(results, truth, k)
+            samples[f'{label}_latency_ms'] = latencies
+            metrics.update(summarize(latencies, prefix=f'{label}_latency_ms_'))
+            row['p50_ms'], row['p95_ms'] = metrics[f'{label}_latency_ms_p50'], metrics[f'{label}_latency_ms_p95']
+            rows.append(row)
+    finally:
+        client.close()
+
+    for row in rows:
+        row['memory_x'] = rows[0]['vector_mb'] / row['vector_mb']
+
+    print(f"\n{len(vectors)} vectors, {len(query_vectors)} questions, "
+          f"recall against exact search over the full {full_dim} dimensions\n")
+    columns = ['dimensions', 'build_s', 'vector_mb', 'index_mb', 'memory_x', 'heap_delta_mb']
+    print_table(rows, [c for c in columns if any(c in row for row in rows)]
+                + [f'recall@{k}' for k in args.k] + ['p50_ms', 'p95_ms'])
+
+    path = write_results('matryoshka', metrics, samples, config={
+        'file': str(chunks_file),
+        'vectors': len(vectors),
+        'full_dimensions': full_dim,
+        'dimensions': dimensions,
+        'compression': args.compression,
+        'questions': len(query_vectors),
+        'embed_model': embedder.model,
+        'repeat': args.repeat,
+        'label': args.label
+    }, output=args.output)
+    print(f"\nResults written to {path}")
+
+
+if __name__ == '__main__':
+    main()
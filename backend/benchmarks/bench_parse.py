@@ -0,0 +1,94 @@
+"""Measure chunks file parsing throughput, serial versus byte-range parallel.
+
+The chunks file is repeated --scale times into a temporary file to stand in
+for a larger corpus. 'serial' is the importer's previous line-by-line
+json.loads loop; 'workers_N' is chunk_reader.iter_chunks with N processes
+(and orjson when it is installed).
+
+    python benchmarks/bench_parse.py --scale 50 --workers 1 2 4 8
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from chunk_reader import chunk_properties, iter_chunks, orjson
+from common import print_table, write_results
+
+
+def parse_serial(path: Path) -> int:
+    count = 0
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                chunk_properties(json.loads(line))
+                count += 1
+    return count
+
+
+def parse_parallel(path: Path, workers: int, range_size: int) -> int:
+    return sum(1 for _ in iter_chunks(path, workers=workers, range_size=range_size))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--file', type=Path, help='Chunks file (default: the newest one)')
+    parser.add_argument('--scale', type=int, default=20, help='Times the file is repeated')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--range-mb', type=float, default=4.0, help='Byte range size per task')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', type=Path, help='Result file (default: benchmarks/results/)')
+    args = parser.parse_args()
+
+    source = args.file or sorted(
+        (BACKEND_DIR / 'scrape' / 'raw_data' / 'chunks').glob('*.jsonl'), key=lambda p: p.stat().st_mtime
+    )[-1]
+    data = source.read_bytes()
+    if not data.endswith(b'\n'):
+        data += b'\n'
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = Path(tmp) / 'corpus.jsonl'
+        corpus.write_bytes(data * args.scale)
+        size_mb = corpus.stat().st_size / 1e6
+        range_size = int(args.range_mb * 1024 * 1024)
+
+        runs = {'serial': lambda: parse_serial(corpus)}
+        for workers in args.workers:
+            runs[f'workers_{workers}'] = lambda workers=workers: parse_parallel(corpus, workers, range_size)
+
+        metrics, samples, rows = {}, {}, []
+        for name, run in runs.items():
+            durations = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                count = run()
+                durations.append(time.perf_counter() - start)
+            best = min(durations)
+            samples[f'{name}_seconds'] = durations
+            metrics[f'{name}_seconds_mean'] = sum(durations) / len(durations)
+            metrics[f'{name}_mb_per_s'] = size_mb / best
+            rows.append({'run': name, 'chunks': count, 'best_s': best, 'mb_per_s': size_mb / best,
+                         'speedup': metrics[f'{name}_mb_per_s'] / metrics['serial_mb_per_s']})
+
+    print(f"{size_mb:.1f} MB, orjson {'enabled' if orjson else 'not installed'}\n")
+    print_table(rows, ['run', 'chunks', 'best_s', 'mb_per_s', 'speedup'])
+
+    path = write_results('parse', metrics, samples, config={
+        'file': str(source),
+        'scale': args.scale,
+        'size_mb': size_mb,
+        'range_mb': args.range_mb,
+        'orjson': bool(orjson),
+        'repeat': args.repeat
+    }, output=args.output)
+    print(f"\nResults written to {path}")
+
+
+if __name__ == '__main__':
+    main()
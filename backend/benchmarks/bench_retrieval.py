@@ -0,0 +1,145 @@
+"""Measure retrieval quality and latency over a golden question set.
+
+Each golden question lists target locations in the Policy Manual (volume, and
+optionally part and chapter). A retrieved chunk is relevant when it matches all
+fields of a target. Reports recall@k, MRR, latency percentiles, the average
+number of context tokens that would be sent to the model and the peak memory of
+the benchmark process.
+
+By default the API's own get_relevant_context is benchmarked, with the retrieval
+settings read from HYBRID_ALPHA, RETRIEVAL_LIMIT, CONTEXT_SCORE_CUTOFF,
+PARENT_EXPANSION and CONTEXT_TOKEN_BUDGET:
+
+    HYBRID_ALPHA=0.5 python benchmarks/bench_retrieval.py --label alpha-0.5
+    PARENT_EXPANSION=0 python benchmarks/bench_retrieval.py --label children-only
+
+Any other backend can be passed as module:callable, taking a question and
+returning chunk dicts with volume_number/part_letter/chapter_number/content:
+
+    python benchmarks/bench_retrieval.py --backend my_index:search
+"""
+import argparse
+import importlib
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common import estimate_tokens, print_table, summarize, write_results
+from profiler import peak_memory_bytes
+
+DEFAULT_GOLDEN = Path(__file__).resolve().parent / 'golden_questions.jsonl'
+TARGET_FIELDS = ('volume_number', 'part_letter', 'chapter_number')
+
+
+def load_golden(path: Path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def load_backend(spec: str):
+    """Return (search, build_context) for 'api' or a 'module:callable' spec"""
+    if spec == 'api':
+        import api
+        return api.querier.get_relevant_context, api.querier.build_context
+
+    module_name, _, attr_path = spec.partition(':')
+    target = importlib.import_module(module_name)
+    for attr in attr_path.split('.'):
+        target = getattr(target, attr)
+    return target, lambda chunks: '\n\n'.join(chunk.get('content') or '' for chunk in chunks)
+
+
+def matches(chunk: dict, target: dict) -> bool:
+    return all(
+        str(chunk.get(field) or '').lower() == str(target[field]).lower()
+        for field in TARGET_FIELDS if field in target
+    )
+
+
+def score_question(chunks, targets, ks):
+    """Return (recall at each k, reciprocal rank) for one question"""
+    first_hit = {}
+    for rank, chunk in enumerate(chunks, start=1):
+        for i, target in enumerate(targets):
+            if i not in first_hit and matches(chunk, target):
+                first_hit[i] = rank
+    recalls = {k: sum(1 for rank in first_hit.values() if rank <= k) / len(targets) for k in ks}
+    reciprocal_rank = 1 / min(first_hit.values()) if first_hit else 0.0
+    return recalls, reciprocal_rank
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--golden', type=Path, default=DEFAULT_GOLDEN)
+    parser.add_argument('--backend', default='api', help="'api' or module:callable")
+    parser.add_argument('--k', type=int, nargs='+', default=[1, 3, 5, 8])
+    parser.add_argument('--repeat', type=int, default=1, help='Passes over the golden set, for stabler latency')
+    parser.add_argument('--label', default='', help='Free-form label stored with the results')
+    parser.add_argument('--output', type=Path, help='Result file (default: benchmarks/results/)')
+    args = parser.parse_args()
+
+    golden = load_golden(args.golden)
+    search, build_context = load_backend(args.backend)
+
+    # Warm up connections and caches outside the measurement
+    search(golden[0]['question'])
+
+    latencies, context_tokens, reciprocal_ranks = [], [], []
+    recall_sums = {k: 0.0 for k in args.k}
+    misses = []
+    for _ in range(args.repeat):
+        for item in golden:
+            start = time.perf_counter()
+            chunks = search(item['question'])
+            latencies.append((time.perf_counter() - start) * 1000)
+
+            context_tokens.append(estimate_tokens(build_context(chunks)))
+            recalls, reciprocal_rank = score_question(chunks, item['targets'], args.k)
+            reciprocal_ranks.append(reciprocal_rank)
+            for k in args.k:
+                recall_sums[k] += recalls[k]
+            if reciprocal_rank == 0.0:
+                misses.append(item['question'])
+
+    runs = len(golden) * args.repeat
+    metrics = {f'recall_at_{k}': recall_sums[k] / runs for k in args.k}
+    metrics['mrr'] = sum(reciprocal_ranks) / runs
+    metrics.update(summarize(latencies, prefix='latency_ms_'))
+    metrics['avg_context_tokens'] = sum(context_tokens) / runs
+    metrics['peak_memory_bytes'] = peak_memory_bytes()
+
+    print_table([metrics], [f'recall_at_{k}' for k in args.k] + ['mrr', 'latency_ms_p50', 'latency_ms_p95', 'avg_context_tokens'])
+    if misses:
+        print(f"\nNo relevant chunk retrieved for {len(set(misses))} question(s):")
+        for question in sorted(set(misses)):
+            print(f"  - {question}")
+
+    config = {
+        'backend': args.backend,
+        'golden': str(args.golden),
+        'questions': len(golden),
+        'repeat': args.repeat,
+        'label': args.label
+    }
+    if args.backend == 'api':
+        import api
+        config.update({
+            'alpha': api.HYBRID_ALPHA,
+            'limit': api.RETRIEVAL_LIMIT,
+            'score_cutoff': api.CONTEXT_SCORE_CUTOFF,
+            'parent_expansion': api.PARENT_EXPANSION,
+            'context_token_budget': api.CONTEXT_TOKEN_BUDGET
+        })
+    path = write_results('retrieval', metrics, {
+        'latency_ms': latencies,
+        'context_tokens': context_tokens,
+        'reciprocal_rank': reciprocal_ranks
+    }, config=config, output=args.output)
+    print(f"\nResults written to {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Measure append and tail-read latency of the chat session stores.
+
+Each operation is one chat turn: read the last few messages of a random session,
+then append a new message to it. Several worker processes share the store, like
+gunicorn workers would.
+
+    python benchmarks/bench_session_store.py --sessions 5000 --ops 20000 --workers 4
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from multiprocessing import Pool
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common import print_table, summarize, write_results
+from session_store import create_session_store
+
+ANSWER = "<h2>Answer</h2><p>" + "Lorem ipsum dolor sit amet. " * 40 + "</p>"
+
+
+def run_worker(args):
+    store_url, sessions, ops, tail, seed = args
+    store = create_session_store(store_url)
+    rng = random.Random(seed)
+    append_latencies, tail_latencies = [], []
+
+    start = time.perf_counter()
+    for _ in range(ops):
+        session_id = f"session-{rng.randrange(sessions)}"
+
+        t0 = time.perf_counter()
+        store.tail(session_id, tail)
+        t1 = time.perf_counter()
+        store.append(session_id, "What is the naturalization process?", ANSWER)
+        t2 = time.perf_counter()
+
+        tail_latencies.append((t1 - t0) * 1000)
+        append_latencies.append((t2 - t1) * 1000)
+    elapsed = time.perf_counter() - start
+
+    store.close()
+    return append_latencies, tail_latencies, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--store', help='Store URL (default: a fresh SQLite file in a temp dir)')
+    parser.add_argument('--sessions', type=int, default=5000, help='Number of distinct sessions')
+    parser.add_argument('--ops', type=int, default=20000, help='Total chat turns across all workers')
+    parser.add_argument('--workers', type=int, default=4, help='Worker processes sharing the store')
+    parser.add_argument('--tail', type=int, default=3, help='Messages read per turn')
+    parser.add_argument('--output', type=Path, help='Result file (default: benchmarks/results/)')
+    args = parser.parse_args()
+
+    store_url = args.store or f"sqlite:///{tempfile.mkdtemp()}/sessions.db"
+    # Create the schema once before the workers race for it
+    create_session_store(store_url).close()
+
+    per_worker = args.ops // args.workers
+    jobs = [(store_url, args.sessions, per_worker, args.tail, seed) for seed in range(args.workers)]
+    with Pool(args.workers) as pool:
+        results = pool.map(run_worker, jobs)
+
+    append_latencies = [value for result in results for value in result[0]]
+    tail_latencies = [value for result in results for value in result[1]]
+    wall = max(result[2] for result in results)
+    throughput = per_worker * args.workers / wall
+
+    metrics = {
+        **summarize(append_latencies, prefix='append_ms_'),
+        **summarize(tail_latencies, prefix='tail_ms_'),
+        'throughput_ops': throughput
+    }
+    print_table([
+        {'operation': 'append', 'p50_ms': metrics['append_ms_p50'], 'p95_ms': metrics['append_ms_p95'],
+         'p99_ms': metrics['append_ms_p99']},
+        {'operation': 'tail', 'p50_ms': metrics['tail_ms_p50'], 'p95_ms': metrics['tail_ms_p95'],
+         'p99_ms': metrics['tail_ms_p99']}
+    ], ['operation', 'p50_ms', 'p95_ms', 'p99_ms'])
+    print(f"\nThroughput: {throughput:.0f} chat turns/s across {args.workers} workers")
+
+    path = write_results('session_store', metrics, {
+        'append_ms': append_latencies,
+        'tail_ms': tail_latencies
+    }, config=dict(vars(args), store=store_url, output=str(args.output) if args.output else None),
+        output=args.output)
+    print(f"Results written to {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+import json
+import math
+import platform
+import re
+import socket
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an unsorted list, 0.0 for an empty list"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (words and punctuation), close to Llama tokenizers for English prose"""
+    return len(TOKEN_PATTERN.findall(text or ''))
+
+
+def summarize(values: Iterable[float], prefix: str = '') -> Dict[str, float]:
+    """Mean and p50/p95/p99 of a list of samples, keyed with an optional prefix"""
+    values = list(values)
+    return {
+        f'{prefix}mean': sum(values) / len(values) if values else 0.0,
+        f'{prefix}p50': percentile(values, 50),
+        f'{prefix}p95': percentile(values, 95),
+        f'{prefix}p99': percentile(values, 99),
+        f'{prefix}max': max(values) if values else 0.0
+    }
+
+
+def write_results(benchmark: str, metrics: Dict[str, float],
+                  samples: Optional[Dict[str, List[float]]] = None,
+                  config: Optional[Dict] = None,
+                  output: Optional[Path] = None) -> Path:
+    """Write a benchmark run as JSON and return the file path
+
+    metrics holds flat scalar values that runs are compared on, samples holds
+    the raw per-request measurements behind them for significance testing.
+    """
+    created_at = datetime.now()
+    if output is None:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        output = RESULTS_DIR / f"{benchmark}_{created_at.strftime('%Y%m%d_%H%M%S')}.json"
+
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        'benchmark': benchmark,
+        'created_at': created_at.isoformat(),
+        'host': socket.gethostname(),
+        'python': platform.python_version(),
+        'config': config or {},
+        'metrics': metrics,
+        'samples': samples or {}
+    }, indent=2), encoding='utf-8')
+    return output
+
+
+def load_results(path: Path) -> Dict:
+    """Load a benchmark result file written by write_results"""
+    return json.loads(Path(path).read_text(encoding='utf-8'))
+
+
+def print_table(rows: List[Dict], columns: List[str]):
+    """Print rows of dicts as an aligned text table"""
+    def fmt(value):
+        return f"{value:.3f}" if isinstance(value, float) else str(value)
+
+    widths = {
+        col: max([len(col)] + [len(fmt(row.get(col, ''))) for row in rows])
+        for col in columns
+    }
+    print('  '.join(col.ljust(widths[col]) for col in columns))
+    for row in rows:
+        print('  '.join(fmt(row.get(col, '')).ljust(widths[col]) for col in columns))
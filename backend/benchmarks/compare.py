@@ -0,0 +1,188 @@
+"""Compare two benchmark result files and fail on significant regressions.
+
+Every metric present in both files is checked against a threshold. A metric
+regresses when it moves in the bad direction by more than its threshold and,
+when raw samples were recorded for it, the move is statistically significant
+under a bootstrap of the samples. Exits 1 if any metric regressed.
+
+    python benchmarks/compare.py results/retrieval_baseline.json results/retrieval_new.json
+    python benchmarks/compare.py base.json new.json --thresholds deploy_thresholds.json
+
+A thresholds file maps metric name patterns (fnmatch) to rules, the first
+matching pattern wins:
+
+    {"latency*p99": {"relative": 0.25}, "recall_at_*": {"absolute": 0.02}}
+
+A rule may also set "direction" ("lower" or "higher" is better) and
+"ignore": true. Metrics whose direction can't be inferred from their name and
+that have no rule are reported but never fail the gate.
+"""
+import argparse
+import fnmatch
+import json
+import random
+import re
+import sys
+from pathlib import Path
+
+from common import load_results, percentile, print_table
+
+# Checked in order; the first matching pattern decides the direction
+DIRECTION_PATTERNS = [
+    ('higher', re.compile(r'recall|mrr|throughput|per_s|_ops$|hit_rate|tokens_per_s')),
+    ('lower', re.compile(r'latency|_ms|_s$|_s_|seconds|memory|peak|error|degraded|failed|tokens|bytes|_mb')),
+]
+DEFAULT_RULES = {
+    # A single outlier decides the max, too noisy to gate on
+    '*max': {'ignore': True},
+    'recall*': {'absolute': 0.02},
+    'mrr': {'absolute': 0.02},
+    '*error_rate': {'absolute': 0.01},
+    '*degraded_rate': {'absolute': 0.02},
+    '*throughput*': {'relative': 0.05},
+    # Process peak RSS moves with allocator and GC timing, so allow more slack than the index estimates
+    '*peak_memory*': {'relative': 0.10, 'direction': 'lower'},
+    '*memory*': {'relative': 0.05},
+    '*': {'relative': 0.10}
+}
+STAT_SUFFIX = re.compile(r'_?(mean|p50|p95|p99|max)$')
+
+
+def infer_direction(metric: str):
+    for direction, pattern in DIRECTION_PATTERNS:
+        if pattern.search(metric):
+            return direction
+    return None
+
+
+def find_rule(metric: str, rules: dict) -> dict:
+    for pattern, rule in rules.items():
+        if fnmatch.fnmatch(metric, pattern):
+            return rule
+    return {}
+
+
+def statistic(values, stat: str) -> float:
+    if stat == 'mean':
+        return sum(values) / len(values)
+    return percentile(values, float(stat[1:]))
+
+
+def bootstrap_confidence(baseline, candidate, stat: str, direction: str,
+                         iterations: int = 1000, max_samples: int = 2000, seed: int = 0) -> float:
+    """Fraction of bootstrap resamples in which the candidate is worse than the baseline"""
+    rng = random.Random(seed)
+    if len(baseline) > max_samples:
+        baseline = rng.sample(baseline, max_samples)
+    if len(candidate) > max_samples:
+        candidate = rng.sample(candidate, max_samples)
+
+    worse = 0
+    for _ in range(iterations):
+        base = statistic(rng.choices(baseline, k=len(baseline)), stat)
+        cand = statistic(rng.choices(candidate, k=len(candidate)), stat)
+        if (cand > base) if direction == 'lower' else (cand < base):
+            worse += 1
+    return worse / iterations
+
+
+def compare(baseline: dict, candidate: dict, rules: dict, alpha: float):
+    rows, regressions = [], []
+    base_metrics, cand_metrics = baseline['metrics'], candidate['metrics']
+    base_samples, cand_samples = baseline.get('samples', {}), candidate.get('samples', {})
+
+    for metric in sorted(set(base_metrics) & set(cand_metrics)):
+        base, cand = base_metrics[metric], cand_metrics[metric]
+        if not isinstance(base, (int, float)) or not isinstance(cand, (int, float)):
+            continue
+        rule = find_rule(metric, rules)
+        if rule.get('ignore'):
+            continue
+        direction = rule.get('direction') or infer_direction(metric)
+
+        change = cand - base
+        relative = change / abs(base) if base else (0.0 if not change else float('inf'))
+        worse_by = 0.0
+        if direction == 'lower':
+            worse_by = change
+        elif direction == 'higher':
+            worse_by = -change
+
+        if 'absolute' in rule:
+            exceeded = worse_by > rule['absolute']
+            threshold = f"{rule['absolute']:g}"
+        else:
+            limit = rule.get('relative', 0.10)
+            exceeded = worse_by > 0 and (worse_by / abs(base) if base else float('inf')) > limit
+            threshold = f"{limit:.0%}"
+
+        confidence = None
+        stat_match = STAT_SUFFIX.search(metric)
+        if stat_match and stat_match.group(1) != 'max':
+            sample_key = metric[:stat_match.start()]
+            if base_samples.get(sample_key) and cand_samples.get(sample_key) and direction:
+                confidence = bootstrap_confidence(
+                    base_samples[sample_key], cand_samples[sample_key], stat_match.group(1), direction
+                )
+
+        if direction is None:
+            status = 'untracked'
+        elif exceeded and (confidence is None or confidence >= 1 - alpha):
+            status = 'REGRESSION'
+            regressions.append(metric)
+        elif exceeded:
+            status = 'noise'
+        elif worse_by < 0:
+            status = 'improved'
+        else:
+            status = 'ok'
+
+        rows.append({
+            'metric': metric,
+            'baseline': float(base),
+            'candidate': float(cand),
+            'change': f"{relative:+.1%}" if relative != float('inf') else 'new',
+            'threshold': threshold,
+            'confidence': f"{confidence:.2f}" if confidence is not None else '-',
+            'status': status
+        })
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('baseline', type=Path)
+    parser.add_argument('candidate', type=Path)
+    parser.add_argument('--thresholds', type=Path, help='JSON file of metric pattern rules')
+    parser.add_argument('--alpha', type=float, default=0.05,
+                        help='Significance level for sampled metrics (default 0.05)')
+    parser.add_argument('--json', action='store_true', help='Print the comparison as JSON')
+    args = parser.parse_args()
+
+    baseline, candidate = load_results(args.baseline), load_results(args.candidate)
+    if baseline.get('benchmark') != candidate.get('benchmark'):
+        print(f"Warning: comparing '{baseline.get('benchmark')}' against '{candidate.get('benchmark')}'",
+              file=sys.stderr)
+
+    rules = {}
+    if args.thresholds:
+        rules.update(json.loads(args.thresholds.read_text(encoding='utf-8')))
+    # Custom rules come first so they take precedence over the defaults
+    for pattern, rule in DEFAULT_RULES.items():
+        rules.setdefault(pattern, rule)
+
+    rows, regressions = compare(baseline, candidate, rules, args.alpha)
+    if args.json:
+        print(json.dumps({'rows': rows, 'regressions': regressions}, indent=2))
+    else:
+        print_table(rows, ['metric', 'baseline', 'candidate', 'change', 'threshold', 'confidence', 'status'])
+        print()
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        else:
+            print("No regressions")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""Replay a question mix against /api/chat/ask at a target request rate.
+
+Requests are sent open-loop: request i is due at start + i / rps whether or not
+earlier requests have finished, and latency is measured from that due time, so a
+saturated server shows up as growing latency instead of a lower send rate.
+The server's peak memory is read from /api/stats/memory after the run.
+
+Typical run against the mocks:
+
+    python benchmarks/mock_ollama.py --port 11435 &
+    python benchmarks/mock_weaviate.py --port 8081 &
+    WEAVIATE_URL=http://localhost:8081 OLLAMA_BASE_URL=http://localhost:11435 python api.py &
+    python benchmarks/loadtest.py --rps 2 --duration 60
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from common import print_table, summarize, write_results
+
+DEFAULT_QUESTIONS = Path(__file__).resolve().parent / 'questions.txt'
+
+
+def load_questions(path: Path):
+    """Read questions from a text file (one per line) or a JSONL file with a 'question' field"""
+    questions = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            questions.append(json.loads(line)['question'] if path.suffix == '.jsonl' else line)
+    if not questions:
+        raise ValueError(f"No questions found in {path}")
+    return questions
+
+
+def send_question(url: str, question: str, session_id: str, profile, timeout: float):
+    """POST one question, returning (status, degraded) where status is 'ok', 'http_<code>' or 'error'"""
+    payload = {'question': question, 'session_id': session_id}
+    if profile:
+        payload['profile'] = profile
+    request = urllib.request.Request(
+        f"{url}/api/chat/ask",
+        data=json.dumps(payload).encode('utf-8'),
+        headers={'Content-Type': 'application/json'},
+        method='POST'
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            body = json.loads(response.read())
+            return 'ok', bool(body.get('degraded'))
+    except urllib.error.HTTPError as e:
+        return f'http_{e.code}', False
+    except Exception:
+        return 'error', False
+
+
+def fetch_peak_memory(url: str, timeout: float):
+    """Peak resident memory of the API process in bytes, or None if it can't be read"""
+    try:
+        with urllib.request.urlopen(f"{url}/api/stats/memory", timeout=timeout) as response:
+            return json.loads(response.read()).get('peak_memory_bytes')
+    except (urllib.error.URLError, OSError, ValueError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost:5555')
+    parser.add_argument('--questions', type=Path, default=DEFAULT_QUESTIONS)
+    parser.add_argument('--rps', type=float, default=1.0, help='Target request rate')
+    parser.add_argument('--duration', type=float, default=60, help='Seconds to send requests for')
+    parser.add_argument('--sessions', type=int, default=50, help='Distinct chat sessions to spread requests over')
+    parser.add_argument('--profile', help='Generation profile to request')
+    parser.add_argument('--timeout', type=float, default=180, help='Client timeout per request')
+    parser.add_argument('--max-in-flight', type=int, default=256, help='Upper bound on concurrent requests')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=Path, help='Result file (default: benchmarks/results/)')
+    args = parser.parse_args()
+
+    questions = load_questions(args.questions)
+    rng = random.Random(args.seed)
+    total = int(args.rps * args.duration)
+
+    lock = threading.Lock()
+    latencies, statuses, degraded = [], {}, 0
+
+    def run(due: float, question: str, session_id: str):
+        nonlocal degraded
+        status, was_degraded = send_question(args.url, question, session_id, args.profile, args.timeout)
+        latency = time.time() - due
+        with lock:
+            statuses[status] = statuses.get(status, 0) + 1
+            if status == 'ok':
+                latencies.append(latency)
+                degraded += was_degraded
+
+    print(f"Sending {total} requests at {args.rps} rps to {args.url}...")
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=args.max_in_flight) as pool:
+        for i in range(total):
+            due = start + i / args.rps
+            delay = due - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(run, due, rng.choice(questions), f"loadtest-{rng.randrange(args.sessions)}")
+    elapsed = time.time() - start
+
+    ok = statuses.get('ok', 0)
+    metrics = {
+        **summarize(latencies, prefix='latency_'),
+        'throughput_rps': ok / elapsed,
+        'error_rate': (total - ok) / total if total else 0.0,
+        'degraded_rate': degraded / ok if ok else 0.0
+    }
+    server_peak = fetch_peak_memory(args.url, args.timeout)
+    if server_peak is not None:
+        metrics['server_peak_memory_bytes'] = server_peak
+
+    print()
+    print_table([{
+        'requests': total,
+        'ok': ok,
+        'p50_s': metrics['latency_p50'],
+        'p95_s': metrics['latency_p95'],
+        'p99_s': metrics['latency_p99'],
+        'throughput_rps': metrics['throughput_rps'],
+        'error_rate': metrics['error_rate'],
+        'degraded_rate': metrics['degraded_rate']
+    }], ['requests', 'ok', 'p50_s', 'p95_s', 'p99_s', 'throughput_rps', 'error_rate', 'degraded_rate'])
+    print(f"\nStatuses: {statuses}")
+    if server_peak is not None:
+        print(f"Server peak memory: {server_peak / 1024 ** 2:.1f} MB")
+
+    config = dict(vars(args), questions=str(args.questions), output=str(args.output) if args.output else None)
+    config['statuses'] = statuses
+    path = write_results('loadtest', metrics, {'latency': latencies}, config=config, output=args.output)
+    print(f"Results written to {path}")
+
+
+if __name__ == '__main__':
+    main()
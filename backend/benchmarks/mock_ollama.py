@@ -0,0 +1,221 @@
+"""A stand-in for the Ollama HTTP API with configurable speed, for load testing.
+
+Serves /api/generate (streaming and non-streaming) and /api/embed. Generation
+speed, model load delay, parallel slots and error rate can be set to mimic a
+given CPU host. Clients that disconnect mid-stream are counted as cancelled.
+
+    python benchmarks/mock_ollama.py --port 11435 --tokens-per-second 12 --parallel 1
+"""
+import argparse
+import hashlib
+import json
+import logging
+import math
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from structured_logging import setup_logging
+
+# Same JSON records as the API, so load test logs can be read together
+setup_logging()
+logger = logging.getLogger(__name__)
+
+ANSWER_WORDS = (
+    "<h2>Answer</h2><p>Under the <strong>USCIS Policy Manual</strong> an applicant must meet "
+    "the eligibility requirements described in the relevant volume and chapter before filing. "
+    "</p>"
+).split(' ')
+
+
+class MockOllamaState:
+    def __init__(self, args):
+        self.tokens_per_second = args.tokens_per_second
+        self.prompt_tokens_per_second = args.prompt_tokens_per_second
+        self.load_delay = args.load_delay
+        self.keep_alive = args.keep_alive
+        self.default_tokens = args.tokens
+        self.error_rate = args.error_rate
+        self.embed_dim = args.embed_dim
+        self.embed_delay = args.embed_delay
+        # Ollama runs OLLAMA_NUM_PARALLEL requests per model and queues the rest
+        self.slots = threading.Semaphore(args.parallel)
+        self.lock = threading.Lock()
+        self.last_used = {}
+        self.counters = {'requests': 0, 'completed': 0, 'cancelled': 0, 'errors': 0, 'embeddings': 0}
+
+    def count(self, key: str, amount: int = 1):
+        with self.lock:
+            self.counters[key] += amount
+
+    def load_model(self, model: str):
+        """Sleep for the load delay if the model is cold, like Ollama does on first use"""
+        with self.lock:
+            last = self.last_used.get(model)
+            cold = last is None or time.time() - last > self.keep_alive
+            self.last_used[model] = time.time()
+        if cold and self.load_delay:
+            time.sleep(self.load_delay)
+        return self.load_delay if cold else 0.0
+
+
+def fake_embedding(text: str, dim: int):
+    """Deterministic unit vector derived from the text"""
+    rng = random.Random(hashlib.sha256(text.encode('utf-8')).digest())
+    vector = [rng.gauss(0, 1) for _ in range(dim)]
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+class MockOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    state: MockOllamaState = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body: dict):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get('Content-Length', 0))
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def do_GET(self):
+        if self.path == '/api/tags':
+            self._send_json(200, {'models': [{'name': name} for name in self.state.last_used]})
+        elif self.path == '/api/stats':
+            with self.state.lock:
+                self._send_json(200, dict(self.state.counters))
+        else:
+            self._send_json(200, {'status': 'Ollama is running'})
+
+    def do_POST(self):
+        if self.path == '/api/generate':
+            self.handle_generate(self._read_json())
+        elif self.path in ('/api/embed', '/api/embeddings'):
+            self.handle_embed(self._read_json())
+        else:
+            self._send_json(404, {'error': f'unknown endpoint {self.path}'})
+
+    def handle_generate(self, body: dict):
+        state = self.state
+        state.count('requests')
+        model = body.get('model', 'llama3.2')
+        options = body.get('options') or {}
+        num_predict = options.get('num_predict') or state.default_tokens
+        num_tokens = min(num_predict, state.default_tokens) if num_predict > 0 else state.default_tokens
+
+        if random.random() < state.error_rate:
+            state.count('errors')
+            self._send_json(500, {'error': 'mock failure'})
+            return
+
+        with state.slots:
+            start = time.time()
+            load_seconds = state.load_model(model)
+            prompt_tokens = len(body.get('prompt', '').split())
+            prompt_seconds = prompt_tokens / state.prompt_tokens_per_second
+            time.sleep(prompt_seconds)
+
+            if not body.get('stream', True):
+                time.sleep(num_tokens / state.tokens_per_second)
+                text = ' '.join(ANSWER_WORDS[i % len(ANSWER_WORDS)] for i in range(num_tokens))
+                state.count('completed')
+                self._send_json(200, {
+                    'model': model,
+                    'response': text,
+                    'done': True,
+                    'eval_count': num_tokens,
+                    'eval_duration': int(num_tokens / state.tokens_per_second * 1e9),
+                    'prompt_eval_count': prompt_tokens,
+                    'prompt_eval_duration': int(prompt_seconds * 1e9),
+                    'load_duration': int(load_seconds * 1e9),
+                    'total_duration': int((time.time() - start) * 1e9)
+                })
+                return
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/x-ndjson')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            try:
+                for i in range(num_tokens):
+                    time.sleep(1 / state.tokens_per_second)
+                    token = ANSWER_WORDS[i % len(ANSWER_WORDS)] + ' '
+                    self._write_chunk({'model': model, 'response': token, 'done': False})
+                self._write_chunk({
+                    'model': model,
+                    'response': '',
+                    'done': True,
+                    'eval_count': num_tokens,
+                    'eval_duration': int(num_tokens / state.tokens_per_second * 1e9),
+                    'prompt_eval_count': prompt_tokens,
+                    'load_duration': int(load_seconds * 1e9),
+                    'total_duration': int((time.time() - start) * 1e9)
+                })
+                self.wfile.write(b'0\r\n\r\n')
+                state.count('completed')
+            except (BrokenPipeError, ConnectionResetError):
+                # The slot is freed right away, like Ollama aborting a generation
+                state.count('cancelled')
+                self.close_connection = True
+
+    def _write_chunk(self, body: dict):
+        data = json.dumps(body).encode('utf-8') + b'\n'
+        self.wfile.write(f'{len(data):x}\r\n'.encode('ascii') + data + b'\r\n')
+        self.wfile.flush()
+
+    def handle_embed(self, body: dict):
+        state = self.state
+        inputs = body.get('input', body.get('prompt', ''))
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        time.sleep(state.embed_delay * len(inputs))
+        embeddings = [fake_embedding(text, state.embed_dim) for text in inputs]
+        state.count('embeddings', len(inputs))
+        if self.path == '/api/embeddings':
+            self._send_json(200, {'embedding': embeddings[0]})
+        else:
+            self._send_json(200, {'model': body.get('model'), 'embeddings': embeddings})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=11435)
+    parser.add_argument('--tokens-per-second', type=float, default=15.0, help='Generation speed')
+    parser.add_argument('--prompt-tokens-per-second', type=float, default=200.0, help='Prompt evaluation speed')
+    parser.add_argument('--tokens', type=int, default=300, help='Answer length when num_predict allows it')
+    parser.add_argument('--load-delay', type=float, default=2.0, help='Seconds to load a cold model')
+    parser.add_argument('--keep-alive', type=float, default=1800, help='Seconds a model stays loaded')
+    parser.add_argument('--parallel', type=int, default=1, help='Concurrent generations (OLLAMA_NUM_PARALLEL)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests failing with 500')
+    parser.add_argument('--embed-dim', type=int, default=768)
+    parser.add_argument('--embed-delay', type=float, default=0.005, help='Seconds per embedded text')
+    args = parser.parse_args()
+
+    MockOllamaHandler.state = MockOllamaState(args)
+    server = ThreadingHTTPServer((args.host, args.port), MockOllamaHandler)
+    server.daemon_threads = True
+    logger.info(f"Mock Ollama listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+"""A stand-in for Weaviate's REST/GraphQL API serving canned hybrid search results.
+
+The API queries Weaviate through the v3 client, which only uses REST and GraphQL,
+so that is what is mocked here; gRPC (used by the v4 client in the import scripts)
+is not. Results come from a scraped chunks file if given, otherwise from a few
+built-in sections, and are picked deterministically from the query text.
+
+    python benchmarks/mock_weaviate.py --port 8081 --chunks scrape/raw_data/chunks/<run>.jsonl
+"""
+import argparse
+import hashlib
+import json
+import logging
+import re
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from structured_logging import setup_logging
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+COLLECTION = "USCIS_Policy_Manual"
+PROPERTIES = [
+    "url", "title", "volume_number", "part_letter", "chapter_number", "last_updated",
+    "section_header", "subsection_header", "content", "timestamp",
+    "parent_id", "chapter_id", "chunk_index", "overlap_chars"
+]
+BUILTIN_CHUNKS = [
+    {
+        "url": "https://www.uscis.gov/policy-manual/volume-12-part-d-chapter-1",
+        "title": "Chapter 1 - Purpose and Background",
+        "volume_number": "12", "part_letter": "D", "chapter_number": "1",
+        "section_header": "A. Purpose",
+        "content": "Naturalization is the process by which U.S. citizenship is conferred upon a foreign "
+                   "citizen or national after he or she fulfills the requirements established by Congress."
+    },
+    {
+        "url": "https://www.uscis.gov/policy-manual/volume-7-part-a-chapter-1",
+        "title": "Chapter 1 - Purpose and Background",
+        "volume_number": "7", "part_letter": "A", "chapter_number": "1",
+        "section_header": "A. Purpose",
+        "content": "Adjustment of status is the process by which an eligible applicant already in the United "
+                   "States can obtain lawful permanent resident status without returning to their home country."
+    },
+    {
+        "url": "https://www.uscis.gov/policy-manual/volume-10-part-a-chapter-1",
+        "title": "Chapter 1 - Purpose and Background",
+        "volume_number": "10", "part_letter": "A", "chapter_number": "1",
+        "section_header": "A. Purpose",
+        "content": "Employment authorization allows noncitizens to work in the United States. Certain "
+                   "noncitizens are employment authorized incident to status, others must apply."
+    },
+    {
+        "url": "https://www.uscis.gov/policy-manual/volume-6-part-e-chapter-8",
+        "title": "Chapter 8 - Ability to Pay",
+        "volume_number": "6", "part_letter": "E", "chapter_number": "8",
+        "section_header": "A. Ability to Pay Wage",
+        "content": "The employer must demonstrate the continuing ability to pay the proffered wage "
+                   "beginning on the priority date until the beneficiary obtains permanent residence."
+    }
+]
+CLASS_PATTERN = re.compile(r'Get\s*\{\s*(\w+)\s*\(')
+LIMIT_PATTERN = re.compile(r'limit:\s*(\d+)')
+QUERY_PATTERN = re.compile(r'query:\s*"((?:[^"\\]|\\.)*)"')
+# The API's sibling fetch: a parent_id ContainsAny filter
+PARENT_FILTER_PATTERN = re.compile(r'valueText:\s*\[([^\]]*)\]')
+
+
+def load_chunks(path):
+    if not path:
+        return BUILTIN_CHUNKS
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class MockWeaviateHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    chunks = BUILTIN_CHUNKS
+    latency = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.startswith('/v1/.well-known/ready') or self.path.startswith('/v1/.well-known/live'):
+            self._send_json(200, {})
+        elif self.path.startswith('/v1/.well-known/openid-configuration'):
+            self._send_json(404, {})
+        elif self.path.startswith('/v1/meta'):
+            self._send_json(200, {'hostname': 'http://[::]:8080', 'version': '1.27.2', 'modules': {}})
+        elif self.path.startswith('/v1/schema'):
+            schema = {
+                'class': COLLECTION,
+                'properties': [{'name': name, 'dataType': ['text']} for name in PROPERTIES]
+            }
+            self._send_json(200, schema if self.path.rstrip('/') != '/v1/schema' else {'classes': [schema]})
+        else:
+            self._send_json(404, {'error': [{'message': f'unknown path {self.path}'}]})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+        if self.path.startswith('/v1/graphql'):
+            self._send_json(200, self.handle_graphql(body.get('query', '')))
+        else:
+            self._send_json(404, {'error': [{'message': f'unknown path {self.path}'}]})
+
+    def handle_graphql(self, query: str) -> dict:
+        if self.latency:
+            time.sleep(self.latency)
+
+        class_match = CLASS_PATTERN.search(query)
+        class_name = class_match.group(1) if class_match else COLLECTION
+        if class_name != COLLECTION:
+            return {'data': {'Get': {class_name: []}}}
+
+        parent_match = PARENT_FILTER_PATTERN.search(query)
+        if parent_match:
+            parent_ids = set(json.loads(f'[{parent_match.group(1)}]'))
+            siblings = [{name: chunk.get(name) for name in PROPERTIES}
+                        for chunk in self.chunks if chunk.get('parent_id') in parent_ids]
+            return {'data': {'Get': {COLLECTION: siblings}}}
+
+        limit_match = LIMIT_PATTERN.search(query)
+        limit = min(int(limit_match.group(1)) if limit_match else 10, len(self.chunks))
+        query_match = QUERY_PATTERN.search(query)
+        text = query_match.group(1) if query_match else query
+
+        # Same question, same results; scores fall off so the spread varies per query
+        seed = int(hashlib.sha256(text.encode('utf-8')).hexdigest(), 16)
+        offset = seed % len(self.chunks)
+        step = 0.04 + (seed % 7) / 100
+        objects = []
+        for rank in range(limit):
+            chunk = self.chunks[(offset + rank * 7919) % len(self.chunks)]
+            obj = {name: chunk.get(name) for name in PROPERTIES}
+            score = max(0.99 - rank * step, 0.0)
+            obj['_additional'] = {
+                'score': f'{score:.4f}',
+                'distance': None,
+                'certainty': None
+            }
+            objects.append(obj)
+        return {'data': {'Get': {COLLECTION: objects}}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--chunks', type=Path, help='JSONL chunks file to serve results from')
+    parser.add_argument('--latency-ms', type=float, default=15.0, help='Added latency per query')
+    args = parser.parse_args()
+
+    MockWeaviateHandler.chunks = load_chunks(args.chunks)
+    MockWeaviateHandler.latency = args.latency_ms / 1000
+    server = ThreadingHTTPServer((args.host, args.port), MockWeaviateHandler)
+    server.daemon_threads = True
+    logger.info(f"Mock Weaviate listening on http://{args.host}:{args.port} "
+                f"with {len(MockWeaviateHandler.chunks)} chunks")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
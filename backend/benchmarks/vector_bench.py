@@ -0,0 +1,168 @@
+"""Shared pieces of the vector index benchmarks.
+
+Each benchmark loads the corpus vectors once (from a dataset's embedding column,
+or through the embedding cache so repeated runs don't re-embed), builds
+throwaway Bench_* collections from them with vectorizer none, and scores
+searches against exact nearest neighbours from a flat (brute force) index.
+"""
+import json
+import sys
+import time
+import urllib.request
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from chunk_dataset import EMBEDDING_COLUMN, is_dataset, iter_dataset, read_dataset
+from chunk_reader import iter_chunks
+from embeddings import OllamaEmbedder, embedding_text
+
+BENCH_PREFIX = "Bench_"
+DEFAULT_GOLDEN = Path(__file__).resolve().parent / 'golden_questions.jsonl'
+# Weaviate's Prometheus endpoint (PROMETHEUS_MONITORING_ENABLED in docker-compose.yml)
+DEFAULT_METRICS_URL = "http://localhost:2112/metrics"
+
+Vector = List[float]
+
+
+def latest_chunks_file() -> Path:
+    return sorted(
+        (BACKEND_DIR / 'scrape' / 'raw_data' / 'chunks').glob('*.jsonl'), key=lambda p: p.stat().st_mtime
+    )[-1]
+
+
+def load_corpus_vectors(chunks_file: Path, embedder: OllamaEmbedder, limit: Optional[int] = None) -> List[Vector]:
+    """One vector per chunk, in file order"""
+    if is_dataset(chunks_file):
+        table = read_dataset(chunks_file)
+        if EMBEDDING_COLUMN in table.column_names:
+            model = (table.schema.metadata or {}).get(b'embedding_model', b'').decode('utf-8')
+            if not model or model == embedder.model:
+                column = table.column(EMBEDDING_COLUMN)
+                return column.slice(0, limit).to_pylist() if limit else column.to_pylist()
+        rows = (properties for _, properties in iter_dataset(chunks_file))
+    else:
+        rows = (properties for _, properties in iter_chunks(chunks_file))
+
+    texts = []
+    for properties in rows:
+        texts.append(embedding_text(properties))
+        if limit and len(texts) >= limit:
+            break
+    return embedder.embed_all(texts)
+
+
+def load_questions(path: Path = DEFAULT_GOLDEN) -> List[str]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line)['question'] for line in f if line.strip()]
+
+
+def wait_until_indexed(client, name: str, compressed: bool = False, timeout: float = 600.0) -> bool:
+    """Block until every shard has indexed its queue, and has compressed its vectors if asked
+
+    Returns whether the shards are compressed. PQ and SQ only compress once a
+    shard holds training_limit objects, so a smaller collection never does.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        shards = [shard for node in client.cluster.nodes(name, output='verbose')
+                  for shard in node.shards if shard.collection == name]
+        indexed = bool(shards) and all(shard.vector_indexing_status == 'READY' and shard.vector_queue_length == 0
+                                 for shard in shards)
+        done = indexed and all(shard.compressed for shard in shards)
+        if done or (indexed and not compressed):
+            return done
+        if time.monotonic() > deadline:
+            if indexed:
+                return False
+            raise TimeoutError(f"{name} wasn't indexed within {timeout:.0f}s")
+        time.sleep(0.5)
+
+
+def build_collection(client, name: str, vectors: Sequence[Vector], vector_index,
+                     compressed: bool = False, batch_size: int = 200) -> Tuple[float, bool]:
+    """(Re)create a collection holding the vectors
+
+    Returns the seconds until it was searchable (and compressed, if asked) and
+    whether it ended up compressed.
+    """
+    from weaviate.classes.config import Configure, DataType, Property
+
+    if client.collections.exists(name):
+        client.collections.delete(name)
+
+    start = time.perf_counter()
+    collection = client.collections.create(
+        name=name,
+        vectorizer_config=Configure.Vectorizer.none(),
+        vector_index_config=vector_index,
+        properties=[Property(name="row", data_type=DataType.INT)]
+    )
+    with collection.batch.fixed_size(batch_size=batch_size) as batch:
+        for row, vector in enumerate(vectors):
+            batch.add_object(properties={"row": row}, vector=vector)
+    if collection.batch.failed_objects:
+        raise RuntimeError(f"{len(collection.batch.failed_objects)} objects failed to import into {name}: "
+                           f"{collection.batch.failed_objects[0].message}")
+    is_compressed = wait_until_indexed(client, name, compressed=compressed)
+    return time.perf_counter() - start, is_compressed
+
+
+def run_queries(collection, query_vectors: Sequence[Vector], k: int,
+                repeat: int = 1) -> Tuple[List[List[int]], List[float]]:
+    """Rows returned for each query (from the first pass) and per-query latencies in ms"""
+    results, latencies = [], []
+    for run in range(repeat):
+        for vector in query_vectors:
+            start = time.perf_counter()
+            response = collection.query.near_vector(near_vector=vector, limit=k, return_properties=["row"])
+            latencies.append((time.perf_counter() - start) * 1000)
+            if run == 0:
+                results.append([obj.properties["row"] for obj in response.objects])
+    return results, latencies
+
+
+def exact_neighbours(client, vectors: Sequence[Vector], query_vectors: Sequence[Vector], k: int) -> List[List[int]]:
+    """Ground truth: a flat index without compression is an exhaustive search"""
+    from weaviate.classes.config import Configure
+
+    name = f"{BENCH_PREFIX}Exact"
+    build_collection(client, name, vectors, Configure.VectorIndex.flat())
+    try:
+        truth, _ = run_queries(client.collections.get(name), query_vectors, k)
+    finally:
+        client.collections.delete(name)
+    return truth
+
+
+def recall_at_k(results: Sequence[Sequence[int]], truth: Sequence[Sequence[int]], k: int) -> float:
+    """Mean fraction of the true k nearest neighbours found in the top k"""
+    if not truth:
+        return 0.0
+    return sum(len(set(found[:k]) & set(expected[:k])) / k for found, expected in zip(results, truth)) / len(truth)
+
+
+def heap_bytes(metrics_url: Optional[str] = DEFAULT_METRICS_URL) -> Optional[int]:
+    """Weaviate's Go heap in use, None when the metrics endpoint isn't reachable"""
+    if not metrics_url:
+        return None
+    try:
+        with urllib.request.urlopen(metrics_url, timeout=5) as response:
+            for line in response.read().decode('utf-8').splitlines():
+                if line.startswith('go_memstats_heap_inuse_bytes '):
+                    return int(float(line.split()[1]))
+    except OSError:
+        return None
+    return None
+
+
+def pareto_front(rows: Sequence[dict], maximize: Sequence[str] = (), minimize: Sequence[str] = ()) -> List[dict]:
+    """Rows no other row beats on every objective (at least as good on all, better on one)"""
+    def dominates(a, b):
+        no_worse = (all(a[key] >= b[key] for key in maximize) and all(a[key] <= b[key] for key in minimize))
+        better = (any(a[key] > b[key] for key in maximize) or any(a[key] < b[key] for key in minimize))
+        return no_worse and better
+
+    return [row for row in rows if not any(dominates(other, row) for other in rows if other is not row)]
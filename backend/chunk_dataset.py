@@ -0,0 +1,130 @@
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+from chunk_reader import iter_chunks
+
+# Columnar copies of the JSONL chunks files. Metadata columns are dictionary-encoded
+# so each distinct url/title/header is stored once, not on every chunk. Arrow IPC
+# files are memory-mapped and read without copying; Parquet is smaller but decoded.
+DATASET_SUFFIXES = ('.arrow', '.parquet')
+DICTIONARY_COLUMNS = ('url', 'title', 'volume_number', 'part_letter', 'chapter_number',
+                      'last_updated', 'section_header', 'subsection_header', 'timestamp',
+                      'parent_id', 'chapter_id')
+TEXT_COLUMNS = ('content',)
+INT_COLUMNS = ('chunk_index', 'overlap_chars')
+EMBEDDING_COLUMN = 'embedding'
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("pyarrow is required for columnar chunk datasets: pip install pyarrow")
+
+
+def is_dataset(path: Path) -> bool:
+    return Path(path).suffix in DATASET_SUFFIXES
+
+
+def build_table(rows: Sequence[Dict[str, Any]], embeddings: Optional[Sequence[Sequence[float]]] = None,
+                embedding_model: Optional[str] = None) -> 'pa.Table':
+    """Build a table from chunk property dicts, with one dictionary per metadata column"""
+    _require_pyarrow()
+    columns, fields = [], []
+    for name in DICTIONARY_COLUMNS:
+        column = pa.array([row.get(name) for row in rows], pa.string()).dictionary_encode()
+        columns.append(column)
+        fields.append(pa.field(name, column.type))
+    for name in TEXT_COLUMNS:
+        columns.append(pa.array([row.get(name) or '' for row in rows], pa.string()))
+        fields.append(pa.field(name, pa.string()))
+    for name in INT_COLUMNS:
+        columns.append(pa.array([row.get(name) or 0 for row in rows], pa.int32()))
+        fields.append(pa.field(name, pa.int32()))
+
+    metadata = {}
+    if embeddings is not None:
+        if len(embeddings) != len(rows):
+            raise ValueError(f"Got {len(embeddings)} embeddings for {len(rows)} rows")
+        dim = len(embeddings[0]) if len(embeddings) else 0
+        flat = pa.array([value for vector in embeddings for value in vector], pa.float32())
+        column = pa.FixedSizeListArray.from_arrays(flat, dim)
+        columns.append(column)
+        fields.append(pa.field(EMBEDDING_COLUMN, column.type))
+        if embedding_model:
+            metadata[b'embedding_model'] = embedding_model.encode('utf-8')
+
+    return pa.Table.from_arrays(columns, schema=pa.schema(fields, metadata=metadata or None))
+
+
+def write_dataset(table: 'pa.Table', path: Path, row_group_size: int = 10000) -> Path:
+    """Write a table as Arrow IPC (.arrow, uncompressed so it can be mapped) or Parquet (.parquet)"""
+    _require_pyarrow()
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix == '.parquet':
+        pq.write_table(table, path, row_group_size=row_group_size, use_dictionary=True, compression='zstd')
+    elif path.suffix == '.arrow':
+        with pa.OSFile(str(path), 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table, max_chunksize=row_group_size)
+    else:
+        raise ValueError(f"Unsupported dataset format: {path.suffix} (use one of {', '.join(DATASET_SUFFIXES)})")
+    return path
+
+
+def convert_jsonl(jsonl_path: Path, output: Optional[Path] = None) -> Path:
+    """Write a JSONL chunks file as a dataset next to it (same name, .arrow by default)"""
+    jsonl_path = Path(jsonl_path)
+    rows = [properties for _, properties in iter_chunks(jsonl_path)]
+    return write_dataset(build_table(rows), output or jsonl_path.with_suffix('.arrow'))
+
+
+def read_dataset(path: Path, columns: Optional[List[str]] = None) -> 'pa.Table':
+    """Load a dataset; Arrow IPC files are memory-mapped and not copied"""
+    _require_pyarrow()
+    path = Path(path)
+    if path.suffix == '.parquet':
+        return pq.read_table(path, columns=columns, memory_map=True)
+    # The table's buffers point into the mapping and keep it alive
+    table = pa.ipc.open_file(pa.memory_map(str(path), 'r')).read_all()
+    return table.select(columns) if columns else table
+
+
+def iter_dataset(path: Path, start: int = 0, end: Optional[int] = None,
+                 batch_rows: int = 1000) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Stream (row number after the row, properties) like chunk_reader.iter_chunks does byte offsets"""
+    table = read_dataset(path)
+    if EMBEDDING_COLUMN in table.column_names:
+        table = table.drop([EMBEDDING_COLUMN])
+    end = table.num_rows if end is None else min(end, table.num_rows)
+    for batch_start in range(start, end, batch_rows):
+        batch = table.slice(batch_start, min(batch_rows, end - batch_start))
+        for i, row in enumerate(batch.to_pylist()):
+            yield batch_start + i + 1, row
+
+
+def count_rows(path: Path) -> int:
+    _require_pyarrow()
+    path = Path(path)
+    if path.suffix == '.parquet':
+        return pq.ParquetFile(path).metadata.num_rows
+    return read_dataset(path).num_rows
+
+
+def embedding_matrix(table: 'pa.Table') -> Optional[Any]:
+    """The embedding column as a (rows, dim) float32 numpy array (needs numpy)
+
+    Zero-copy when the column is a single chunk; a column spread over several
+    record batches is concatenated first.
+    """
+    if EMBEDDING_COLUMN not in table.column_names:
+        return None
+    column = table.column(EMBEDDING_COLUMN).combine_chunks()
+    dim = column.type.list_size
+    return column.values.to_numpy(zero_copy_only=True).reshape(-1, dim)
+
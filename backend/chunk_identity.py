@@ -0,0 +1,46 @@
+import hashlib
+import json
+import uuid
+from typing import Any, Dict
+
+# Fixed namespace so every run (and every machine) derives the same UUIDs
+CHUNK_NAMESPACE = uuid.UUID('4f0c6f52-3c1e-5a53-9d0f-6b1e8f2a7c11')
+
+# Properties that don't change what a chunk says and are left out of its hash
+UNHASHED_PROPERTIES = {'timestamp', 'content_hash'}
+
+
+def chunk_key(properties: Dict[str, Any], occurrence: int = 0) -> str:
+    """Stable identity of a chunk: its URL and headers, plus its position among chunks sharing them
+
+    The scraper can emit several chunks under the same headers (e.g. the parts
+    of a section split by h3s), so repeats are told apart by their occurrence.
+    """
+    key = '|'.join(str(properties.get(name) or '') for name in ('url', 'section_header', 'subsection_header'))
+    return f"{key}#{occurrence}" if occurrence else key
+
+
+def chunk_uuid(key: str) -> str:
+    return str(uuid.uuid5(CHUNK_NAMESPACE, key))
+
+
+def content_hash(properties: Dict[str, Any]) -> str:
+    """SHA-256 of every property that describes the chunk's content"""
+    hashed = {name: value for name, value in properties.items() if name not in UNHASHED_PROPERTIES}
+    return hashlib.sha256(json.dumps(hashed, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+class ChunkKeyer:
+    """Assign keys to a stream of chunks, numbering repeats of the same URL and headers"""
+
+    def __init__(self):
+        self._seen: Dict[str, int] = {}
+
+    def key(self, properties: Dict[str, Any]) -> str:
+        base = chunk_key(properties)
+        occurrence = self._seen.get(base, 0)
+        self._seen[base] = occurrence + 1
+        return chunk_key(properties, occurrence)
+
+    def uuid(self, properties: Dict[str, Any]) -> str:
+        return chunk_uuid(self.key(properties))
@@ -0,0 +1,109 @@
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:
+    orjson = None
+    loads = json.loads
+
+# Byte ranges smaller than this are parsed inline, a process pool isn't worth starting
+RANGE_SIZE = int(os.environ.get("PARSE_RANGE_BYTES", str(4 * 1024 * 1024)))
+PARSE_WORKERS = int(os.environ.get("PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+ParsedChunk = Tuple[int, Dict[str, Any]]
+
+
+def chunk_properties(chunk: Dict[str, Any]) -> Dict[str, Any]:
+    """Weaviate object properties of one line of a chunks file"""
+    return {
+        "url": chunk["url"],
+        "title": chunk["title"],
+        "volume_number": chunk.get("volume_number", ""),
+        "part_letter": chunk.get("part_letter", ""),
+        "chapter_number": chunk.get("chapter_number", ""),
+        "last_updated": chunk.get("last_updated", ""),
+        "section_header": chunk.get("section_header"),
+        "subsection_header": chunk.get("subsection_header"),
+        "content": chunk.get("content", ""),
+        "timestamp": chunk.get("timestamp", ""),
+        "parent_id": chunk.get("parent_id"),
+        "chapter_id": chunk.get("chapter_id"),
+        "chunk_index": chunk.get("chunk_index", 0),
+        "overlap_chars": chunk.get("overlap_chars", 0)
+    }
+
+
+def split_ranges(path: Path, start: int, end: int, range_size: int) -> List[Tuple[int, int]]:
+    """Split [start, end) into ranges of about range_size bytes that begin and end on line boundaries"""
+    boundaries = [start]
+    with open(path, 'rb') as f:
+        position = start + range_size
+        while position < end:
+            # Move forward to the start of the next line
+            f.seek(position - 1)
+            f.readline()
+            boundary = f.tell()
+            if boundary >= end:
+                break
+            boundaries.append(boundary)
+            position = boundary + range_size
+    boundaries.append(end)
+    return list(zip(boundaries, boundaries[1:]))
+
+
+def parse_range(path: str, start: int, end: int, file_size: int) -> List[ParsedChunk]:
+    """Parse the lines in [start, end) into (byte offset after the line, properties)"""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    parsed = []
+    offset = start
+    for line in data.splitlines(keepends=True):
+        offset += len(line)
+        # A line cut off by the end of the range (not the file) belongs to no one
+        if not line.endswith(b'\n') and offset < file_size:
+            break
+        if not line.strip():
+            continue
+        parsed.append((offset, chunk_properties(loads(line))))
+    return parsed
+
+
+def iter_chunks(path: Path, start: int = 0, end: Optional[int] = None,
+                workers: int = PARSE_WORKERS, range_size: int = RANGE_SIZE) -> Iterator[ParsedChunk]:
+    """Stream (byte offset after the line, properties) from a JSONL chunks file, in file order
+
+    Large files are split into byte ranges that are parsed in a process pool,
+    with at most workers * 2 ranges parsed ahead of the consumer.
+    """
+    path = Path(path)
+    file_size = path.stat().st_size
+    end = file_size if end is None else min(end, file_size)
+    if start >= end:
+        return
+
+    ranges = split_ranges(path, start, end, range_size)
+    if workers <= 1 or len(ranges) == 1:
+        for range_start, range_end in ranges:
+            yield from parse_range(str(path), range_start, range_end, file_size)
+        return
+
+    pending = deque()
+    remaining = iter(ranges)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while True:
+            while len(pending) < workers * 2:
+                next_range = next(remaining, None)
+                if next_range is None:
+                    break
+                pending.append(executor.submit(parse_range, str(path), *next_range, file_size))
+            if not pending:
+                break
+            yield from pending.popleft().result()
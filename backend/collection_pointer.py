@@ -0,0 +1,104 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Weaviate 1.27 has no collection aliases, so the collection serving an alias is
+# recorded in a one-object-per-alias pointer collection instead
+POINTER_COLLECTION = "IndexPointer"
+DEFAULT_ALIAS = "USCIS_Policy_Manual"
+POINTER_REFRESH_SECONDS = float(os.environ.get("POINTER_REFRESH_SECONDS", "5"))
+
+
+def pointer_uuid(alias: str) -> str:
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"index-pointer/{alias}"))
+
+
+def versioned_name(alias: str, created_at: Optional[datetime] = None) -> str:
+    """Name of a new collection version, e.g. USCIS_Policy_Manual_v20250101_120000"""
+    return f"{alias}_v{(created_at or datetime.now()).strftime('%Y%m%d_%H%M%S')}"
+
+
+def read_pointer(client, alias: str = DEFAULT_ALIAS) -> Optional[Dict]:
+    """The pointer record for an alias (v4 client), None if there isn't one"""
+    if not client.collections.exists(POINTER_COLLECTION):
+        return None
+    obj = client.collections.get(POINTER_COLLECTION).query.fetch_object_by_id(pointer_uuid(alias))
+    return dict(obj.properties) if obj else None
+
+
+def active_collection(client, alias: str = DEFAULT_ALIAS) -> str:
+    """The collection an alias points to (v4 client), the alias itself if it was never switched"""
+    pointer = read_pointer(client, alias)
+    return pointer['collection'] if pointer else alias
+
+
+def write_pointer(client, alias: str, collection: str, previous: Optional[str] = None) -> Dict:
+    """Point an alias at a collection (v4 client); a single object write, so readers switch atomically"""
+    from weaviate.classes.config import Configure, DataType, Property
+
+    if not client.collections.exists(POINTER_COLLECTION):
+        client.collections.create(
+            name=POINTER_COLLECTION,
+            description="Which collection version serves each alias",
+            vectorizer_config=Configure.Vectorizer.none(),
+            properties=[
+                Property(name="alias", data_type=DataType.TEXT),
+                Property(name="collection", data_type=DataType.TEXT),
+                Property(name="previous", data_type=DataType.TEXT),
+                Property(name="updated_at", data_type=DataType.TEXT),
+            ]
+        )
+
+    pointers = client.collections.get(POINTER_COLLECTION)
+    properties = {
+        "alias": alias,
+        "collection": collection,
+        "previous": previous or "",
+        "updated_at": datetime.now(timezone.utc).isoformat()
+    }
+    object_uuid = pointer_uuid(alias)
+    if pointers.query.fetch_object_by_id(object_uuid) is None:
+        pointers.data.insert(properties=properties, uuid=object_uuid)
+    else:
+        pointers.data.replace(uuid=object_uuid, properties=properties)
+    return properties
+
+
+class CollectionResolver:
+    """Resolve an alias to its active collection for the API (v3 client)
+
+    The pointer is a single object read by id, re-read at most every
+    refresh_seconds; if it can't be read the last known collection is kept.
+    """
+
+    def __init__(self, client, alias: str = DEFAULT_ALIAS, refresh_seconds: float = POINTER_REFRESH_SECONDS):
+        self.client = client
+        self.alias = alias
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._collection = alias
+        self._checked_at = 0.0
+
+    def current(self) -> str:
+        if time.monotonic() - self._checked_at < self.refresh_seconds:
+            return self._collection
+
+        with self._lock:
+            if time.monotonic() - self._checked_at < self.refresh_seconds:
+                return self._collection
+            try:
+                obj = self.client.data_object.get_by_id(pointer_uuid(self.alias), class_name=POINTER_COLLECTION)
+                collection = obj['properties']['collection'] if obj else self.alias
+                if collection != self._collection:
+                    logger.info(f"Alias {self.alias} now points to {collection}")
+                self._collection = collection
+            except Exception as e:
+                logger.warning(f"Could not read the {self.alias} pointer, keeping {self._collection}: {e}")
+            self._checked_at = time.monotonic()
+            return self._collection
@@ -0,0 +1,91 @@
+from typing import Callable, Dict, List, Sequence
+
+# Between two runs of a section that aren't next to each other
+GAP_SEPARATOR = '\n\n...\n\n'
+
+
+def select_children(children: Sequence[Dict], hit_indices: Sequence[int], budget: int,
+                    count_tokens: Callable[[str], int]) -> List[int]:
+    """Positions in children to keep: the hits, then their neighbours outwards while the budget lasts
+
+    Neighbours are taken one step away from every hit, then two steps, and
+    so on, so the context grows evenly around each hit. Hits are always kept.
+    """
+    selected = set(hit_indices)
+    used = 0
+    for distance in range(1, len(children)):
+        grew = False
+        for hit in hit_indices:
+            for position in (hit - distance, hit + distance):
+                if position in selected or not 0 <= position < len(children):
+                    continue
+                tokens = count_tokens(children[position]['content'])
+                if used + tokens > budget:
+                    return sorted(selected)
+                selected.add(position)
+                used += tokens
+                grew = True
+        if not grew:
+            break
+    return sorted(selected)
+
+
+def merge_children(children: Sequence[Dict], positions: Sequence[int]) -> str:
+    """Text of the selected children of one section, without the overlap between neighbours"""
+    parts = []
+    previous = None
+    for position in positions:
+        child = children[position]
+        if previous is None:
+            parts.append(child['content'])
+        elif (child.get('chunk_index') or 0) == (children[previous].get('chunk_index') or 0) + 1:
+            overlap = child.get('overlap_chars') or 0
+            # Past the overlap, the text carries on with its own separator. Without
+            # one the chunk starts a new sentence, most often in the same paragraph
+            parts.append(child['content'][overlap:] if overlap else ' ' + child['content'])
+        else:
+            parts.append(GAP_SEPARATOR + child['content'])
+        previous = position
+    return ''.join(parts)
+
+
+def expand_to_parents(hits: List[Dict], siblings: Dict[str, List[Dict]], budget: int,
+                      count_tokens: Callable[[str], int]) -> List[Dict]:
+    """Replace child hits with their parent sections, best section first
+
+    siblings maps a parent_id to that section's children. Hits of the same
+    section are merged into one result that keeps the best hit's score and
+    metadata. The hits themselves always make it in; the remaining budget
+    (in tokens) goes to their neighbours, best section first. Hits without a
+    parent, e.g. from a collection imported before parent ids, pass through.
+    """
+    groups: Dict[str, List[Dict]] = {}
+    results = []
+    for hit in hits:
+        parent_id = hit.get('parent_id')
+        if not parent_id or parent_id not in siblings:
+            results.append(hit)
+        elif parent_id in groups:
+            groups[parent_id].append(hit)
+        else:
+            groups[parent_id] = [hit]
+            results.append(hit)
+
+    remaining = budget - sum(count_tokens(hit['content']) for hit in hits)
+    expanded = []
+    for result in results:
+        group = groups.get(result.get('parent_id'))
+        if group is None:
+            expanded.append(result)
+            continue
+        # The hits are children too, whether or not the sibling fetch returned them
+        by_index = {child.get('chunk_index') or 0: child for child in siblings[result['parent_id']]}
+        for hit in group:
+            by_index.setdefault(hit.get('chunk_index') or 0, hit)
+        children = [by_index[index] for index in sorted(by_index)]
+        positions = {child.get('chunk_index') or 0: i for i, child in enumerate(children)}
+        hit_positions = sorted({positions[hit.get('chunk_index') or 0] for hit in group})
+        selected = select_children(children, hit_positions, max(remaining, 0), count_tokens)
+        remaining -= sum(count_tokens(children[i]['content']) for i in selected if i not in hit_positions)
+        expanded.append({**result, 'content': merge_children(children, selected), 'children': len(selected)})
+    return expanded
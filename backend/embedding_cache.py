@@ -0,0 +1,135 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+EMBED_CACHE_PATH = os.environ.get("EMBED_CACHE_PATH", "data/embeddings.db")
+
+
+def text_hash(text: str) -> bytes:
+    return hashlib.sha256(text.encode('utf-8')).digest()
+
+
+class EmbeddingCache:
+    """Persistent embeddings keyed by (model, sha256 of the embedded text)
+
+    Vectors are stored as float32 blobs in SQLite (WAL mode), so the importer and
+    any number of API workers can share one file. Unchanged chunks hash to the
+    same key on every scrape and are never embedded twice.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS embeddings (
+            model TEXT NOT NULL,
+            text_hash BLOB NOT NULL,
+            vector BLOB NOT NULL,
+            created_at REAL NOT NULL,
+            PRIMARY KEY (model, text_hash)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS embed_timings (
+            model TEXT PRIMARY KEY,
+            texts INTEGER NOT NULL,
+            seconds REAL NOT NULL
+        );
+    """
+
+    # SQLite's default limit on host parameters per statement is 999
+    LOOKUP_CHUNK = 500
+
+    def __init__(self, path: str = EMBED_CACHE_PATH):
+        self.path = str(path)
+        if self.path != ':memory:':
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(self.SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread; sqlite3 connections must not be shared"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=10000")
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, model: str, hashes: List[bytes]) -> Dict[bytes, List[float]]:
+        """Return the cached vectors among `hashes`, keyed by hash"""
+        found = {}
+        conn = self._connection()
+        unique = list(dict.fromkeys(hashes))
+        for i in range(0, len(unique), self.LOOKUP_CHUNK):
+            chunk = unique[i:i + self.LOOKUP_CHUNK]
+            rows = conn.execute(
+                f"SELECT text_hash, vector FROM embeddings WHERE model = ? "
+                f"AND text_hash IN ({','.join('?' * len(chunk))})",
+                [model, *chunk]
+            )
+            for digest, blob in rows:
+                found[digest] = array('f', blob).tolist()
+
+        hits = sum(1 for digest in hashes if digest in found)
+        with self._lock:
+            self.hits += hits
+            self.misses += len(hashes) - hits
+        return found
+
+    def put_many(self, model: str, entries: Iterable[Tuple[bytes, List[float]]], seconds: float = 0.0):
+        """Store vectors, with the time it took to compute them for the time-saved estimate"""
+        now = time.time()
+        rows = [(model, digest, array('f', vector).tobytes(), now) for digest, vector in entries]
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, created_at) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            if seconds > 0:
+                conn.execute(
+                    "INSERT INTO embed_timings (model, texts, seconds) VALUES (?, ?, ?) "
+                    "ON CONFLICT(model) DO UPDATE SET texts = texts + excluded.texts, seconds = seconds + excluded.seconds",
+                    (model, len(rows), seconds)
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def count(self, model: Optional[str] = None) -> int:
+        if model is None:
+            return self._connection().execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM embeddings WHERE model = ?", (model,)
+        ).fetchone()[0]
+
+    def seconds_per_text(self, model: str) -> float:
+        """Average embedding time per text for a model over everything ever cached"""
+        row = self._connection().execute(
+            "SELECT texts, seconds FROM embed_timings WHERE model = ?", (model,)
+        ).fetchone()
+        return row[1] / row[0] if row and row[0] else 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
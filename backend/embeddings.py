@@ -0,0 +1,174 @@
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import requests
+
+from embedding_cache import EmbeddingCache, text_hash
+
+logger = logging.getLogger(__name__)
+
+OLLAMA_BASE_URL = os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434")
+EMBED_MODEL = os.environ.get("EMBED_MODEL", "nomic-embed-text")
+EMBED_BATCH_SIZE = int(os.environ.get("EMBED_BATCH_SIZE", "32"))
+EMBED_PARALLELISM = int(os.environ.get("EMBED_PARALLELISM", "2"))
+EMBED_TIMEOUT = float(os.environ.get("EMBED_TIMEOUT", "120"))
+# Matryoshka truncation: nomic-embed-text vectors keep most of their quality cut to
+# their first 512, 256 or 128 dimensions. 0 keeps the full vector. Imports and
+# queries must use the same value, so truncated collections need client embedding.
+EMBED_DIMENSIONS = int(os.environ.get("EMBED_DIMENSIONS", "0"))
+LAYER_NORM_EPS = 1e-5
+
+# Properties that make up the text the importer embeds with --embed client. Weaviate's
+# text2vec modules build their own text (properties sorted, class and property names
+# possibly included), so their vectors differ from these; the two must not share a collection.
+EMBEDDED_PROPERTIES = ("title", "section_header", "subsection_header", "content")
+
+
+def embedding_text(properties: Dict[str, Any]) -> str:
+    """The text that is embedded for one chunk"""
+    return '\n'.join(str(properties[name]) for name in EMBEDDED_PROPERTIES if properties.get(name))
+
+
+def truncate_embedding(vector: List[float], dimensions: int) -> List[float]:
+    """Layer-norm a full embedding, keep its first dimensions and rescale to unit length
+
+    The order nomic-embed-text's Matryoshka training expects. A vector that is
+    already the requested size (or dimensions is 0) is returned unchanged.
+    """
+    if not dimensions or dimensions == len(vector):
+        return vector
+    if dimensions > len(vector):
+        raise ValueError(f"Can't truncate a {len(vector)}-dimensional embedding to {dimensions} dimensions")
+    mean = sum(vector) / len(vector)
+    scale = 1 / math.sqrt(sum((x - mean) ** 2 for x in vector) / len(vector) + LAYER_NORM_EPS)
+    truncated = [(x - mean) * scale for x in vector[:dimensions]]
+    norm = math.sqrt(sum(x * x for x in truncated)) or 1.0
+    return [x / norm for x in truncated]
+
+
+class OllamaEmbedder:
+    """Embed texts in batches through Ollama's /api/embed
+
+    One request carries up to batch_size texts and up to parallelism requests
+    are in flight at once, so Ollama can fill its parallel slots instead of
+    handling one text per round trip. With a cache, only texts it doesn't hold
+    are sent to Ollama. The cache holds full vectors, truncation to dimensions
+    is applied on the way out.
+    """
+
+    def __init__(self, base_url: str = OLLAMA_BASE_URL, model: str = EMBED_MODEL,
+                 batch_size: int = EMBED_BATCH_SIZE, parallelism: int = EMBED_PARALLELISM,
+                 timeout: float = EMBED_TIMEOUT, cache: Optional[EmbeddingCache] = None,
+                 dimensions: int = EMBED_DIMENSIONS):
+        self.base_url = base_url.rstrip('/')
+        self.model = model
+        self.dimensions = dimensions
+        self.batch_size = max(1, batch_size)
+        self.parallelism = max(1, parallelism)
+        self.timeout = timeout
+        self.cache = cache
+        self.session = requests.Session()
+        # Summed request time across threads, so it can exceed wall time
+        self.embed_seconds = 0.0
+        self.embedded = 0
+        self._lock = threading.Lock()
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed one batch of texts, in a single request for those not cached"""
+        vectors = self._embed_full(texts)
+        if self.dimensions:
+            return [truncate_embedding(vector, self.dimensions) for vector in vectors]
+        return vectors
+
+    def _embed_full(self, texts: List[str]) -> List[List[float]]:
+        if not texts or self.cache is None:
+            return self._request(texts)
+
+        hashes = [text_hash(text) for text in texts]
+        vectors = self.cache.get_many(self.model, hashes)
+        missing = {digest: text for digest, text in zip(hashes, texts) if digest not in vectors}
+        if missing:
+            start = time.time()
+            fresh = dict(zip(missing, self._request(list(missing.values()))))
+            self.cache.put_many(self.model, fresh.items(), seconds=time.time() - start)
+            vectors.update(fresh)
+        return [vectors[digest] for digest in hashes]
+
+    def vector_size(self) -> int:
+        """Length of the vectors embed returns; without truncation Ollama is asked, bypassing the cache"""
+        return self.dimensions or len(self._request(['dimensions'])[0])
+
+    def embed_one(self, text: str) -> List[float]:
+        return self.embed([text])[0]
+
+    def _request(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        start = time.time()
+        response = self.session.post(
+            f"{self.base_url}/api/embed",
+            json={"model": self.model, "input": texts, "keep_alive": "30m"},
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        embeddings = response.json()["embeddings"]
+        if len(embeddings) != len(texts):
+            raise ValueError(f"Expected {len(texts)} embeddings, got {len(embeddings)}")
+        with self._lock:
+            self.embed_seconds += time.time() - start
+            self.embedded += len(texts)
+        return embeddings
+
+    def cache_report(self) -> Dict[str, Any]:
+        """Cache hit rate and the embedding time the hits saved
+
+        Time saved is estimated from the average time per text of all
+        embeddings ever stored for the model, so a fully cached run still has one.
+        """
+        if self.cache is None:
+            return {'enabled': False}
+        per_text = self.cache.seconds_per_text(self.model)
+        return {
+            'enabled': True,
+            'model': self.model,
+            'hits': self.cache.hits,
+            'misses': self.cache.misses,
+            'hit_rate': round(self.cache.hit_rate, 4),
+            'embedded': self.embedded,
+            'embed_seconds': round(self.embed_seconds, 3),
+            'estimated_seconds_saved': round(self.cache.hits * per_text, 3)
+        }
+
+    def embed_all(self, texts: List[str]) -> List[List[float]]:
+        """Embed any number of texts, batched and in parallel, keeping their order"""
+        vectors = []
+        for _, batch_vectors in self.embed_stream((text, text) for text in texts):
+            vectors.extend(batch_vectors)
+        return vectors
+
+    def embed_stream(self, items: Iterable[Tuple[Any, str]]) -> Iterator[Tuple[List[Any], List[List[float]]]]:
+        """Embed a stream of (item, text) pairs and yield (items, vectors) per batch, in order
+
+        Only parallelism * 2 batches are read ahead, so the input is never loaded whole.
+        """
+        items = iter(items)
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self.parallelism, thread_name_prefix='embed') as executor:
+            while True:
+                while len(pending) < self.parallelism * 2:
+                    batch = list(islice(items, self.batch_size))
+                    if not batch:
+                        break
+                    keys = [key for key, _ in batch]
+                    pending.append((keys, executor.submit(self.embed, [text for _, text in batch])))
+                if not pending:
+                    break
+                keys, future = pending.popleft()
+                yield keys, future.result()
@@ -0,0 +1,58 @@
+import os
+from typing import Dict, Optional
+
+# Ollama reads sampling and runtime settings from "options"; top-level keys are ignored
+GENERATION_PROFILES = {
+    'fast': {
+        'num_ctx': 2048,
+        'num_predict': 256,
+        'temperature': 0.3,
+        'top_p': 0.9
+    },
+    'balanced': {
+        'num_ctx': 4096,
+        'num_predict': 768,
+        'temperature': 0.7,
+        'top_p': 0.9
+    },
+    'thorough': {
+        'num_ctx': 8192,
+        'num_predict': 1536,
+        'temperature': 0.7,
+        'top_p': 0.95
+    }
+}
+
+DEFAULT_PROFILE = os.environ.get("OLLAMA_GENERATION_PROFILE", "balanced")
+# Unset lets Ollama pick the thread count; set it to the number of physical cores on CPU hosts
+NUM_THREAD = os.environ.get("OLLAMA_NUM_THREAD")
+KEEP_ALIVE = os.environ.get("OLLAMA_KEEP_ALIVE", "30m")
+
+if DEFAULT_PROFILE not in GENERATION_PROFILES:
+    raise ValueError(f"Unknown OLLAMA_GENERATION_PROFILE: {DEFAULT_PROFILE}")
+
+
+def build_options(profile: Optional[str] = None, num_predict: Optional[int] = None) -> Dict:
+    """Build the Ollama options for a profile, optionally capping num_predict"""
+    profile = profile or DEFAULT_PROFILE
+    if profile not in GENERATION_PROFILES:
+        raise ValueError(f"Unknown generation profile: {profile}")
+
+    options = dict(GENERATION_PROFILES[profile])
+    if num_predict is not None:
+        options['num_predict'] = min(options['num_predict'], num_predict)
+    if NUM_THREAD:
+        options['num_thread'] = int(NUM_THREAD)
+    return options
+
+
+def build_generate_payload(model: str, prompt: str, profile: Optional[str] = None,
+                           num_predict: Optional[int] = None, stream: bool = False) -> Dict:
+    """Build a /api/generate request body for the given model and profile"""
+    return {
+        "model": model,
+        "prompt": prompt,
+        "stream": stream,
+        "keep_alive": KEEP_ALIVE,
+        "options": build_options(profile, num_predict)
+    }
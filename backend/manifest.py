@@ -0,0 +1,143 @@
+import hashlib
+import json
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from chunk_identity import ChunkKeyer, chunk_uuid, content_hash
+from chunk_reader import iter_chunks
+
+MANIFEST_DIR = Path('scrape/raw_data/manifests')
+MANIFEST_FORMAT = 1
+
+# Which manifest each collection was imported from, one object per collection
+STAMP_COLLECTION = "CorpusStamp"
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_manifest(version: str, chunks_file: Path, sources: Dict[str, str],
+                   counts: Optional[Dict[str, int]] = None, dataset_file: Optional[Path] = None) -> Dict[str, Any]:
+    """Describe one scraper run: its files, per-chunk content hashes and source HTML hashes
+
+    corpus_hash covers every chunk's identity and content hash, so two runs that
+    produced the same chunks share it even though their versions differ.
+    """
+    keyer = ChunkKeyer()
+    chunks = []
+    for _, properties in iter_chunks(chunks_file):
+        key = keyer.key(properties)
+        chunks.append({'key': key, 'uuid': chunk_uuid(key), 'content_hash': content_hash(properties)})
+
+    corpus = hashlib.sha256()
+    for chunk in chunks:
+        corpus.update(f"{chunk['uuid']}:{chunk['content_hash']}\n".encode('utf-8'))
+
+    return {
+        'format': MANIFEST_FORMAT,
+        'version': version,
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'chunks_file': str(chunks_file),
+        'chunks_sha256': file_sha256(chunks_file),
+        'dataset_file': str(dataset_file) if dataset_file else None,
+        'corpus_hash': corpus.hexdigest(),
+        'counts': dict(counts or {}, chunks=len(chunks), sources=len(sources)),
+        'chunks': chunks,
+        'sources': {url: sources[url] for url in sorted(sources)}
+    }
+
+
+def write_manifest(manifest: Dict[str, Any], directory: Path = MANIFEST_DIR) -> Path:
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{manifest['version']}.json"
+    path.write_text(json.dumps(manifest, indent=1), encoding='utf-8')
+    return path
+
+
+def list_versions(directory: Path = MANIFEST_DIR) -> List[str]:
+    """Manifest versions, oldest first (versions are run timestamps)"""
+    return sorted(path.stem for path in directory.glob('*.json'))
+
+
+def load_manifest(version: str = 'latest', directory: Path = MANIFEST_DIR) -> Dict[str, Any]:
+    """Load a manifest by version, 'latest', or path to a manifest file"""
+    path = Path(version)
+    if path.suffix != '.json':
+        if version == 'latest':
+            versions = list_versions(directory)
+            if not versions:
+                raise FileNotFoundError(f"No manifests in {directory}")
+            version = versions[-1]
+        path = directory / f"{version}.json"
+    if not path.exists():
+        raise FileNotFoundError(f"No manifest {path}")
+    return json.loads(path.read_text(encoding='utf-8'))
+
+
+def manifest_chunks_file(manifest: Dict[str, Any], verify: bool = True) -> Path:
+    """The chunks file a manifest describes, checked against its recorded hash"""
+    path = Path(manifest['chunks_file'])
+    if verify and file_sha256(path) != manifest['chunks_sha256']:
+        raise ValueError(f"{path} doesn't match manifest {manifest['version']} (sha256 differs)")
+    return path
+
+
+def stamp_uuid(collection_name: str) -> str:
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"corpus-stamp/{collection_name}"))
+
+
+def read_stamp(client, collection_name: str) -> Optional[Dict[str, Any]]:
+    """The manifest stamp of a collection (v4 client), None if it was never stamped"""
+    if not client.collections.exists(STAMP_COLLECTION):
+        return None
+    obj = client.collections.get(STAMP_COLLECTION).query.fetch_object_by_id(stamp_uuid(collection_name))
+    return dict(obj.properties) if obj else None
+
+
+def stamp_collection(client, collection_name: str, manifest: Dict[str, Any]) -> Dict[str, Any]:
+    """Record which manifest a collection now holds (v4 client)"""
+    from weaviate.classes.config import Configure, DataType, Property
+
+    if not client.collections.exists(STAMP_COLLECTION):
+        client.collections.create(
+            name=STAMP_COLLECTION,
+            description="Which scraper manifest each collection was imported from",
+            vectorizer_config=Configure.Vectorizer.none(),
+            properties=[
+                Property(name="collection", data_type=DataType.TEXT),
+                Property(name="manifest_version", data_type=DataType.TEXT),
+                Property(name="corpus_hash", data_type=DataType.TEXT),
+                Property(name="chunks", data_type=DataType.INT),
+                Property(name="imported_at", data_type=DataType.TEXT),
+            ]
+        )
+
+    stamps = client.collections.get(STAMP_COLLECTION)
+    properties = {
+        "collection": collection_name,
+        "manifest_version": manifest['version'],
+        "corpus_hash": manifest['corpus_hash'],
+        "chunks": manifest['counts']['chunks'],
+        "imported_at": datetime.now(timezone.utc).isoformat()
+    }
+    object_uuid = stamp_uuid(collection_name)
+    if stamps.query.fetch_object_by_id(object_uuid) is None:
+        stamps.data.insert(properties=properties, uuid=object_uuid)
+    else:
+        stamps.data.replace(uuid=object_uuid, properties=properties)
+    return properties
+
+
+def clear_stamp(client, collection_name: str):
+    """Forget a collection's stamp, e.g. after importing a file no manifest describes"""
+    if client.collections.exists(STAMP_COLLECTION):
+        stamps = client.collections.get(STAMP_COLLECTION)
+        if stamps.query.fetch_object_by_id(stamp_uuid(collection_name)) is not None:
+            stamps.data.delete_by_id(stamp_uuid(collection_name))
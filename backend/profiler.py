@@ -0,0 +1,94 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# Leaf frames of threads that are parked rather than doing work
+IDLE_FUNCTIONS = {
+    ('threading.py', 'wait'),
+    ('threading.py', '_wait_for_tstate_lock'),
+    ('selectors.py', 'select'),
+    ('socket.py', 'accept'),
+    ('socketserver.py', 'serve_forever'),
+    ('queue.py', 'get'),
+}
+
+
+def peak_memory_bytes():
+    """Peak resident memory of this process in bytes, or None where getrusage isn't available"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class ProfilerBusy(Exception):
+    """Raised when a profile is requested while another one is running"""
+
+
+class SamplingProfiler:
+    """Sample the stacks of all threads at a fixed interval
+
+    Sampling reads sys._current_frames() from the calling thread, so nothing is
+    hooked into the profiled code and the overhead is one stack walk per thread
+    per interval. Only one profile can run at a time.
+    """
+
+    def __init__(self, max_seconds: float = 60, min_interval: float = 0.001, max_depth: int = 128):
+        self.max_seconds = max_seconds
+        self.min_interval = min_interval
+        self.max_depth = max_depth
+        self._lock = threading.Lock()
+
+    def _frame_label(self, frame, with_lines: bool) -> str:
+        code = frame.f_code
+        label = f"{os.path.basename(code.co_filename)}:{code.co_name}"
+        if with_lines:
+            label += f":{frame.f_lineno}"
+        return label
+
+    def profile(self, seconds: float, interval: float = 0.005, include_idle: bool = False,
+                with_lines: bool = False) -> Counter:
+        """Sample for `seconds` and return counts of collapsed stacks (root first, ';'-separated)"""
+        seconds = min(max(seconds, 0.0), self.max_seconds)
+        interval = max(interval, self.min_interval)
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("A profile is already running")
+
+        try:
+            own_thread = threading.get_ident()
+            stacks = Counter()
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_thread:
+                        continue
+                    if not include_idle:
+                        code = frame.f_code
+                        if (os.path.basename(code.co_filename), code.co_name) in IDLE_FUNCTIONS:
+                            continue
+
+                    labels = []
+                    while frame is not None and len(labels) < self.max_depth:
+                        labels.append(self._frame_label(frame, with_lines))
+                        frame = frame.f_back
+                    labels.append(names.get(thread_id, f"thread-{thread_id}"))
+                    stacks[';'.join(reversed(labels))] += 1
+                time.sleep(interval)
+            return stacks
+        finally:
+            self._lock.release()
+
+
+def format_collapsed(stacks: Counter, min_count: int = 1) -> str:
+    """Render stacks in the collapsed format read by flamegraph.pl and speedscope"""
+    return '\n'.join(
+        f"{stack} {count}"
+        for stack, count in stacks.most_common()
+        if count >= min_count
+    ) + '\n'
@@ -0,0 +1,116 @@
+import os
+import re
+from typing import Iterable, Iterator, List, Tuple
+
+# Chunk size in tokens, including the title and headers that are embedded with it.
+# Well inside nomic-embed-text's context, so nothing is cut off when embedding.
+CHUNK_MAX_TOKENS = int(os.environ.get("CHUNK_MAX_TOKENS", "300"))
+CHUNK_OVERLAP_TOKENS = int(os.environ.get("CHUNK_OVERLAP_TOKENS", "50"))
+# Never leave less than this for content, however long the headers are
+MIN_CONTENT_TOKENS = 50
+
+# Same approximation as benchmarks/common.estimate_tokens: words and punctuation
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+# Whitespace after ., ! or ? (and closing quotes/brackets) followed by the start of a sentence
+SENTENCE_BREAK = re.compile(r"(?<=[.!?])[\"')\]]*\s+(?=[\"(\[]?[A-Z0-9])")
+
+# (text, tokens, starts a paragraph)
+Unit = Tuple[str, int, bool]
+
+
+def count_tokens(text: str) -> int:
+    return sum(1 for _ in TOKEN_PATTERN.finditer(text or ''))
+
+
+class TokenChunker:
+    """Split paragraphs into chunks of at most max_tokens, on sentence boundaries
+
+    One pass over the text: each paragraph is split into sentences once, each
+    sentence is counted once, and sentences are packed greedily into a window.
+    When the next sentence doesn't fit, the window is emitted and its last
+    sentences (up to overlap tokens) start the next one. A sentence longer
+    than a whole chunk is split between words.
+    """
+
+    def __init__(self, max_tokens: int = CHUNK_MAX_TOKENS, overlap: int = CHUNK_OVERLAP_TOKENS):
+        if overlap >= max_tokens:
+            raise ValueError(f"Overlap ({overlap}) must be smaller than the chunk size ({max_tokens})")
+        self.max_tokens = max_tokens
+        self.overlap = overlap
+
+    def units(self, paragraphs: Iterable[str], budget: int) -> Iterator[Unit]:
+        """Sentences of every paragraph with their token counts"""
+        for paragraph in paragraphs:
+            # Collapse whitespace within each line, keeping its indent (nested list items)
+            paragraph = '\n'.join(
+                line[:len(line) - len(line.lstrip())] + ' '.join(line.split())
+                for line in paragraph.splitlines() if line.strip()
+            )
+            first = True
+            for sentence in SENTENCE_BREAK.split(paragraph):
+                if not sentence:
+                    continue
+                tokens = [match.start() for match in TOKEN_PATTERN.finditer(sentence)]
+                if len(tokens) <= budget:
+                    yield sentence, len(tokens), first
+                else:
+                    # Cut an overlong sentence at the start of every budget-th token
+                    for start in range(0, len(tokens), budget):
+                        end = tokens[start + budget] if start + budget < len(tokens) else len(sentence)
+                        begin = tokens[start] if start else 0
+                        yield sentence[begin:end].rstrip(), min(budget, len(tokens) - start), first
+                        first = False
+                first = False
+
+    def split(self, paragraphs: Iterable[str], reserved: int = 0) -> List[str]:
+        """Chunk texts for a run of paragraphs; reserved tokens are kept free for headers"""
+        return [text for text, _ in self.chunks(paragraphs, reserved)]
+
+    def chunks(self, paragraphs: Iterable[str], reserved: int = 0) -> List[Tuple[str, int]]:
+        """(chunk text, length of its prefix repeated from the previous chunk) for a run of paragraphs
+
+        Dropping that prefix from every chunk but the first and concatenating
+        them gives back the whole run; a chunk without one starts a new sentence,
+        and the space or paragraph break before it isn't kept.
+        """
+        budget = max(min(MIN_CONTENT_TOKENS, self.max_tokens), self.max_tokens - reserved)
+        overlap = min(self.overlap, budget // 2)
+        chunks: List[Tuple[str, int]] = []
+        window: List[Unit] = []
+        size = 0
+        carried = 0  # characters at the start of the window that the previous chunk ends with
+        fresh = 0  # units in the window that no chunk holds yet
+
+        for unit in self.units(paragraphs, budget):
+            if window and size + unit[1] > budget:
+                chunks.append((self._join(window), carried))
+                window, size = self._tail(window, overlap)
+                if size + unit[1] > budget:
+                    window, size = [], 0
+                carried = len(self._join(window))
+                fresh = 0
+            window.append(unit)
+            size += unit[1]
+            fresh += 1
+
+        if fresh:
+            chunks.append((self._join(window), carried))
+        return chunks
+
+    @staticmethod
+    def _tail(window: List[Unit], overlap: int) -> Tuple[List[Unit], int]:
+        """The last sentences of a window that fit in the overlap"""
+        size, start = 0, len(window)
+        while start > 0 and size + window[start - 1][1] <= overlap:
+            start -= 1
+            size += window[start][1]
+        return window[start:], size
+
+    @staticmethod
+    def _join(window: List[Unit]) -> str:
+        parts = []
+        for i, (text, _, starts_paragraph) in enumerate(window):
+            if i:
+                parts.append('\n\n' if starts_paragraph else ' ')
+            parts.append(text)
+        return ''.join(parts)
@@ -1,8 +1,11 @@
-from bs4 import BeautifulSoup
-from typing import Dict, List, Optional
-from dataclasses import dataclass
+from bs4 import BeautifulSoup, Tag
+from typing import Dict, List, Optional, Tuple
+from collections import Counter
+from dataclasses import dataclass, field
 import re
+import uuid
 from datetime import datetime
+from chunker import TokenChunker, count_tokens
 
 @dataclass
 class ProcessedContent:
@@ -16,8 +19,102 @@ class ProcessedContent:
     subsection_header: Optional[str]
     content: str
     timestamp: str
+    # Chunks of one section run share a parent_id; chunk_index orders them and
+    # overlap_chars is how much of the content repeats the previous chunk
+    parent_id: Optional[str] = None
+    chapter_id: Optional[str] = None
+    chunk_index: int = 0
+    overlap_chars: int = 0
+
+
+def chapter_id(url: str) -> str:
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, url))
+
+
+def section_id(url: str, section_header: str, subsection_header: Optional[str], occurrence: int = 0) -> str:
+    """Stable id of one section run of a chapter, numbered when a header repeats"""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{url}#{section_header}/{subsection_header or ''}/{occurrence}"))
+
+
+# Document model of a chapter page: chapter -> h2 sections -> h3 subsections -> blocks.
+# A block is a paragraph, a list item or a table row, as plain text.
+@dataclass
+class Subsection:
+    header: Optional[str]  # None for the text between the h2 and its first h3
+    blocks: List[str] = field(default_factory=list)
+
+
+@dataclass
+class Section:
+    header: str
+    subsections: List[Subsection] = field(default_factory=list)
+
+
+@dataclass
+class Chapter:
+    url: str
+    metadata: Dict[str, str]
+    sections: List[Section] = field(default_factory=list)
+
+    def runs(self) -> List[Tuple[str, Optional[str], List[str]]]:
+        """(section header, subsection header, blocks) of every non-empty subsection, in page order"""
+        return [
+            (section.header, subsection.header, subsection.blocks)
+            for section in self.sections
+            for subsection in section.subsections
+            if subsection.blocks
+        ]
+
+
+LIST_TAGS = ('ul', 'ol')
+# Lower headings inside a subsection are kept as text blocks
+BLOCK_TAGS = ('p', 'h4', 'h5', 'h6')
+
+
+def element_text(element: Tag) -> str:
+    """Text of an element with its whitespace collapsed, words of adjacent inline tags kept apart"""
+    return ' '.join(element.get_text().split())
+
+
+def list_blocks(element: Tag, depth: int = 0) -> List[str]:
+    """One '- item' block per list item (numbered for ol), nested lists indented under their item"""
+    blocks = []
+    for number, item in enumerate(element.find_all('li', recursive=False), 1):
+        # The item's own text, without that of the lists nested in it
+        text = ' '.join(' '.join(
+            string for string in item.find_all(string=True) if string.find_parent(LIST_TAGS) is element
+        ).split())
+        if text:
+            marker = f"{number}." if element.name == 'ol' else '-'
+            blocks.append(f"{'  ' * depth}{marker} {text}")
+        for nested in item.find_all(LIST_TAGS):
+            if nested.find_parent('li') is item:
+                blocks.extend(list_blocks(nested, depth + 1))
+    return blocks
+
+
+def table_blocks(element: Tag) -> List[str]:
+    """One block per table row; with a header row, every cell is labelled with its column"""
+    rows = [row.find_all(['th', 'td'], recursive=False) for row in element.find_all('tr')]
+    rows = [row for row in rows if row]
+    header = []
+    if len(rows) > 1 and all(cell.name == 'th' for cell in rows[0]):
+        header = [element_text(cell) for cell in rows.pop(0)]
+    blocks = []
+    for row in rows:
+        cells = [element_text(cell) for cell in row]
+        names = header + [''] * (len(cells) - len(header))
+        text = ' | '.join(f"{name}: {cell}" if name else cell for name, cell in zip(names, cells) if cell)
+        if text:
+            blocks.append(text)
+    return blocks
+
 
 class ContentProcessor:
+    def __init__(self, chunker: Optional[TokenChunker] = None):
+        # Sections are split into chunks of at most CHUNK_MAX_TOKENS
+        self.chunker = chunker or TokenChunker()
+
     def extract_metadata(self, soup: BeautifulSoup, url: str) -> Dict[str, str]:
         metadata = {
             'title': '',
@@ -54,96 +151,75 @@ class ContentProcessor:
             
         return metadata
 
+    def extract_document(self, soup: BeautifulSoup, url: str) -> Chapter:
+        """Build the chapter's document model in one walk over the body
+
+        Text before the first h2 isn't part of any section and is left out,
+        as is anything that isn't a paragraph, list, table or lower heading.
+        """
+        chapter = Chapter(url=url, metadata=self.extract_metadata(soup, url))
+        content = soup.find('section', id='book-content')
+        main_content = content.find('div', class_='field--name-body') if content else None
+        if main_content:
+            self._walk(main_content, chapter.sections)
+        return chapter
+
+    def _walk(self, node: Tag, sections: List[Section]):
+        for element in node.children:
+            if not isinstance(element, Tag):
+                continue
+            if element.name == 'h2':
+                sections.append(Section(header=element_text(element), subsections=[Subsection(header=None)]))
+            elif not sections:
+                # Nothing before the first h2 belongs to a section, but the h2 may be nested further in
+                self._walk(element, sections)
+            elif element.name == 'h3':
+                sections[-1].subsections.append(Subsection(header=element_text(element)))
+            elif element.name in BLOCK_TAGS:
+                text = element_text(element)
+                if text:
+                    sections[-1].subsections[-1].blocks.append(text)
+            elif element.name in LIST_TAGS:
+                sections[-1].subsections[-1].blocks.extend(list_blocks(element))
+            elif element.name == 'table':
+                sections[-1].subsections[-1].blocks.extend(table_blocks(element))
+            else:
+                self._walk(element, sections)
+
+    def extract_sections(self, soup: BeautifulSoup) -> List[Tuple[str, Optional[str], List[str]]]:
+        return self.extract_document(soup, '').runs()
+
     def process_content(self, soup: BeautifulSoup, url: str) -> List[ProcessedContent]:
         processed_contents = []
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        # Extract metadata
-        metadata = self.extract_metadata(soup, url)
-        
-        # Find main content
-        content = soup.find('section', id='book-content')
-        if not content:
-            return []
-            
-        main_content = content.find('div', class_='field--name-body')
-        if not main_content:
-            return []
-        
-        current_section = None
-        current_section_header = None
-        current_section_content = []
-        
-        # Process all h2, h3, and p elements
-        for element in main_content.find_all(['h2', 'h3', 'p']):
-            if element.name == 'h2':
-                # Save previous section if exists
-                if current_section_header and current_section_content:
-                    processed_contents.append(
-                        ProcessedContent(
-                            url=url,
-                            title=metadata['title'],
-                            volume_number=metadata['volume_number'],
-                            part_letter=metadata['part_letter'],
-                            chapter_number=metadata['chapter_number'],
-                            last_updated=metadata['last_updated'],
-                            section_header=current_section_header,
-                            subsection_header=None,
-                            content='\n\n'.join(current_section_content),
-                            timestamp=timestamp
-                        )
-                    )
-                
-                current_section_header = element.get_text(strip=True)
-                current_section = {'content': [], 'subsections': []}
-                current_section_content = []
-                
-            elif element.name == 'h3' and current_section_header:
-                # Save previous subsection content to main section
-                if current_section_content:
-                    processed_contents.append(
-                        ProcessedContent(
-                            url=url,
-                            title=metadata['title'],
-                            volume_number=metadata['volume_number'],
-                            part_letter=metadata['part_letter'],
-                            chapter_number=metadata['chapter_number'],
-                            last_updated=metadata['last_updated'],
-                            section_header=current_section_header,
-                            subsection_header=None,
-                            content='\n\n'.join(current_section_content),
-                            timestamp=timestamp
-                        )
+
+        chapter = self.extract_document(soup, url)
+        metadata = chapter.metadata
+
+        occurrences = Counter()
+        for section_header, subsection_header, paragraphs in chapter.runs():
+            parent_id = section_id(url, section_header, subsection_header, occurrences[section_header, subsection_header])
+            occurrences[section_header, subsection_header] += 1
+            # The title and headers are embedded with every chunk, so leave room for them
+            reserved = count_tokens('\n'.join(filter(None, (metadata['title'], section_header, subsection_header))))
+            for index, (text, overlap_chars) in enumerate(self.chunker.chunks(paragraphs, reserved)):
+                processed_contents.append(
+                    ProcessedContent(
+                        url=url,
+                        title=metadata['title'],
+                        volume_number=metadata['volume_number'],
+                        part_letter=metadata['part_letter'],
+                        chapter_number=metadata['chapter_number'],
+                        last_updated=metadata['last_updated'],
+                        section_header=section_header,
+                        subsection_header=subsection_header,
+                        content=text,
+                        timestamp=timestamp,
+                        parent_id=parent_id,
+                        chapter_id=chapter_id(url),
+                        chunk_index=index,
+                        overlap_chars=overlap_chars
                     )
-                    current_section_content = []
-                
-                # Start new subsection
-                subsection_header = element.get_text(strip=True)
-                current_section['subsections'].append({
-                    'header': subsection_header,
-                    'content': []
-                })
-                
-            elif element.name == 'p':
-                text = element.get_text(strip=True)
-                if text:
-                    current_section_content.append(text)
-        
-        # Add final section/subsection
-        if current_section_header and current_section_content:
-            processed_contents.append(
-                ProcessedContent(
-                    url=url,
-                    title=metadata['title'],
-                    volume_number=metadata['volume_number'],
-                    part_letter=metadata['part_letter'],
-                    chapter_number=metadata['chapter_number'],
-                    last_updated=metadata['last_updated'],
-                    section_header=current_section_header,
-                    subsection_header=None,
-                    content='\n\n'.join(current_section_content),
-                    timestamp=timestamp
                 )
-            )
-        
-        return processed_contents
\ No newline at end of file
+
+        return processed_contents
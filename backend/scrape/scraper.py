@@ -1,38 +1,27 @@
 import requests
 from bs4 import BeautifulSoup
+import sys
 import time
-import logging
 from pathlib import Path
 from typing import Dict, Optional, List
 from content_processor import ContentProcessor
 from storage import StorageManager
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from chunk_dataset import convert_jsonl, pa
+from manifest import build_manifest, write_manifest
+from structured_logging import setup_logging
+
 # Set up logging
 logs_path = Path('scrape/logs')
-logs_path.mkdir(parents=True, exist_ok=True)
-
-# Create a formatter
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-
-# Set up file handler
-file_handler = logging.FileHandler(logs_path / 'scraper.log')
-file_handler.setFormatter(formatter)
-
-# Set up console handler
-console_handler = logging.StreamHandler()
-console_handler.setFormatter(formatter)
-
-# Configure root logger
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
-logger.addHandler(file_handler)
-logger.addHandler(console_handler)
+logger = setup_logging(log_file=logs_path / 'scraper.log')
 
 
 class USCISManualScraper:
     def __init__(self):
         self.storage = StorageManager()
         self.processor = ContentProcessor()
+        self.counts = {'chapters': 0, 'chapter_errors': 0}
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
@@ -58,7 +47,7 @@ class USCISManualScraper:
             # Check local storage first
             cached_content = self.storage.get_html_content(url)
             if cached_content:
-                logger.info(f"Using cached content for {url}")
+                logger.info(f"Using cached content for {url}", extra={'sample': True})
                 return BeautifulSoup(cached_content, 'html.parser')
             
             # If not found locally, fetch from web
@@ -149,9 +138,11 @@ class USCISManualScraper:
             for content in processed_contents:
                 self.storage.save_processed_content(content)
                 
+            self.counts['chapters'] += 1
             logger.info(f"Successfully processed: {url}")
             
         except Exception as e:
+            self.counts['chapter_errors'] += 1
             logger.error(f"Error processing chapter {url}: {e}")
 
     def main(self):
@@ -187,6 +178,22 @@ class USCISManualScraper:
         except Exception as e:
             logger.error(f"Fatal error in main: {e}")
 
+        chunks_file = self.storage.current_chunks_file
+        if not chunks_file.exists():
+            logger.warning("No chunks were written, skipping the manifest")
+            return
+
+        # Columnar copy of the run's chunks for fast scans, when pyarrow is installed
+        dataset = None
+        if pa is not None:
+            dataset = convert_jsonl(chunks_file)
+            logger.info(f"Wrote columnar dataset {dataset}")
+
+        manifest = build_manifest(self.storage.run_timestamp, chunks_file, self.storage.source_hashes,
+                                  counts=self.counts, dataset_file=dataset)
+        path = write_manifest(manifest)
+        logger.info(f"Wrote manifest {path}: {manifest['counts']}")
+
 if __name__ == '__main__':
     scraper = USCISManualScraper()
     scraper.main()
\ No newline at end of file
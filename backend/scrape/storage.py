@@ -1,4 +1,5 @@
 from pathlib import Path
+import hashlib
 import json
 from datetime import datetime
 from typing import Optional
@@ -17,18 +18,23 @@ class StorageManager:
         # Create timestamp once for this run
         self.run_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.current_chunks_file = self.chunks_dir / f"{self.run_timestamp}_content_chunks.jsonl"
+        # SHA-256 of every source page used in this run, for the run's manifest
+        self.source_hashes = {}
     
     def get_html_content(self, url: str) -> Optional[str]:
         """Get HTML content from local storage"""
         file_path = self._get_html_path(url)
         if file_path.exists():
-            return file_path.read_text(encoding='utf-8')
+            content = file_path.read_text(encoding='utf-8')
+            self._record_source(url, content)
+            return content
         return None
     
     def save_html_content(self, url: str, content: str):
         """Save HTML content to local storage"""
         file_path = self._get_html_path(url)
         file_path.write_text(content, encoding='utf-8')
+        self._record_source(url, content)
     
     def save_processed_content(self, processed_content: ProcessedContent):
         """Save processed content to the current run's chunks file"""
@@ -43,9 +49,16 @@ class StorageManager:
                 'section_header': processed_content.section_header,
                 'subsection_header': processed_content.subsection_header,
                 'content': processed_content.content,
-                'timestamp': self.run_timestamp
+                'timestamp': self.run_timestamp,
+                'parent_id': processed_content.parent_id,
+                'chapter_id': processed_content.chapter_id,
+                'chunk_index': processed_content.chunk_index,
+                'overlap_chars': processed_content.overlap_chars
             }) + '\n')
     
+    def _record_source(self, url: str, content: str):
+        self.source_hashes[url] = hashlib.sha256(content.encode('utf-8')).hexdigest()
+
     def _get_html_path(self, url: str) -> Path:
         """Convert URL to file path"""
         safe_filename = url.replace('https://', '').replace('/', '_') + '.html'
@@ -0,0 +1,281 @@
+import logging
+import os
+from abc import ABC, abstractmethod
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Message = Tuple[str, str]
+
+
+class SessionStore(ABC):
+    """Interface for chat session storage, one (question, answer) list per session
+
+    With a ttl, a background thread calls cleanup every cleanup_interval seconds.
+    """
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = ttl
+        self._closed = threading.Event()
+        self._cleanup_thread = None
+
+    @abstractmethod
+    def append(self, session_id: str, question: str, answer: str):
+        ...
+
+    @abstractmethod
+    def tail(self, session_id: str, limit: int) -> List[Message]:
+        """Return the last `limit` messages of a session, oldest first"""
+
+    @abstractmethod
+    def clear(self, session_id: str):
+        ...
+
+    def cleanup(self) -> int:
+        """Remove expired sessions, returning how many were removed"""
+        return 0
+
+    def _start_cleanup(self, interval: Optional[float]):
+        if self.ttl and interval:
+            self._cleanup_thread = threading.Thread(
+                target=self._cleanup_loop, args=(interval,),
+                name='session-cleanup', daemon=True
+            )
+            self._cleanup_thread.start()
+
+    def _cleanup_loop(self, interval: float):
+        while not self._closed.wait(interval):
+            try:
+                removed = self.cleanup()
+                if removed:
+                    logger.info(f"Removed {removed} expired chat sessions")
+            except Exception as e:
+                logger.error(f"Error cleaning up chat sessions: {e}")
+
+    def close(self):
+        self._closed.set()
+
+
+class MemorySessionStore(SessionStore):
+    """Process-local store, only suitable for a single worker"""
+
+    def __init__(self, ttl: Optional[float] = None, cleanup_interval: Optional[float] = 300):
+        super().__init__(ttl)
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, List[Message]] = {}
+        self._updated_at: Dict[str, float] = {}
+        self._start_cleanup(cleanup_interval)
+
+    def append(self, session_id: str, question: str, answer: str):
+        with self._lock:
+            self._sessions.setdefault(session_id, []).append((question, answer))
+            self._updated_at[session_id] = time.time()
+
+    def tail(self, session_id: str, limit: int) -> List[Message]:
+        with self._lock:
+            return list(self._sessions.get(session_id, [])[-limit:]) if limit > 0 else []
+
+    def clear(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._updated_at.pop(session_id, None)
+
+    def cleanup(self) -> int:
+        if not self.ttl:
+            return 0
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            expired = [sid for sid, updated in self._updated_at.items() if updated < cutoff]
+            for sid in expired:
+                self._sessions.pop(sid, None)
+                self._updated_at.pop(sid, None)
+        return len(expired)
+
+
+class SQLiteSessionStore(SessionStore):
+    """SQLite store in WAL mode, safe to share between worker processes
+
+    Each session carries a version that changes on every write. Reads check the
+    version with a primary-key lookup and serve the tail from a small in-process
+    LRU cache when it is current, so other workers' appends are never missed.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY,
+            version INTEGER NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT NOT NULL,
+            question TEXT NOT NULL,
+            answer TEXT NOT NULL,
+            created_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_messages_session ON messages (session_id, id);
+        CREATE INDEX IF NOT EXISTS idx_sessions_updated ON sessions (updated_at);
+    """
+
+    def __init__(self, path: str, ttl: Optional[float] = 7 * 24 * 3600,
+                 cache_size: int = 1024, cache_tail: int = 20,
+                 cleanup_interval: Optional[float] = 300):
+        super().__init__(ttl)
+        self.path = str(path)
+        self.cache_size = cache_size
+        self.cache_tail = cache_tail
+        if self.path != ':memory:':
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._local = threading.local()
+        self._cache_lock = threading.Lock()
+        # session_id -> (version, last cache_tail messages)
+        self._cache: 'OrderedDict[str, Tuple[int, List[Message]]]' = OrderedDict()
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(self.SCHEMA)
+
+        self._start_cleanup(cleanup_interval)
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread; sqlite3 connections must not be shared"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=10000")
+            self._local.conn = conn
+        return conn
+
+    def _cache_get(self, session_id: str) -> Optional[Tuple[int, List[Message]]]:
+        with self._cache_lock:
+            entry = self._cache.get(session_id)
+            if entry is not None:
+                self._cache.move_to_end(session_id)
+            return entry
+
+    def _cache_put(self, session_id: str, version: int, messages: List[Message]):
+        with self._cache_lock:
+            self._cache[session_id] = (version, messages[-self.cache_tail:])
+            self._cache.move_to_end(session_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _cache_drop(self, session_id: str):
+        with self._cache_lock:
+            self._cache.pop(session_id, None)
+
+    def append(self, session_id: str, question: str, answer: str):
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT version FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            previous = row[0] if row else None
+            # The id of the newest message doubles as the version; AUTOINCREMENT
+            # never reuses ids, so a cleared and recreated session can't collide
+            version = conn.execute(
+                "INSERT INTO messages (session_id, question, answer, created_at) VALUES (?, ?, ?, ?)",
+                (session_id, question, answer, now)
+            ).lastrowid
+            conn.execute(
+                "INSERT INTO sessions (session_id, version, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET version = excluded.version, updated_at = excluded.updated_at",
+                (session_id, version, now)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        # Extend the cached tail only if nobody else wrote in between
+        entry = self._cache_get(session_id)
+        if previous is None:
+            self._cache_put(session_id, version, [(question, answer)])
+        elif entry is not None and entry[0] == previous:
+            self._cache_put(session_id, version, entry[1] + [(question, answer)])
+        else:
+            self._cache_drop(session_id)
+
+    def tail(self, session_id: str, limit: int) -> List[Message]:
+        if limit <= 0:
+            return []
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT version FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            return []
+        version = row[0]
+
+        entry = self._cache_get(session_id)
+        if entry is not None and entry[0] == version and (limit <= len(entry[1]) or len(entry[1]) < self.cache_tail):
+            return entry[1][-limit:]
+
+        rows = conn.execute(
+            "SELECT question, answer FROM messages WHERE session_id = ? ORDER BY id DESC LIMIT ?",
+            (session_id, max(limit, self.cache_tail))
+        ).fetchall()
+        messages = [(q, a) for q, a in reversed(rows)]
+        self._cache_put(session_id, version, messages)
+        return messages[-limit:]
+
+    def clear(self, session_id: str):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._cache_drop(session_id)
+
+    def cleanup(self) -> int:
+        if not self.ttl:
+            return 0
+        cutoff = time.time() - self.ttl
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            expired = [row[0] for row in conn.execute(
+                "SELECT session_id FROM sessions WHERE updated_at < ?", (cutoff,)
+            )]
+            conn.executemany("DELETE FROM messages WHERE session_id = ?", [(sid,) for sid in expired])
+            conn.executemany("DELETE FROM sessions WHERE session_id = ?", [(sid,) for sid in expired])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        for sid in expired:
+            self._cache_drop(sid)
+        return len(expired)
+
+    def close(self):
+        super().close()
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def create_session_store(url: Optional[str] = None, ttl: Optional[float] = None) -> SessionStore:
+    """Create a store from a URL such as 'memory' or 'sqlite:///data/sessions.db'"""
+    url = url or os.environ.get("SESSION_STORE", "sqlite:///data/sessions.db")
+    if ttl is None:
+        ttl = float(os.environ.get("SESSION_TTL", str(7 * 24 * 3600)))
+
+    if url == 'memory':
+        return MemorySessionStore(ttl=ttl)
+    if url.startswith('sqlite:///'):
+        return SQLiteSessionStore(url[len('sqlite:///'):], ttl=ttl)
+    raise ValueError(f"Unsupported session store: {url}")
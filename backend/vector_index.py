@@ -0,0 +1,123 @@
+import os
+from typing import Any, Dict
+
+# Vector compression of the HNSW index. Compressed vectors live in memory and the
+# full vectors stay on disk, where they are read back to rescore the top candidates.
+# PQ and SQ train on the first COMPRESSION_TRAINING_LIMIT objects and only compress
+# once the collection has that many, so keep it below the corpus size.
+COMPRESSIONS = ('none', 'pq', 'bq', 'sq')
+VECTOR_COMPRESSION = os.environ.get("VECTOR_COMPRESSION", "none")
+COMPRESSION_TRAINING_LIMIT = int(os.environ.get("COMPRESSION_TRAINING_LIMIT", "5000"))
+# 0 lets Weaviate choose the number of PQ segments from the vector dimensions
+PQ_SEGMENTS = int(os.environ.get("PQ_SEGMENTS", "0"))
+PQ_CENTROIDS = 256
+
+# HNSW graph settings, 0 keeps Weaviate's default. ef is the search-time candidate
+# list and can be changed on a live collection; efConstruction and maxConnections
+# shape the graph and need a rebuild (benchmarks/bench_hnsw.py sweeps all three)
+HNSW_EF = int(os.environ.get("HNSW_EF", "0"))
+HNSW_EF_CONSTRUCTION = int(os.environ.get("HNSW_EF_CONSTRUCTION", "0"))
+HNSW_MAX_CONNECTIONS = int(os.environ.get("HNSW_MAX_CONNECTIONS", "0"))
+
+# Weaviate's sizing rule of thumb for the HNSW graph: about 10 bytes per link
+GRAPH_BYTES_PER_LINK = 10
+DEFAULT_MAX_CONNECTIONS = 32
+
+
+def _check_compression(compression: str):
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown vector compression {compression!r} (use one of {', '.join(COMPRESSIONS)})")
+
+
+def quantizer_config(compression: str = VECTOR_COMPRESSION, training_limit: int = COMPRESSION_TRAINING_LIMIT,
+                     segments: int = PQ_SEGMENTS):
+    """The v4 quantizer config for a compression setting, None for 'none'"""
+    from weaviate.classes.config import Configure
+
+    _check_compression(compression)
+    if compression == 'pq':
+        return Configure.VectorIndex.Quantizer.pq(segments=segments or None, centroids=PQ_CENTROIDS,
+                                                  training_limit=training_limit)
+    if compression == 'bq':
+        return Configure.VectorIndex.Quantizer.bq()
+    if compression == 'sq':
+        return Configure.VectorIndex.Quantizer.sq(training_limit=training_limit)
+    return None
+
+
+def vector_index_config(compression: str = VECTOR_COMPRESSION, training_limit: int = COMPRESSION_TRAINING_LIMIT,
+                        segments: int = PQ_SEGMENTS, ef: int = HNSW_EF, ef_construction: int = HNSW_EF_CONSTRUCTION,
+                        max_connections: int = HNSW_MAX_CONNECTIONS):
+    """HNSW vector index config (v4 client) with the given compression and graph settings"""
+    from weaviate.classes.config import Configure
+
+    return Configure.VectorIndex.hnsw(
+        ef=ef or None,
+        ef_construction=ef_construction or None,
+        max_connections=max_connections or None,
+        quantizer=quantizer_config(compression, training_limit, segments)
+    )
+
+
+def enable_compression(collection, compression: str = VECTOR_COMPRESSION,
+                       training_limit: int = COMPRESSION_TRAINING_LIMIT, segments: int = PQ_SEGMENTS) -> bool:
+    """Turn compression on for an existing uncompressed collection (v4 client)
+
+    Weaviate compresses the vectors already in the index in place. Returns
+    False when nothing changed; switching between quantizers or back to
+    uncompressed needs a rebuild (--recreate, or a reindex).
+    """
+    from weaviate.classes.config import Reconfigure
+
+    _check_compression(compression)
+    current = current_compression(collection.config.get())
+    if compression == 'none' or compression == current:
+        return False
+    if current != 'none':
+        raise ValueError(f"Collection is already {current}-compressed, rebuild it to switch to {compression}")
+
+    if compression == 'pq':
+        quantizer = Reconfigure.VectorIndex.Quantizer.pq(segments=segments or None, centroids=PQ_CENTROIDS,
+                                                         training_limit=training_limit)
+    elif compression == 'bq':
+        quantizer = Reconfigure.VectorIndex.Quantizer.bq()
+    else:
+        quantizer = Reconfigure.VectorIndex.Quantizer.sq(training_limit=training_limit)
+    collection.config.update(vector_index_config=Reconfigure.VectorIndex.hnsw(quantizer=quantizer))
+    return True
+
+
+def current_compression(config) -> str:
+    """Compression setting of a collection config (collection.config.get())"""
+    quantizer = getattr(config.vector_index_config, 'quantizer', None)
+    if quantizer is None:
+        return 'none'
+    # _PQConfig, _BQConfig, _SQConfig
+    return type(quantizer).__name__.strip('_').lower().replace('config', '')
+
+
+def vector_bytes(dim: int, compression: str = 'none', segments: int = 0) -> float:
+    """In-memory bytes of one vector under a compression setting"""
+    _check_compression(compression)
+    if compression == 'pq':
+        # One byte (a centroid id out of 256) per segment
+        return segments or dim // 4
+    if compression == 'bq':
+        return dim / 8
+    if compression == 'sq':
+        return dim
+    return dim * 4
+
+
+def estimate_index_bytes(count: int, dim: int, compression: str = 'none', segments: int = 0,
+                         max_connections: int = HNSW_MAX_CONNECTIONS) -> Dict[str, Any]:
+    """Estimated memory of an HNSW index: vectors, graph links and PQ codebook"""
+    max_connections = max_connections or DEFAULT_MAX_CONNECTIONS
+    vectors = count * vector_bytes(dim, compression, segments)
+    codebook = PQ_CENTROIDS * dim * 4 if compression == 'pq' else 0
+    graph = count * max_connections * GRAPH_BYTES_PER_LINK
+    return {
+        'vector_bytes': int(vectors + codebook),
+        'graph_bytes': graph,
+        'total_bytes': int(vectors + codebook + graph)
+    }
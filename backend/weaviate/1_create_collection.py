@@ -1,26 +1,36 @@
+import sys
+from pathlib import Path
+
 import weaviate
 from weaviate.classes.config import Configure
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from collection_pointer import active_collection
+from vector_index import VECTOR_COMPRESSION, vector_index_config
+
 client = weaviate.connect_to_local()
 
-# Check if collection exists
+# Create the collection only if it doesn't exist; existing objects are kept so
+# 2_import_data.py can upsert just what changed (use its --recreate to rebuild)
 try:
-    client.collections.delete_all()
-    print("Deleted all collections")
-
-    # Create collection only if it doesn't exist
-    uscis_policy_manual = client.collections.create(
-        name="USCIS_Policy_Manual",
-        vectorizer_config=Configure.Vectorizer.text2vec_ollama(
-            api_endpoint="http://localhost:11434",
-            model="nomic-embed-text",
-        ),
-        generative_config=Configure.Generative.ollama(
-            api_endpoint="http://localhost:11434",
-            model="llama3.2",
+    active = active_collection(client, "USCIS_Policy_Manual")
+    if client.collections.exists(active):
+        print(f"'{active}' collection already exists")
+    else:
+        uscis_policy_manual = client.collections.create(
+            name=active,
+            vectorizer_config=Configure.Vectorizer.text2vec_ollama(
+                api_endpoint="http://localhost:11434",
+                model="nomic-embed-text",
+            ),
+            generative_config=Configure.Generative.ollama(
+                api_endpoint="http://localhost:11434",
+                model="llama3.2",
+            ),
+            # VECTOR_COMPRESSION=pq|bq|sq keeps compressed vectors in memory instead of full ones
+            vector_index_config=vector_index_config(VECTOR_COMPRESSION)
         )
-    )
-    print("Created new 'USCIS_Policy_Manual' collection")
+        print(f"Created new '{active}' collection (vector compression: {VECTOR_COMPRESSION})")
 except Exception as e:
     print(f"Error during query: {str(e)}")
 finally:
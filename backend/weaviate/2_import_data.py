@@ -1,112 +1,279 @@
 import weaviate
+from weaviate.classes.config import Configure, DataType, Property, Tokenization
+from weaviate.classes.query import Filter
+import argparse
 import json
+import os
 from pathlib import Path
 import logging
-from typing import List, Dict, Any
+import re
+import sys
+import time
+from dataclasses import dataclass
 from datetime import datetime
+from itertools import islice
+from typing import List, Dict, Any, Iterator, Optional, Set, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from chunk_identity import ChunkKeyer, content_hash
+from chunk_dataset import is_dataset, iter_dataset
+from chunk_reader import PARSE_WORKERS, iter_chunks
+from collection_pointer import DEFAULT_ALIAS, active_collection
+from embedding_cache import EMBED_CACHE_PATH, EmbeddingCache
+from embeddings import EMBED_BATCH_SIZE, EMBED_DIMENSIONS, EMBED_PARALLELISM, OllamaEmbedder, embedding_text
+from manifest import clear_stamp, list_versions, load_manifest, manifest_chunks_file, read_stamp, stamp_collection
+from structured_logging import setup_logging
+from vector_index import COMPRESSIONS, VECTOR_COMPRESSION, enable_compression, vector_index_config
 
 # Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+setup_logging()
 logger = logging.getLogger(__name__)
 
-class WeaviateImporter:
-    def __init__(self):
-        self.client = weaviate.Client(
-            url="http://localhost:8080",
-        )
-        self.setup_schema()
-
-    def setup_schema(self):
-        """Set up the Weaviate schema for USCIS policy manual content"""
-        schema = {
-            "class": "USCIS_Policy_Manual",
-            "description": "Content from the USCIS Policy Manual",
-            "vectorizer": "text2vec-ollama",
-            "moduleConfig": {
-                "text2vec-ollama": {
-                    "model": "nomic-embed-text",
-                    "apiEndpoint": "http://host.docker.internal:11434"
-                },
-                "generative-ollama": {
-                    "model": "llama3.2",
-                    "apiEndpoint": "http://host.docker.internal:11434"
-                }
-            },
-            "properties": [
-                {
-                    "name": "url",
-                    "dataType": ["string"],
-                    "description": "Source URL of the content",
-                    "skip_vectorization": True
-                },
-                {
-                    "name": "title",
-                    "dataType": ["string"],
-                    "description": "Title of the page",
-                    "vectorize_property_name": True
-                },
-                {
-                    "name": "volume_number",
-                    "dataType": ["string"],
-                    "description": "Volume number from metadata",
-                    "skip_vectorization": True
-                },
-                {
-                    "name": "part_letter",
-                    "dataType": ["string"],
-                    "description": "Part letter from metadata",
-                    "skip_vectorization": True
-                },
-                {
-                    "name": "chapter_number",
-                    "dataType": ["string"],
-                    "description": "Chapter number from metadata",
-                    "skip_vectorization": True
-                },
-                {
-                    "name": "last_updated",
-                    "dataType": ["string"],
-                    "description": "Last updated date",
-                    "skip_vectorization": True
-                },
-                {
-                    "name": "section_header",
-                    "dataType": ["string"],
-                    "description": "Header of the section",
-                    "vectorize_property_name": True
-                },
-                {
-                    "name": "subsection_header",
-                    "dataType": ["string"],
-                    "description": "Header of the subsection",
-                    "vectorize_property_name": True
-                },
-                {
-                    "name": "content",
-                    "dataType": ["text"],
-                    "description": "The actual content",
-                    "vectorize_property_name": True
-                },
-                {
-                    "name": "timestamp",
-                    "dataType": ["string"],
-                    "description": "Processing timestamp",
-                    "skip_vectorization": True
-                }
-            ]
+COLLECTION_NAME = DEFAULT_ALIAS
+CHECKPOINT_DIR = Path('data/import_checkpoints')
+COLLECTION_DESCRIPTION = "Content from the USCIS Policy Manual"
+# Who embedded a collection's chunks is kept in its description; see embeddings.EMBEDDED_PROPERTIES
+EMBED_MODE_PATTERN = re.compile(r'\(embedded by (\w+)\)')
+
+
+def collection_description(embed_mode: str) -> str:
+    return f"{COLLECTION_DESCRIPTION} (embedded by {embed_mode})"
+
+
+def recorded_embed_mode(description: Optional[str]) -> Optional[str]:
+    match = EMBED_MODE_PATTERN.search(description or '')
+    return match.group(1) if match else None
+
+
+def added_properties() -> List[Property]:
+    """Properties added after the first schema, created on existing collections on import"""
+    return [
+        Property(name="content_hash", data_type=DataType.TEXT,
+                 description="SHA-256 of the chunk content", skip_vectorization=True),
+        # Field tokenization so a filter on an id matches the whole id, not its parts
+        Property(name="parent_id", data_type=DataType.TEXT, tokenization=Tokenization.FIELD,
+                 description="Id of the section the chunk was cut from", skip_vectorization=True),
+        Property(name="chapter_id", data_type=DataType.TEXT, tokenization=Tokenization.FIELD,
+                 description="Id of the chapter page", skip_vectorization=True),
+        Property(name="chunk_index", data_type=DataType.INT,
+                 description="Position of the chunk in its section"),
+        Property(name="overlap_chars", data_type=DataType.INT,
+                 description="Length of the content prefix repeated from the previous chunk"),
+    ]
+
+
+@dataclass
+class ImportStats:
+    objects: int = 0
+    added: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+    failed: int = 0
+    retried: int = 0
+    elapsed: float = 0.0
+    embed_seconds: float = 0.0
+
+    @property
+    def objects_per_second(self) -> float:
+        return self.objects / self.elapsed if self.elapsed else 0.0
+
+class ImportCheckpoint:
+    """Byte offset of the last durable batch of a chunks file, kept in a small JSON file
+
+    A batch is only recorded as committed once every object in it was accepted
+    by Weaviate, so resuming from the committed offset never skips an object.
+    Objects have deterministic UUIDs, so a batch that was half sent before a
+    crash is simply overwritten when it is sent again.
+    """
+
+    def __init__(self, path: Path, chunks_file: Path, collection_name: str):
+        self.path = Path(path)
+        self.chunks_file = Path(chunks_file)
+        self.collection_name = collection_name
+        self.state: Dict[str, Any] = {}
+
+    def _fingerprint(self) -> Dict[str, Any]:
+        stat = self.chunks_file.stat()
+        return {
+            'chunks_file': str(self.chunks_file.resolve()),
+            'file_size': stat.st_size,
+            'file_mtime': stat.st_mtime,
+            'collection': self.collection_name
         }
 
-        try:
-            self.client.schema.delete_class("USCIS_Policy_Manual")
+    def start(self):
+        """Start a fresh checkpoint for a full run"""
+        self.state = dict(self._fingerprint(), committed_offset=0, committed_lines=0,
+                          status='running', batches=[])
+        self._save()
+
+    def resume(self) -> Tuple[int, int]:
+        """Load the checkpoint and return (committed offset, committed lines) to continue from"""
+        if not self.path.exists():
+            logger.warning(f"No checkpoint at {self.path}, starting from the beginning")
+            self.start()
+            return 0, 0
+
+        state = json.loads(self.path.read_text(encoding='utf-8'))
+        fingerprint = self._fingerprint()
+        mismatched = [key for key, value in fingerprint.items() if state.get(key) != value]
+        if mismatched:
+            raise ValueError(f"Checkpoint {self.path} is for a different file or collection ({', '.join(mismatched)})")
+        self.state = state
+        self.state['status'] = 'running'
+        return state['committed_offset'], state['committed_lines']
+
+    def record(self, start_offset: int, end_offset: int, start_line: int, lines: int,
+               status: str, failed: int = 0):
+        """Record a batch, advancing the committed offset if it fully succeeded"""
+        self.state['batches'].append({
+            'offsets': [start_offset, end_offset],
+            'lines': [start_line, start_line + lines],
+            'status': status,
+            'failed': failed,
+            'at': datetime.now().isoformat(timespec='seconds')
+        })
+        if status == 'committed':
+            self.state['committed_offset'] = end_offset
+            self.state['committed_lines'] = start_line + lines
+        self._save()
+
+    def finish(self, status: str = 'complete'):
+        self.state['status'] = status
+        self._save()
+
+    def _save(self):
+        """Write atomically, so a crash mid-write leaves the previous checkpoint intact"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+class WeaviateImporter:
+    def __init__(self, batch_mode: str = 'dynamic', batch_size: int = 100,
+                 concurrency: int = 2, max_retries: int = 3, log_every: int = 1000,
+                 embedder: Optional[OllamaEmbedder] = None, recreate: bool = False,
+                 collection_name: Optional[str] = None, checkpoint_every: int = 1000,
+                 parse_workers: int = PARSE_WORKERS, compression: str = VECTOR_COMPRESSION):
+        self.client = weaviate.connect_to_local()
+        # Import into whichever version the alias currently points to, unless told otherwise
+        self.collection_name = collection_name or active_collection(self.client, COLLECTION_NAME)
+        self.batch_mode = batch_mode
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.log_every = log_every
+        self.checkpoint_every = checkpoint_every
+        self.parse_workers = parse_workers
+        # With an embedder, vectors are computed here and Weaviate's vectorizer is skipped on import
+        self.embedder = embedder
+        self.compression = compression
+        self.setup_schema(recreate)
+        self.collection = self.client.collections.get(self.collection_name)
+
+    def close(self):
+        self.client.close()
+
+    def setup_schema(self, recreate: bool = False):
+        """Create the collection if it doesn't exist, keeping existing objects unless recreate is set"""
+        if self.client.collections.exists(self.collection_name):
+            if not recreate:
+                self._ensure_added_properties()
+                self._check_embed_mode()
+                self._check_dimensions()
+                if enable_compression(self.client.collections.get(self.collection_name), self.compression):
+                    logger.info(f"Enabled {self.compression} compression on existing schema")
+                return
+            self.client.collections.delete(self.collection_name)
             logger.info("Deleted existing schema")
-        except:
-            pass
 
-        self.client.schema.create_class(schema)
-        logger.info("Created new schema")
+        self.client.collections.create(
+            name=self.collection_name,
+            description=collection_description(self.embed_mode),
+            vectorizer_config=Configure.Vectorizer.text2vec_ollama(
+                api_endpoint="http://host.docker.internal:11434",
+                model="nomic-embed-text",
+            ),
+            generative_config=Configure.Generative.ollama(
+                api_endpoint="http://host.docker.internal:11434",
+                model="llama3.2",
+            ),
+            vector_index_config=vector_index_config(self.compression),
+            properties=[
+                Property(name="url", data_type=DataType.TEXT,
+                         description="Source URL of the content", skip_vectorization=True),
+                Property(name="title", data_type=DataType.TEXT,
+                         description="Title of the page", vectorize_property_name=True),
+                Property(name="volume_number", data_type=DataType.TEXT,
+                         description="Volume number from metadata", skip_vectorization=True),
+                Property(name="part_letter", data_type=DataType.TEXT,
+                         description="Part letter from metadata", skip_vectorization=True),
+                Property(name="chapter_number", data_type=DataType.TEXT,
+                         description="Chapter number from metadata", skip_vectorization=True),
+                Property(name="last_updated", data_type=DataType.TEXT,
+                         description="Last updated date", skip_vectorization=True),
+                Property(name="section_header", data_type=DataType.TEXT,
+                         description="Header of the section", vectorize_property_name=True),
+                Property(name="subsection_header", data_type=DataType.TEXT,
+                         description="Header of the subsection", vectorize_property_name=True),
+                Property(name="content", data_type=DataType.TEXT,
+                         description="The actual content", vectorize_property_name=True),
+                Property(name="timestamp", data_type=DataType.TEXT,
+                         description="Processing timestamp", skip_vectorization=True),
+            ] + added_properties()
+        )
+        logger.info(f"Created new schema (vector compression: {self.compression})")
+
+    def _ensure_added_properties(self):
+        """Add properties that collections created by older imports don't have yet"""
+        collection = self.client.collections.get(self.collection_name)
+        existing = {prop.name for prop in collection.config.get().properties}
+        for prop in added_properties():
+            if prop.name not in existing:
+                collection.config.add_property(prop)
+                logger.info(f"Added {prop.name} property to existing schema")
+
+    @property
+    def embed_mode(self) -> str:
+        return 'client' if self.embedder else 'weaviate'
+
+    def _check_embed_mode(self):
+        """Refuse to mix client and Weaviate vectors, which live in different vector spaces"""
+        collection = self.client.collections.get(self.collection_name)
+        recorded = recorded_embed_mode(collection.config.get().description)
+        if recorded == self.embed_mode:
+            return
+        if recorded:
+            raise ValueError(f"{self.collection_name} was embedded by {recorded}, not {self.embed_mode}; "
+                             f"import with --embed {recorded}, or rebuild it with --recreate or 4_reindex.py")
+        # Collections from before the mode was recorded can't be checked, only labelled from now on
+        if self.collection_dimensions() is not None:
+            logger.warning(f"{self.collection_name} doesn't record how it was embedded, "
+                           f"assuming {self.embed_mode}")
+        collection.config.update(description=collection_description(self.embed_mode))
+
+    def _check_dimensions(self):
+        """Refuse to mix vector sizes, e.g. after changing EMBED_DIMENSIONS without --recreate"""
+        if self.embedder is None:
+            return
+        existing = self.collection_dimensions()
+        if existing is None:
+            return
+        expected = self.embedder.vector_size()
+        if existing != expected:
+            raise ValueError(f"{self.collection_name} holds {existing}-dimensional vectors but the embedder makes "
+                             f"{expected}-dimensional ones; rebuild it with --recreate or 4_reindex.py")
+
+    def collection_dimensions(self) -> Optional[int]:
+        """Length of the stored vectors, None for an empty collection"""
+        response = self.client.collections.get(self.collection_name).query.fetch_objects(limit=1, include_vector=True)
+        if not response.objects:
+            return None
+        return len(response.objects[0].vector['default'])
 
     def get_latest_chunks_file(self) -> Path:
         """Get the most recent chunks file"""
@@ -116,56 +283,281 @@ class WeaviateImporter:
             raise FileNotFoundError("No chunks files found")
         return max(files, key=lambda x: x.stat().st_mtime)
 
-    def import_chunks(self):
-        """Import chunks from the latest JSONL file into Weaviate"""
-        chunks_file = self.get_latest_chunks_file()
-        logger.info(f"Importing chunks from {chunks_file}")
-        
-        batch_size = 100
-        current_batch = []
-        
-        with open(chunks_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                chunk = json.loads(line.strip())
-                
-                # Prepare object data
-                object_data = {
-                    "url": chunk["url"],
-                    "title": chunk["title"],
-                    "volume_number": chunk.get("volume_number", ""),
-                    "part_letter": chunk.get("part_letter", ""),
-                    "chapter_number": chunk.get("chapter_number", ""),
-                    "last_updated": chunk.get("last_updated", ""),
-                    "section_header": chunk.get("section_header"),
-                    "subsection_header": chunk.get("subsection_header"),
-                    "content": chunk.get("content", ""),
-                    "timestamp": chunk.get("timestamp", "")
-                }
-                
-                current_batch.append(object_data)
-                
-                if len(current_batch) >= batch_size:
-                    self._import_batch(current_batch)
-                    current_batch = []
-            
-            # Import any remaining items
-            if current_batch:
-                self._import_batch(current_batch)
-
-    def _import_batch(self, batch: List[Dict[str, Any]]):
-        """Import a batch of objects into Weaviate"""
-        with self.client.batch as batch_context:
-            for item in batch:
-                batch_context.add_data_object(
-                    data_object=item,
-                    class_name="USCIS_Policy_Manual"
-                )
-        logger.info(f"Imported batch of {len(batch)} items")
+    def checkpoint_path(self) -> Path:
+        return CHECKPOINT_DIR / f"{self.collection_name}.json"
+
+    def iter_objects(self, chunks_file: Path, start: int = 0,
+                     end: Optional[int] = None) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Stream (byte offset after the line, object properties) from a JSONL chunks file
+
+        For an .arrow/.parquet dataset the offsets are row numbers instead.
+        """
+        if is_dataset(chunks_file):
+            return iter_dataset(chunks_file, start, end)
+        return iter_chunks(chunks_file, start, end, workers=self.parse_workers)
+
+    def fetch_content_hashes(self) -> Dict[str, Optional[str]]:
+        """UUID -> content hash of every object currently in the collection"""
+        return {
+            str(obj.uuid): obj.properties.get('content_hash')
+            for obj in self.collection.iterator(return_properties=['content_hash'])
+        }
+
+    def diff_objects(self, properties_iter: Iterator[Dict[str, Any]], existing: Dict[str, Optional[str]],
+                     seen: Set[str], stats: ImportStats, keyer: ChunkKeyer) -> Iterator[Dict[str, Any]]:
+        """Yield only new or changed chunks, with deterministic UUIDs and content hashes"""
+        for properties in properties_iter:
+            object_uuid = keyer.uuid(properties)
+            properties['content_hash'] = content_hash(properties)
+            seen.add(object_uuid)
+            if object_uuid not in existing:
+                stats.added += 1
+            elif existing[object_uuid] != properties['content_hash']:
+                stats.updated += 1
+            else:
+                stats.unchanged += 1
+                continue
+            yield {'properties': properties, 'uuid': object_uuid}
+
+    def delete_stale(self, stale: List[str], chunk_size: int = 500) -> int:
+        """Delete objects whose chunks no longer exist"""
+        deleted = 0
+        for i in range(0, len(stale), chunk_size):
+            result = self.collection.data.delete_many(where=Filter.by_id().contains_any(stale[i:i + chunk_size]))
+            deleted += result.successful
+        return deleted
+
+    def import_chunks(self, chunks_file: Optional[Path] = None, resume: bool = False,
+                      checkpoint_path: Optional[Path] = None,
+                      manifest: Optional[Dict[str, Any]] = None) -> ImportStats:
+        """Upsert new and changed chunks from a JSONL file (the latest one by default) and drop vanished ones
+
+        The file is imported in batches of checkpoint_every lines. After each
+        batch is fully accepted its end offset is checkpointed, and with resume
+        the import continues from the last committed batch. A batch that still
+        has failures after retries stops the import, so it can be resumed later.
+
+        With a manifest, its verified chunks file is imported and the collection
+        is stamped with the manifest version once the import is complete.
+        """
+        if manifest is not None:
+            chunks_file = manifest_chunks_file(manifest)
+        chunks_file = chunks_file or self.get_latest_chunks_file()
+        checkpoint = ImportCheckpoint(checkpoint_path or self.checkpoint_path(), chunks_file, self.collection_name)
+        if resume:
+            offset, line_number = checkpoint.resume()
+        else:
+            checkpoint.start()
+            offset, line_number = 0, 0
+        logger.info(f"Importing chunks from {chunks_file} into {self.collection_name}" +
+                    (f", resuming at line {line_number} (byte {offset})" if offset else ""))
+
+        stats = ImportStats()
+        start = time.time()
+        existing = self.fetch_content_hashes()
+        logger.info(f"Collection holds {len(existing)} objects")
+        seen: Set[str] = set()
+        keyer = ChunkKeyer()
+        # Committed lines aren't sent again, but their keys are needed to number
+        # repeated headers consistently and to tell which objects are stale
+        for _, properties in self.iter_objects(chunks_file, end=offset):
+            seen.add(keyer.uuid(properties))
+
+        failed = []
+        lines = self.iter_objects(chunks_file, start=offset)
+        while True:
+            segment = list(islice(lines, self.checkpoint_every))
+            if not segment:
+                break
+            end_offset = segment[-1][0]
+            objects = self.diff_objects((properties for _, properties in segment), existing, seen, stats, keyer)
+            failed = self._import_with_retries(self._prepare_objects(objects), stats)
+            if failed:
+                checkpoint.record(offset, end_offset, line_number, len(segment), 'failed', failed=len(failed))
+                logger.error(f"{len(failed)} objects in lines {line_number}-{line_number + len(segment)} still failed; "
+                             f"stopping, rerun with --resume to continue from line {line_number}")
+                break
+            checkpoint.record(offset, end_offset, line_number, len(segment), 'committed')
+            offset, line_number = end_offset, line_number + len(segment)
+
+        stats.failed = len(failed)
+        if not failed:
+            stale = [object_uuid for object_uuid in existing if object_uuid not in seen]
+            if stale and not seen:
+                logger.warning(f"{chunks_file} has no chunks, not deleting {len(stale)} existing objects")
+            elif stale:
+                stats.deleted = self.delete_stale(stale)
+        checkpoint.finish('failed' if failed else 'complete')
+        if not failed and manifest is not None:
+            stamp_collection(self.client, self.collection_name, manifest)
+            logger.info(f"Stamped {self.collection_name} with manifest {manifest['version']}")
+        elif not failed:
+            # The collection no longer matches whatever manifest it was stamped with
+            clear_stamp(self.client, self.collection_name)
+        stats.elapsed = time.time() - start
+        if self.embedder:
+            stats.embed_seconds = self.embedder.embed_seconds
+        for error in failed[:20]:
+            logger.error(f"Failed to import {error.object_.uuid}: {error.message}", extra={
+                'url': (error.object_.properties or {}).get('url')
+            })
+        logger.info(
+            f"Imported {stats.objects - stats.failed}/{stats.objects} objects in {stats.elapsed:.1f}s "
+            f"({stats.objects_per_second:.1f} objects/s, {stats.retried} retried, {stats.failed} failed)",
+            extra={
+                'objects_per_second': round(stats.objects_per_second, 1),
+                'embed_seconds': round(stats.embed_seconds, 1) if self.embedder else None
+            }
+        )
+        logger.info(
+            f"Diff: {stats.added} added, {stats.updated} updated, {stats.unchanged} unchanged, {stats.deleted} deleted",
+            extra={'added': stats.added, 'updated': stats.updated,
+                   'unchanged': stats.unchanged, 'deleted': stats.deleted}
+        )
+        if self.embedder and self.embedder.cache is not None:
+            report = self.embedder.cache_report()
+            logger.info(
+                f"Embedding cache: {report['hits']} hits, {report['misses']} misses "
+                f"({report['hit_rate']:.1%} hit rate), ~{report['estimated_seconds_saved']:.0f}s of embedding saved",
+                extra={'embedding_cache': report}
+            )
+        return stats
+
+    def _prepare_objects(self, objects: Iterator[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Attach vectors to batch objects when embedding client-side"""
+        if not self.embedder:
+            yield from objects
+            return
+
+        pairs = ((obj, embedding_text(obj['properties'])) for obj in objects)
+        for batch_objects, vectors in self.embedder.embed_stream(pairs):
+            for obj, vector in zip(batch_objects, vectors):
+                yield dict(obj, vector=vector)
+
+    def _import_with_retries(self, objects: Iterator[Dict[str, Any]], stats: ImportStats) -> List[Any]:
+        """Send objects, then resend only the ones Weaviate rejected, with their original UUIDs"""
+        failed = self._import_objects(objects, stats)
+        attempt = 0
+        while failed and attempt < self.max_retries:
+            attempt += 1
+            logger.warning(f"Retrying {len(failed)} failed objects (attempt {attempt}/{self.max_retries})")
+            stats.retried += len(failed)
+            failed = self._import_objects(
+                ({'properties': error.object_.properties, 'uuid': error.object_.uuid,
+                  'vector': error.object_.vector} for error in failed),
+                stats, count=False
+            )
+        return failed
+
+    def _batch(self):
+        """Open a batch context in the configured mode"""
+        if self.batch_mode == 'fixed':
+            return self.collection.batch.fixed_size(
+                batch_size=self.batch_size,
+                concurrent_requests=self.concurrency
+            )
+        return self.collection.batch.dynamic()
+
+    def _import_objects(self, objects: Iterator[Dict[str, Any]], stats: ImportStats,
+                        count: bool = True) -> List[Any]:
+        """Send objects through one batch context and return the ones that failed"""
+        window_start, window_count = time.time(), 0
+        with self._batch() as batch:
+            for obj in objects:
+                batch.add_object(**obj)
+                if not count:
+                    continue
+                stats.objects += 1
+                window_count += 1
+                if window_count >= self.log_every:
+                    now = time.time()
+                    logger.info(f"Queued {stats.objects} objects ({window_count / (now - window_start):.1f} objects/s)")
+                    window_start, window_count = now, 0
+        return list(self.collection.batch.failed_objects)
 
 def main():
-    importer = WeaviateImporter()
-    importer.import_chunks()
+    parser = argparse.ArgumentParser(description="Import scraped chunks into Weaviate")
+    parser.add_argument('--manifest',
+                        help="Scraper manifest version to import, or 'latest' (the default when there are manifests)")
+    parser.add_argument('--force', action='store_true',
+                        help='Import even if the collection is already stamped with the same corpus')
+    parser.add_argument('--file', type=Path,
+                        help='Chunks file, JSONL or .arrow/.parquet, instead of a manifest (default: the newest JSONL)')
+    parser.add_argument('--batch-mode', choices=['dynamic', 'fixed'], default='dynamic',
+                        help='Let the client size batches, or use fixed-size batches')
+    parser.add_argument('--batch-size', type=int, default=100, help='Objects per batch in fixed mode')
+    parser.add_argument('--concurrency', type=int, default=2, help='Concurrent batch requests in fixed mode')
+    parser.add_argument('--max-retries', type=int, default=3, help='Retries of failed objects')
+    parser.add_argument('--embed', choices=['weaviate', 'client'], default='weaviate',
+                        help="Let Weaviate's vectorizer embed each object, or batch embeddings through Ollama here")
+    parser.add_argument('--embed-batch-size', type=int, default=EMBED_BATCH_SIZE, help='Texts per /api/embed request')
+    parser.add_argument('--embed-parallelism', type=int, default=EMBED_PARALLELISM, help='Concurrent /api/embed requests')
+    parser.add_argument('--embed-cache', default=EMBED_CACHE_PATH, help='SQLite embedding cache for client embedding')
+    parser.add_argument('--no-embed-cache', action='store_true', help='Embed every chunk even if it is cached')
+    parser.add_argument('--embed-dimensions', type=int, default=EMBED_DIMENSIONS,
+                        help='Truncate client embeddings to this many dimensions (0 keeps them whole); '
+                             'the API must run with the same EMBED_DIMENSIONS')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue from the last committed batch of the checkpoint')
+    parser.add_argument('--checkpoint', type=Path, help='Checkpoint file (default: data/import_checkpoints/<collection>.json)')
+    parser.add_argument('--checkpoint-every', type=int, default=1000, help='Lines per committed batch')
+    parser.add_argument('--parse-workers', type=int, default=PARSE_WORKERS,
+                        help='Processes parsing the chunks file in byte ranges (1 parses inline)')
+    parser.add_argument('--collection', help='Target collection (default: the one the alias points to)')
+    parser.add_argument('--recreate', action='store_true',
+                        help='Drop the collection and import everything instead of upserting changes')
+    parser.add_argument('--compression', choices=COMPRESSIONS, default=VECTOR_COMPRESSION,
+                        help='Vector index compression; can be turned on for an existing collection, '
+                             'changing or removing it needs --recreate')
+    args = parser.parse_args()
+    if args.resume and args.recreate:
+        parser.error("--resume can't be combined with --recreate")
+    if args.file and args.manifest:
+        parser.error("--file and --manifest are exclusive")
+    if args.embed_dimensions and args.embed != 'client':
+        parser.error("--embed-dimensions needs --embed client, Weaviate's vectorizer can't truncate")
+
+    manifest = None
+    if not args.file:
+        if args.manifest or list_versions():
+            manifest = load_manifest(args.manifest or 'latest')
+        else:
+            logger.warning("No scraper manifests found, importing the newest chunks file")
+
+    embedder = None
+    if args.embed == 'client':
+        embedder = OllamaEmbedder(
+            batch_size=args.embed_batch_size,
+            parallelism=args.embed_parallelism,
+            cache=None if args.no_embed_cache else EmbeddingCache(args.embed_cache),
+            dimensions=args.embed_dimensions
+        )
+
+    importer = WeaviateImporter(
+        batch_mode=args.batch_mode,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        max_retries=args.max_retries,
+        embedder=embedder,
+        recreate=args.recreate,
+        collection_name=args.collection,
+        checkpoint_every=args.checkpoint_every,
+        parse_workers=args.parse_workers,
+        compression=args.compression
+    )
+    try:
+        stamp = read_stamp(importer.client, importer.collection_name)
+        if manifest and stamp and stamp['corpus_hash'] == manifest['corpus_hash'] and not args.force:
+            logger.info(f"{importer.collection_name} already holds this corpus "
+                        f"(manifest {stamp['manifest_version']}), nothing to import")
+            return
+        stats = importer.import_chunks(args.file, resume=args.resume, checkpoint_path=args.checkpoint,
+                                       manifest=manifest)
+    finally:
+        importer.close()
     logger.info("Import completed")
+    if stats.failed:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
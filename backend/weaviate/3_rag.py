@@ -1,21 +1,27 @@
 import logging
+import sys
+from pathlib import Path
 import weaviate
 import requests
 from typing import List, Dict
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from collection_pointer import CollectionResolver
+from embeddings import EMBED_DIMENSIONS, OllamaEmbedder
+from structured_logging import setup_logging
+
 # Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 class USCISPolicyQuerier:
     def __init__(self, client):
         self.client = client
         self.ollama_base_url = "http://localhost:11434"
-        self.collection_name = "USCIS_Policy_Manual"
+        self.collection_name = CollectionResolver(client, "USCIS_Policy_Manual").current()
         self.chat_history = []
+        # A truncated index has to be searched with query vectors truncated the same way
+        self.embedder = OllamaEmbedder(base_url=self.ollama_base_url) if EMBED_DIMENSIONS else None
         
         # Verify collection exists
         try:
@@ -44,6 +50,7 @@ class USCISPolicyQuerier:
                 ])
                 .with_hybrid(
                     query=question,
+                    vector=self.embedder.embed_one(question) if self.embedder else None,
                     properties=["content", "title", "section_header", "subsection_header"],
                     alpha=0.75,  # Increase weight of semantic search
                 )
@@ -1,14 +1,22 @@
 import weaviate
 import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from collection_pointer import active_collection
+from embeddings import EMBED_DIMENSIONS, OllamaEmbedder
 
 client = weaviate.connect_to_local()
 
-uscis_policy_manual = client.collections.get("USCIS_Policy_Manual")
+uscis_policy_manual = client.collections.get(active_collection(client, "USCIS_Policy_Manual"))
 
-response = uscis_policy_manual.query.near_text(
-    query="What are the different ways you can get a green card?",
-    limit=2
-)
+query = "What are the different ways you can get a green card?"
+if EMBED_DIMENSIONS:
+    # A truncated index has to be searched with a vector truncated the same way
+    response = uscis_policy_manual.query.near_vector(near_vector=OllamaEmbedder().embed_one(query), limit=2)
+else:
+    response = uscis_policy_manual.query.near_text(query=query, limit=2)
 
 for obj in response.objects:
     print(json.dumps(obj.properties, indent=2))
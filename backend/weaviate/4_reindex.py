@@ -0,0 +1,188 @@
+"""Blue/green reindex: build a new collection version, validate it, switch the alias, clean up.
+
+The API follows the pointer record within POINTER_REFRESH_SECONDS, so search
+keeps serving the old version until the new one has passed validation.
+
+    python weaviate/4_reindex.py --embed client
+    python weaviate/4_reindex.py --compression pq
+    python weaviate/4_reindex.py --rollback
+"""
+import argparse
+import importlib.util
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import weaviate
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from chunk_dataset import count_rows, is_dataset
+from collection_pointer import DEFAULT_ALIAS, POINTER_REFRESH_SECONDS, read_pointer, versioned_name, write_pointer
+from embedding_cache import EMBED_CACHE_PATH, EmbeddingCache
+from embeddings import EMBED_BATCH_SIZE, EMBED_DIMENSIONS, EMBED_PARALLELISM, OllamaEmbedder
+from manifest import list_versions, load_manifest
+from vector_index import COMPRESSIONS, VECTOR_COMPRESSION
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SMOKE_QUERIES = [
+    "What are the general eligibility requirements for naturalization?",
+    "How do I apply for a green card through a family member?",
+]
+
+
+def load_import_data():
+    """Load 2_import_data.py, whose name isn't importable"""
+    spec = importlib.util.spec_from_file_location('import_data', Path(__file__).resolve().parent / '2_import_data.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def count_chunks(chunks_file: Path) -> int:
+    if is_dataset(chunks_file):
+        return count_rows(chunks_file)
+    with open(chunks_file, 'r', encoding='utf-8') as f:
+        return sum(1 for line in f if line.strip())
+
+
+def validate(client, collection_name: str, expected: int, smoke_queries: List[str],
+             embedder: Optional[OllamaEmbedder] = None) -> List[str]:
+    """Return the reasons a collection isn't fit to serve, empty if it is
+
+    With an embedder, the smoke queries are embedded the same way the chunks
+    were, since Weaviate's vectorizer can't query a truncated index.
+    """
+    problems = []
+    collection = client.collections.get(collection_name)
+    count = collection.aggregate.over_all(total_count=True).total_count
+    logger.info(f"{collection_name} holds {count} objects, expected {expected}")
+    if count != expected:
+        problems.append(f"object count {count} != {expected} chunks")
+
+    for query in smoke_queries:
+        start = time.time()
+        try:
+            vector = embedder.embed_one(query) if embedder else None
+            response = collection.query.hybrid(query=query, vector=vector, limit=3)
+        except Exception as e:
+            problems.append(f"smoke query failed: {query!r}: {e}")
+            continue
+        logger.info(f"Smoke query returned {len(response.objects)} objects in {(time.time() - start) * 1000:.0f}ms: {query!r}")
+        if not response.objects:
+            problems.append(f"smoke query returned nothing: {query!r}")
+    return problems
+
+
+def versions(client, alias: str) -> List[str]:
+    """Existing versioned collections of an alias, oldest first"""
+    prefix = f"{alias}_v"
+    return sorted(name for name in client.collections.list_all(simple=True) if name.startswith(prefix))
+
+
+def collect_garbage(client, alias: str, active: str, keep: int) -> List[str]:
+    """Delete old versions, keeping the active one and the `keep` newest before it"""
+    older = [name for name in versions(client, alias) if name < active]
+    # The unversioned collection from before the first switch is the oldest of all
+    if active != alias and client.collections.exists(alias):
+        older.insert(0, alias)
+    doomed = older[:-keep] if keep else older
+    for name in doomed:
+        client.collections.delete(name)
+        logger.info(f"Deleted old version {name}")
+    return doomed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--alias', default=DEFAULT_ALIAS)
+    parser.add_argument('--manifest',
+                        help="Scraper manifest version to index, or 'latest' (the default when there are manifests)")
+    parser.add_argument('--file', type=Path, help='Chunks file instead of a manifest (default: the newest one)')
+    parser.add_argument('--smoke-query', action='append', dest='smoke_queries',
+                        help='Query that must return results before switching (repeatable)')
+    parser.add_argument('--keep', type=int, default=1,
+                        help='Previous versions to keep for rollback; older ones are deleted (default 1)')
+    parser.add_argument('--rollback', action='store_true', help='Point the alias back at the previous version')
+    parser.add_argument('--batch-mode', choices=['dynamic', 'fixed'], default='dynamic')
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=2)
+    parser.add_argument('--embed', choices=['weaviate', 'client'], default='weaviate')
+    parser.add_argument('--embed-batch-size', type=int, default=EMBED_BATCH_SIZE)
+    parser.add_argument('--embed-parallelism', type=int, default=EMBED_PARALLELISM)
+    parser.add_argument('--embed-cache', default=EMBED_CACHE_PATH)
+    parser.add_argument('--embed-dimensions', type=int, default=EMBED_DIMENSIONS,
+                        help='Truncate client embeddings to this many dimensions (0 keeps them whole)')
+    parser.add_argument('--compression', choices=COMPRESSIONS, default=VECTOR_COMPRESSION,
+                        help='Vector index compression of the new version')
+    args = parser.parse_args()
+    if args.embed_dimensions and args.embed != 'client':
+        parser.error("--embed-dimensions needs --embed client, Weaviate's vectorizer can't truncate")
+
+    # Loading the importer sets up logging for this process too
+    import_data = load_import_data()
+    client = weaviate.connect_to_local()
+    try:
+        pointer = read_pointer(client, args.alias)
+        # Before the first switch the alias name itself is the serving collection
+        current = pointer['collection'] if pointer else args.alias
+
+        if args.rollback:
+            previous = pointer.get('previous') if pointer else None
+            if not previous or not client.collections.exists(previous):
+                logger.error("No previous version to roll back to")
+                sys.exit(1)
+            write_pointer(client, args.alias, previous, previous=current)
+            logger.info(f"Rolled {args.alias} back from {current} to {previous}")
+            return
+
+        manifest = None
+        if not args.file and (args.manifest or list_versions()):
+            manifest = load_manifest(args.manifest or 'latest')
+
+        new_name = versioned_name(args.alias)
+        embedder = None
+        if args.embed == 'client':
+            embedder = OllamaEmbedder(batch_size=args.embed_batch_size, parallelism=args.embed_parallelism,
+                                      cache=EmbeddingCache(args.embed_cache), dimensions=args.embed_dimensions)
+        importer = import_data.WeaviateImporter(
+            batch_mode=args.batch_mode,
+            batch_size=args.batch_size,
+            concurrency=args.concurrency,
+            embedder=embedder,
+            collection_name=new_name,
+            compression=args.compression
+        )
+        try:
+            stats = importer.import_chunks(args.file, manifest=manifest)
+            chunks_file = Path(manifest['chunks_file']) if manifest else args.file or importer.get_latest_chunks_file()
+        finally:
+            importer.close()
+
+        expected = manifest['counts']['chunks'] if manifest else count_chunks(chunks_file)
+        problems = validate(client, new_name, expected, args.smoke_queries or DEFAULT_SMOKE_QUERIES, embedder)
+        if stats.failed:
+            problems.append(f"{stats.failed} objects failed to import")
+        if problems:
+            for problem in problems:
+                logger.error(f"Validation failed for {new_name}: {problem}")
+            logger.error(f"Not switching {args.alias}; it still points to {current}. {new_name} is left for inspection")
+            sys.exit(1)
+
+        write_pointer(client, args.alias, new_name, previous=current)
+        logger.info(f"Switched {args.alias} from {current} to {new_name}")
+
+        # Let every API worker pick up the new pointer before anything it may still query is deleted
+        time.sleep(POINTER_REFRESH_SECONDS)
+        deleted = collect_garbage(client, args.alias, new_name, args.keep)
+        print(json.dumps({'alias': args.alias, 'active': new_name, 'previous': current, 'deleted': deleted,
+                          'manifest': manifest['version'] if manifest else None}, indent=2))
+    finally:
+        client.close()
+
+
+if __name__ == '__main__':
+    main()
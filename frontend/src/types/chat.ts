@@ -6,5 +6,6 @@ export interface ChatMessage {
   export interface ChatResponse {
     question: string;
     answer: string;
+    degraded?: boolean;
     history: [string, string][];
   }
\ No newline at end of file